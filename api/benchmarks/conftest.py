@@ -0,0 +1,71 @@
+"""
+Fixtures voor de benchmarks (pytest-benchmark).
+
+- NumPy engine en alleen in-memory caches (de L2 heeft een eigen benchmark)
+- r_stub: R engine zonder R; de worker pool schrijft de opgenomen R output
+  (fixtures/r_output_baseline.bin, zie r_fixture.py)
+- Elke benchmark begint met lege caches
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault('SCENARIO_ENGINE', 'numpy')
+os.environ.setdefault('DATA_PATH', str(Path(__file__).parent.parent.parent / "public" / "data" / "parameterwaarden.csv"))
+os.environ.setdefault('L2_CACHE_PATH', '')
+
+import scenario_model
+from scenario_cache import CompacteProjectie
+from r_fixture import R_OUTPUT
+
+
+@pytest.fixture(autouse=True)
+def lege_caches():
+    scenario_model.limiter.enabled = False
+    scenario_model.clear_cache()
+    yield
+    scenario_model.clear_cache()
+
+
+@pytest.fixture
+def client():
+    return scenario_model.app.test_client()
+
+
+@pytest.fixture(scope='session')
+def r_output() -> bytes:
+    """Opgenomen output van run_scenario_api_v2.R (baseline)."""
+    return R_OUTPUT.read_bytes()
+
+
+@pytest.fixture(scope='session')
+def projectie(r_output) -> CompacteProjectie:
+    """De opgenomen R output zoals hij in de scenario cache staat."""
+    return CompacteProjectie.van_dataframe(scenario_model.lees_r_output(r_output), scenario_model.PROJECTIE_KOLOMMEN,
+                                        scenario_model.AFGELEIDE_VELDEN)
+
+
+@pytest.fixture
+def params() -> dict:
+    """Canonieke baseline parameters (dezelfde als de opgenomen R output)."""
+    return scenario_model.canonicalize_params(scenario_model.baseline_params())
+
+
+@pytest.fixture
+def r_stub(monkeypatch, r_output, tmp_path):
+    """R engine (SCENARIO_ENGINE=r) met een worker pool die de opgenomen output schrijft."""
+    class StubPool:
+        size = 1
+
+        def run(self, args, timeout):
+            Path(args[-2]).write_bytes(r_output)
+
+    monkeypatch.setattr(scenario_model, 'SCENARIO_ENGINE', 'r')
+    monkeypatch.setattr(scenario_model, 'R_WORKER_POOL', True)
+    monkeypatch.setattr(scenario_model, 'R_OUTPUT_DIR', str(tmp_path))
+    monkeypatch.setattr(scenario_model, 'get_r_worker_pool', lambda: StubPool())
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Opgenomen R output voor de benchmarks (fixtures/r_output_baseline.bin).
+
+De benchmarks draaien zonder R: een stub worker pool schrijft deze bytes als
+output van run_scenario_api_v2.R, zodat het R pad van de API (tijdelijk
+bestand, lees_r_output(), cache) gemeten wordt met echte model output.
+
+Opnieuw opnemen (bijv. na een wijziging in het R model of de dataset):
+
+    SCENARIO_ENGINE=r R_SCRIPT_PATH=../r_scripts/run_scenario_api_v2.R python benchmarks/r_fixture.py
+
+Zonder R kan de NumPy engine (zelfde uitkomst, zie tests/test_scenario_engine.py)
+de fixture maken: python benchmarks/r_fixture.py --engine numpy
+"""
+
+import argparse
+import json
+import os
+import struct
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+FIXTURES = Path(__file__).parent / 'fixtures'
+R_OUTPUT = FIXTURES / 'r_output_baseline.bin'
+R_OUTPUT_INFO = FIXTURES / 'r_output_baseline.json'
+
+
+def schrijf_r_output(df, kolommen) -> bytes:
+    """
+    Zelfde bytes als schrijf_kolommen_binair() in run_scenario_api_v2.R.
+
+    Args:
+        df: Model output (DataFrame)
+        kolommen: Kolommen in de volgorde die de API aan R doorgeeft (PROJECTIE_KOLOMMEN)
+
+    Returns:
+        bytes: uint32 header lengte, JSON header [[kolom, "<f8"], ...], float64 kolommen
+    """
+    kolommen = [kolom for kolom in kolommen if kolom in df.columns]
+    header = json.dumps([[kolom, '<f8'] for kolom in kolommen]).encode()
+    return b''.join([
+        struct.pack('<I', len(header)), header,
+        *(df[kolom].to_numpy(dtype='<f8').tobytes() for kolom in kolommen),
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--engine', choices=('r', 'numpy'), default=os.getenv('SCENARIO_ENGINE', 'r'),
+                        help='Engine die de output maakt (standaard SCENARIO_ENGINE, anders r)')
+    args = parser.parse_args()
+
+    os.environ['SCENARIO_ENGINE'] = args.engine
+    os.environ.setdefault('DATA_PATH', str(Path(__file__).parent.parent.parent / 'public' / 'data' / 'parameterwaarden.csv'))
+    os.environ.setdefault('L2_CACHE_PATH', '')
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    import scenario_model
+
+    params = scenario_model.canonicalize_params(scenario_model.baseline_params())
+    df = scenario_model._call_model_uncached(**params)
+
+    FIXTURES.mkdir(exist_ok=True)
+    R_OUTPUT.write_bytes(schrijf_r_output(df, scenario_model.PROJECTIE_KOLOMMEN))
+    R_OUTPUT_INFO.write_text(json.dumps({
+        'engine': args.engine,
+        'scenario': 'baseline',
+        'params': params,
+        'dataset_md5': scenario_model.get_csv_hash(),
+        'jaren': [int(df['jaar'].min()), int(df['jaar'].max())],
+        'opgenomen_op': datetime.now().isoformat(timespec='seconds'),
+    }, indent=2, default=lambda waarde: waarde.item() if isinstance(waarde, np.generic) else str(waarde)) + '\n')
+    print(f"✅ {R_OUTPUT} ({R_OUTPUT.stat().st_size} bytes, engine {args.engine})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Benchmarks: de model engines.
+
+- NumPy engine: volledig koud, alleen de vraagkant (aanbod uit de cache) en
+  een batch van 100 scenario's
+- R pad zonder R: tijdelijk bestand + lees_r_output() van de opgenomen output
+  (binair zoals het huidige R script, en CSV zoals een oudere versie)
+
+Draaien en vergelijken: zie README.md (Benchmarks).
+"""
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+import scenario_model
+
+
+def test_numpy_koud(benchmark, params):
+    benchmark.pedantic(scenario_model._call_numpy_model_uncached, kwargs=params,
+                       setup=scenario_model._aanbod_cache.clear, rounds=50)
+
+
+def test_numpy_alleen_vraag(benchmark, params):
+    # Aanbod arrays uit de aanbod cache: een vraag slider herberekent alleen de vraagkant
+    scenario_model._call_numpy_model_uncached(**params)
+    benchmark(scenario_model._call_numpy_model_uncached, **params)
+
+
+def test_numpy_batch_100(benchmark, params):
+    batch = [{**params, 'instroom': 600 + 5 * i} for i in range(100)]
+    benchmark.pedantic(scenario_model.scenario_engine.run_scenarios, args=(scenario_model.DATA_PATH, batch),
+                       setup=scenario_model._aanbod_cache.clear, rounds=10)
+    benchmark.extra_info['scenarios'] = len(batch)
+
+
+def test_r_stub(benchmark, r_stub, params):
+    df = benchmark(scenario_model._call_r_model_uncached, **params)
+    assert 'fte_totaal' in df.columns
+
+
+@pytest.mark.parametrize('formaat', ['binair', 'csv'])
+def test_lees_r_output(benchmark, r_output, formaat):
+    if formaat == 'csv':
+        r_output = scenario_model.lees_r_output(r_output).to_csv(index=False).encode()
+    benchmark(scenario_model.lees_r_output, r_output)
+    benchmark.extra_info['bytes'] = len(r_output)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmarks: het hot path van /api/scenario.
+
+- Cache keys (canonicalize_params, create_cache_key)
+- Cache hits: L1 (CompacteProjectie) en L2 (SQLite bytes)
+- Serialisatie: dataframe_to_projectie_json, extract_impact_analysis
+- Volledige requests via de Flask test client: response cache hit, 304,
+  en een miss via de R stub engine (opgenomen R output, geen R nodig)
+
+Draaien en vergelijken: zie README.md (Benchmarks).
+"""
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+import scenario_model
+from persistent_cache import SQLiteCache
+
+SCENARIO = {'instroom': 718}
+
+
+def test_canonicalize_params(benchmark):
+    ruw = scenario_model.parse_scenario_params({'instroom': 850.4, 'fte_vrouw': 0.7231})
+    benchmark(scenario_model.canonicalize_params, ruw)
+
+
+def test_create_cache_key(benchmark, params):
+    benchmark(scenario_model.create_cache_key, **params)
+
+
+def test_l1_cache_hit(benchmark, params):
+    scenario_model.call_r_model(**params)
+    resultaat = benchmark(scenario_model.call_r_model, **params)
+    assert scenario_model._scenario_cache.stats()['hits'] > 0
+    assert len(resultaat) > 0
+
+
+def test_l2_cache_hit(benchmark, tmp_path, projectie):
+    l2 = SQLiteCache(tmp_path / 'l2.sqlite', 64 * 1024 * 1024)
+    l2.put('benchmark', projectie.naar_bytes())
+    benchmark(lambda: scenario_model.CompacteProjectie.van_bytes(l2.get('benchmark')))
+
+
+@pytest.mark.parametrize('formaat', scenario_model.PROJECTIE_FORMATEN)
+def test_dataframe_to_projectie_json(benchmark, projectie, formaat):
+    benchmark(scenario_model.dataframe_to_projectie_json, projectie, formaat=formaat)
+
+
+def test_extract_impact_analysis(benchmark, projectie, capsys):
+    resultaat = benchmark(scenario_model.extract_impact_analysis, projectie)
+    assert resultaat is not None
+
+
+def test_build_scenario_response(benchmark, projectie, capsys):
+    benchmark(scenario_model.build_scenario_response, projectie)
+
+
+def test_api_scenario_response_cache_hit(benchmark, client):
+    client.post('/api/scenario', json=SCENARIO)
+    response = benchmark(client.post, '/api/scenario', json=SCENARIO, headers={'Accept-Encoding': 'br'})
+    assert response.status_code == 200
+    benchmark.extra_info['bytes'] = len(response.data)
+
+
+def test_api_scenario_304(benchmark, client):
+    # Niet de baseline: die URL is /api/scenario zonder parameters
+    etag = client.get('/api/scenario?instroom=1026').headers['ETag']
+    response = benchmark(client.get, '/api/scenario?instroom=1026', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+
+
+def test_api_scenario_l1_hit(benchmark, client, capsys):
+    # Model output in de cache, response niet: serialisatie + compressie
+    client.post('/api/scenario', json=SCENARIO)
+    response = benchmark.pedantic(
+        client.post, args=('/api/scenario',), kwargs={'json': SCENARIO},
+        setup=scenario_model._response_cache.clear, rounds=100,
+    )
+    assert response.status_code == 200
+    benchmark.extra_info['bytes'] = len(response.data)
+
+
+def test_api_scenario_miss_r_stub(benchmark, client, r_stub, capsys):
+    # Alles koud: R aanroep (stub met opgenomen output), inlezen, cache, serialisatie
+    response = benchmark.pedantic(
+        client.post, args=('/api/scenario',), kwargs={'json': SCENARIO},
+        setup=scenario_model.clear_cache, rounds=100,
+    )
+    assert response.status_code == 200
+    benchmark.extra_info['engine'] = 'r (stub)'
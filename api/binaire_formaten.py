@@ -0,0 +1,171 @@
+"""
+Binaire response formaten: msgpack en Arrow IPC stream (content negotiation).
+
+Batch, sweep en Monte Carlo resultaten zijn vooral float arrays; als JSON tekst
+kost dat veel CPU (een Python float per element) en bytes. Met een Accept
+header kiest de client een binair formaat:
+
+- application/msgpack: eigen encoder (geen dependency); NumPy arrays worden
+  in één keer als msgpack array van float64/int64 gecodeerd, zonder Python
+  object per element. Uitkomst is standaard msgpack (elke decoder leest het)
+- application/vnd.apache.arrow.stream: één tabel (kolommen = arrays), de
+  overige velden als JSON in de schema metadata (sleutel 'payload').
+  Optioneel (pakket `pyarrow`); zonder pyarrow wordt Arrow niet aangeboden
+- Zonder passend formaat in de Accept header blijft het JSON
+"""
+
+import json
+import struct
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - pyarrow staat in requirements.txt
+    pa = None
+
+JSON = 'application/json'
+MSGPACK = 'application/msgpack'
+ARROW = 'application/vnd.apache.arrow.stream'
+
+
+def kies_mimetype(accept_mimetypes, arrow: bool = True) -> str:
+    """
+    Kies het response formaat uit de Accept header.
+
+    Args:
+        accept_mimetypes: werkzeug MIMEAccept (request.accept_mimetypes)
+        arrow: Of het endpoint een Arrow tabel kan leveren
+
+    Returns:
+        str: JSON, MSGPACK of ARROW (JSON als de client niets passends vraagt)
+    """
+    aanbod = [JSON, MSGPACK]
+    if arrow and pa is not None:
+        aanbod.append(ARROW)
+    return accept_mimetypes.best_match(aanbod, default=JSON)
+
+
+def json_default(waarde):
+    """json.dumps default voor NumPy arrays en scalars."""
+    if isinstance(waarde, np.ndarray):
+        return waarde.tolist()
+    if isinstance(waarde, np.generic):
+        return waarde.item()
+    raise TypeError(f"Object van type {type(waarde).__name__} is niet JSON serialiseerbaar")
+
+
+# ==================================================================================
+# MSGPACK
+# ==================================================================================
+
+def naar_msgpack(waarde) -> bytes:
+    """
+    Codeer een JSON-achtige payload (dicts, lists, scalars, NumPy arrays) als msgpack.
+
+    Returns:
+        bytes: standaard msgpack
+    """
+    delen = []
+    _pack(waarde, delen)
+    return b''.join(delen)
+
+
+def _pack(waarde, delen: list):
+    if waarde is None:
+        delen.append(b'\xc0')
+    elif isinstance(waarde, (bool, np.bool_)):
+        delen.append(b'\xc3' if waarde else b'\xc2')
+    elif isinstance(waarde, (int, np.integer)):
+        delen.append(_int(int(waarde)))
+    elif isinstance(waarde, (float, np.floating)):
+        delen.append(struct.pack('>Bd', 0xcb, waarde))
+    elif isinstance(waarde, str):
+        data = waarde.encode()
+        delen.append(_header(len(data), 0xa0, 32, 0xd9, 0xda, 0xdb) + data)
+    elif isinstance(waarde, bytes):
+        delen.append(_header(len(waarde), None, 0, 0xc4, 0xc5, 0xc6) + waarde)
+    elif isinstance(waarde, dict):
+        delen.append(_header(len(waarde), 0x80, 16, None, 0xde, 0xdf))
+        for sleutel, item in waarde.items():
+            _pack(str(sleutel), delen)
+            _pack(item, delen)
+    elif isinstance(waarde, np.ndarray) and waarde.ndim == 1 and waarde.dtype.kind in 'biuf':
+        delen.append(_header(len(waarde), 0x90, 16, None, 0xdc, 0xdd))
+        delen.append(_array_elementen(waarde))
+    elif isinstance(waarde, (list, tuple, np.ndarray)):
+        # Ook meerdimensionale arrays: array van rijen
+        delen.append(_header(len(waarde), 0x90, 16, None, 0xdc, 0xdd))
+        for item in waarde:
+            _pack(item, delen)
+    else:
+        raise TypeError(f"Object van type {type(waarde).__name__} is niet msgpack serialiseerbaar")
+
+
+def _int(waarde: int) -> bytes:
+    if 0 <= waarde < 128:
+        return bytes([waarde])
+    if -32 <= waarde < 0:
+        return struct.pack('b', waarde)
+    if waarde >= 2 ** 63:
+        return struct.pack('>BQ', 0xcf, waarde)
+    return struct.pack('>Bq', 0xd3, waarde)
+
+
+def _header(lengte: int, fix, fix_max: int, type8, type16, type32) -> bytes:
+    """Lengte header: fix type (0x80 | n), of 8/16/32 bits lengte."""
+    if fix is not None and lengte < fix_max:
+        return bytes([fix | lengte])
+    if type8 is not None and lengte < 2 ** 8:
+        return struct.pack('>BB', type8, lengte)
+    if lengte < 2 ** 16:
+        return struct.pack('>BH', type16, lengte)
+    return struct.pack('>BI', type32, lengte)
+
+
+def _array_elementen(array: np.ndarray) -> bytes:
+    """Alle elementen van een 1-D array in één keer: type byte + big-endian waarde per element."""
+    if array.dtype.kind == 'b':
+        return np.where(array, 0xc3, 0xc2).astype(np.uint8).tobytes()
+    if array.dtype.kind == 'f':
+        tag, dtype = (0xca, '>f4') if array.dtype.itemsize <= 4 else (0xcb, '>f8')
+    elif array.dtype.kind == 'u':
+        tag, dtype = 0xcf, '>u8'
+    else:
+        tag, dtype = 0xd3, '>i8'
+    elementen = np.empty(len(array), dtype=[('tag', 'u1'), ('waarde', dtype)])
+    elementen['tag'] = tag
+    elementen['waarde'] = array
+    return elementen.tobytes()
+
+
+# ==================================================================================
+# ARROW
+# ==================================================================================
+
+def naar_arrow(kolommen: dict, metadata: dict) -> bytes:
+    """
+    Codeer een tabel als Arrow IPC stream (één record batch).
+
+    Args:
+        kolommen: kolomnaam -> 1-D array (allemaal even lang)
+        metadata: Overige velden; als JSON in de schema metadata onder 'payload'
+
+    Returns:
+        bytes: Arrow IPC stream
+
+    Raises:
+        RuntimeError: Als pyarrow niet geïnstalleerd is
+    """
+    if pa is None:
+        raise RuntimeError("Arrow output vereist het pakket pyarrow")
+    batch = pa.RecordBatch.from_arrays(
+        [pa.array(np.asarray(waarden)) for waarden in kolommen.values()],
+        names=list(kolommen),
+    )
+    schema = batch.schema.with_metadata({'payload': json.dumps(metadata, default=json_default)})
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        writer.write_batch(batch.replace_schema_metadata(schema.metadata))
+    return sink.getvalue().to_pybytes()
@@ -0,0 +1,142 @@
+"""
+Fingerprint van de dataset en de engine code voor cache namespacing.
+
+Een cache key zonder dataset versie blijft na het vervangen van de CSV oude
+projecties serveren. Deze module levert een namespace "<data>-<engine>-<code>"
+die verandert zodra DATA_PATH of een engine bestand (R scripts of
+scenario_engine.py) wijzigt:
+
+- Per bestand wordt de MD5 alleen opnieuw berekend als (inode, size, mtime)
+  verandert; een request kost dus alleen een os.stat()
+- Een achtergrond thread pollt de bestanden (lichtgewicht, geen extra
+  dependency) en roept callbacks aan bij een nieuwe namespace, zodat oude
+  cache entries direct worden opgeruimd
+- De thread start lazy bij het eerste gebruik (na de gunicorn fork)
+"""
+
+import hashlib
+import os
+import sys
+import threading
+from pathlib import Path
+
+
+class FileFingerprint:
+    """MD5 van één bestand, gememoized op (inode, size, mtime)."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._stat = None
+        self._hash = None
+        self._lock = threading.Lock()
+
+    def get(self) -> str:
+        """
+        Geef de MD5 van het bestand ('missing' als het niet bestaat).
+
+        Returns:
+            str: hex digest, alleen herberekend als het bestand gewijzigd is
+        """
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return 'missing'
+
+        sleutel = (st.st_ino, st.st_size, st.st_mtime_ns)
+        with self._lock:
+            if sleutel != self._stat:
+                md5 = hashlib.md5()
+                with open(self.path, 'rb') as f:
+                    for blok in iter(lambda: f.read(1 << 20), b''):
+                        md5.update(blok)
+                self._hash = md5.hexdigest()
+                self._stat = sleutel
+            return self._hash
+
+
+class FingerprintService:
+    """
+    Namespace voor cache keys op basis van dataset en engine versie.
+
+    Args:
+        data_path: Pad naar de parameter CSV
+        engine_paths: Bestanden die de engine definiëren (R scripts, scenario_engine.py)
+        engine: Naam van de engine ('r' of 'numpy')
+        interval: Poll interval van de watcher in seconden (0 = geen watcher)
+        cache_formaat: Versie van het formaat van de gecachte waarden (None = niet in de namespace)
+    """
+
+    def __init__(self, data_path, engine_paths: list, engine: str, interval: float = 2.0,
+                 cache_formaat: int = None):
+        self.data = FileFingerprint(data_path)
+        self.engine_files = [FileFingerprint(p) for p in engine_paths]
+        self.engine = engine
+        self.cache_formaat = cache_formaat
+        self.interval = interval
+
+        self._callbacks = []
+        self._laatste = None
+        self._watcher = None
+        self._watcher_pid = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def data_hash(self) -> str:
+        """MD5 van de dataset (zelfde waarde als voorheen get_csv_hash())."""
+        return self.data.get()
+
+    def engine_hash(self) -> str:
+        """Gecombineerde MD5 van de engine bestanden."""
+        return hashlib.md5(''.join(f.get() for f in self.engine_files).encode()).hexdigest()
+
+    def namespace(self) -> str:
+        """
+        Huidige namespace voor cache keys.
+
+        Returns:
+            str: "<data hash[:12]>-<engine>-<engine hash[:12]>", met "-f<cache_formaat>" als die gezet is
+        """
+        self._start_watcher()
+        namespace = f"{self.data_hash()[:12]}-{self.engine}-{self.engine_hash()[:12]}"
+        if self.cache_formaat is not None:
+            namespace += f"-f{self.cache_formaat}"
+        self._meld_wijziging(namespace)
+        return namespace
+
+    def on_change(self, callback):
+        """Registreer callback(nieuwe_namespace, oude_namespace) bij een wijziging."""
+        self._callbacks.append(callback)
+
+    def _meld_wijziging(self, namespace: str):
+        with self._lock:
+            oud, self._laatste = self._laatste, namespace
+        if oud is None or oud == namespace:
+            return
+        for callback in self._callbacks:
+            try:
+                callback(namespace, oud)
+            except Exception as e:
+                print(f"Warning: fingerprint callback faalde: {e}", file=sys.stderr)
+
+    def _start_watcher(self):
+        # Threads overleven een fork niet: per proces (opnieuw) starten
+        if self.interval <= 0 or (self._watcher_pid == os.getpid() and self._watcher.is_alive()):
+            return
+        with self._lock:
+            if self._watcher_pid == os.getpid() and self._watcher.is_alive():
+                return
+            self._stop.clear()
+            self._watcher = threading.Thread(target=self._watch, name='dataset-fingerprint', daemon=True)
+            self._watcher_pid = os.getpid()
+            self._watcher.start()
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.namespace()
+            except Exception as e:
+                print(f"Warning: fingerprint watcher: {e}", file=sys.stderr)
+
+    def stop(self):
+        """Stop de watcher thread."""
+        self._stop.set()
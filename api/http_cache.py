@@ -0,0 +1,69 @@
+"""
+HTTP caching voor deterministische responses: ETags, Cache-Control en 304.
+
+Een scenario response hangt alleen af van de dataset/engine namespace en de
+canonieke parameters (de response cache key). Browser en edge (Cloudflare)
+kunnen GET responses dus zelf bewaren en hervalideren:
+
+- Sterke ETag = korte hash van de cache key (incl. formaat); een
+  voorgecomprimeerde variant krijgt er ":<encoding>" achter, zoals
+  Flask-Compress dat doet
+- If-None-Match wordt vergeleken zonder dat suffix (en ook met weak tags van
+  een edge die zelf comprimeert), zodat een 304 niets hoeft te berekenen
+- Cache-Control: public, max-age plus stale-while-revalidate
+"""
+
+import hashlib
+
+
+def maak_etag(cache_key: str) -> str:
+    """
+    Korte, stabiele hash van een response cache key (zonder quotes).
+
+    Args:
+        cache_key: Response cache key ("<namespace>:<params hash>:..."), incl. formaat
+
+    Returns:
+        str: 20 hex tekens
+    """
+    return hashlib.sha256(cache_key.encode()).hexdigest()[:20]
+
+
+def etag_match(if_none_match, etag: str):
+    """
+    Zoek de ETag van de client die bij deze response hoort.
+
+    Args:
+        if_none_match: werkzeug ETags (request.if_none_match)
+        etag: Basis ETag (maak_etag()), zonder encoding suffix
+
+    Returns:
+        str of None: de passende tag van de client (zonder quotes), None als er geen past
+    """
+    if if_none_match.star_tag:
+        return etag
+    for tag in if_none_match.as_set(include_weak=True):
+        if tag.split(':', 1)[0] == etag:
+            return tag
+    return None
+
+
+def cache_control(max_age: int, stale_while_revalidate: int = 0) -> str:
+    """
+    Cache-Control waarde voor een GET response.
+
+    Args:
+        max_age: Seconden dat browser en edge de response zonder vragen gebruiken
+            (0 = altijd hervalideren met If-None-Match)
+        stale_while_revalidate: Seconden dat een verlopen response nog gebruikt
+            mag worden terwijl op de achtergrond opnieuw wordt gevalideerd
+
+    Returns:
+        str
+    """
+    if max_age <= 0:
+        return 'no-cache'
+    waarde = f'public, max-age={max_age}'
+    if stale_while_revalidate > 0:
+        waarde += f', stale-while-revalidate={stale_while_revalidate}'
+    return waarde
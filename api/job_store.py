@@ -0,0 +1,221 @@
+"""
+Asynchrone jobs voor lange berekeningen (/api/jobs).
+
+Een cache miss op de R engine houdt een gunicorn thread tot 120 s bezet; onder
+load verhongeren /health en /api/baseline dan. Een job wordt in een lokale
+thread pool uitgevoerd en het request krijgt direct een job id terug; de
+client pollt GET /api/jobs/<id> tot de status klaar of fout is.
+
+- Status en resultaten staan in één SQLite bestand, zodat elke gunicorn worker
+  een job kan opvragen (ook als een andere worker hem uitvoert)
+- Begrensd aantal jobs: bij een volle store valt de oudste afgeronde job weg,
+  zijn alle jobs nog bezig dan wordt een nieuwe job geweigerd
+- Afgeronde jobs verlopen na `ttl` seconden; jobs die na `max_duur` nog niet
+  klaar zijn gelden als verloren (bijv. een herstarte worker)
+- De thread pool start lazy per proces (na de gunicorn fork)
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+
+STATUSSEN = ('wachtend', 'bezig', 'klaar', 'fout')
+AFGEROND = ('klaar', 'fout')
+
+
+class JobStoreVol(RuntimeError):
+    """Alle plaatsen in de job store zijn bezet door lopende jobs."""
+
+
+class JobFout(Exception):
+    """
+    Een job die mislukt met een HTTP status (bijv. 400 bij ongeldige parameters).
+
+    Args:
+        bericht: Foutmelding voor de client
+        status_code: HTTP status van de onderliggende berekening
+    """
+
+    def __init__(self, bericht: str, status_code: int = 500):
+        super().__init__(bericht)
+        self.status_code = status_code
+
+
+def _iso(tijdstip):
+    return datetime.fromtimestamp(tijdstip).isoformat() if tijdstip is not None else None
+
+
+class JobStore:
+    """
+    Thread pool plus begrensde, tussen workers gedeelde opslag van jobs.
+
+    Args:
+        path: Pad naar het SQLite bestand (map wordt aangemaakt)
+        max_jobs: Maximaal aantal jobs in de store (wachtend, bezig en afgerond)
+        ttl: Seconden dat een afgeronde job opvraagbaar blijft
+        workers: Aantal threads per proces dat jobs uitvoert
+        max_duur: Seconden waarna een niet afgeronde job als verloren geldt
+        fout_details: Onverwachte fouten letterlijk doorgeven (alleen in DEBUG)
+    """
+
+    def __init__(self, path, max_jobs: int = 200, ttl: float = 600, workers: int = 2,
+                 max_duur: float = 3600, fout_details: bool = False):
+        self.path = Path(path)
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        self.workers = workers
+        self.max_duur = max_duur
+        self.fout_details = fout_details
+
+        self._executor = None
+        self._executor_pid = None
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connectie()) as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    type TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    aangemaakt_op REAL NOT NULL,
+                    gestart_op REAL,
+                    klaar_op REAL,
+                    resultaat TEXT,
+                    error TEXT,
+                    http_status INTEGER
+                )
+            """)
+
+    def _connectie(self) -> sqlite3.Connection:
+        # Autocommit; submit() opent zelf een schrijftransactie
+        return sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Threads overleven een fork niet: per proces (opnieuw) aanmaken
+        if self._executor_pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='job')
+            self._executor_pid = os.getpid()
+        return self._executor
+
+    def _ruim_op(self, db: sqlite3.Connection):
+        nu = time.time()
+        db.execute("""
+            DELETE FROM jobs
+            WHERE (klaar_op IS NOT NULL AND klaar_op < ?) OR (klaar_op IS NULL AND aangemaakt_op < ?)
+        """, (nu - self.ttl, nu - self.max_duur))
+
+    def submit(self, soort: str, functie, *args) -> dict:
+        """
+        Zet een job in de wachtrij.
+
+        Args:
+            soort: Type job (voor de client, bijv. 'scenario')
+            functie: Functie die het resultaat (JSON-serialiseerbaar) geeft
+            *args: Argumenten voor functie
+
+        Returns:
+            dict: momentopname van de job (zie get())
+
+        Raises:
+            JobStoreVol: Als alle plaatsen bezet zijn door lopende jobs
+        """
+        job_id = uuid.uuid4().hex
+        with closing(self._connectie()) as db:
+            # Tellen en toevoegen in één schrijftransactie (atomair tussen workers)
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                self._ruim_op(db)
+                aantal = db.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+                if aantal >= self.max_jobs:
+                    oudste = db.execute(
+                        "SELECT id FROM jobs WHERE klaar_op IS NOT NULL ORDER BY klaar_op LIMIT 1"
+                    ).fetchone()
+                    if oudste is None:
+                        raise JobStoreVol(f"Maximaal {self.max_jobs} lopende jobs")
+                    db.execute("DELETE FROM jobs WHERE id = ?", oudste)
+                db.execute(
+                    "INSERT INTO jobs (id, type, status, aangemaakt_op) VALUES (?, ?, 'wachtend', ?)",
+                    (job_id, soort, time.time()),
+                )
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+
+        job = self.get(job_id)
+        self._get_executor().submit(self._voer_uit, job_id, functie, args)
+        return job
+
+    def _zet(self, job_id: str, **waarden):
+        kolommen = ', '.join(f"{kolom} = ?" for kolom in waarden)
+        try:
+            with closing(self._connectie()) as db:
+                db.execute(f"UPDATE jobs SET {kolommen} WHERE id = ?", (*waarden.values(), job_id))
+        except sqlite3.Error as e:
+            print(f"Warning: job {job_id} bijwerken faalde: {e}", file=sys.stderr)
+
+    def _voer_uit(self, job_id: str, functie, args: tuple):
+        self._zet(job_id, status='bezig', gestart_op=time.time())
+        try:
+            resultaat = json.dumps(functie(*args))
+        except JobFout as e:
+            self._zet(job_id, status='fout', klaar_op=time.time(), error=str(e), http_status=e.status_code)
+        except Exception as e:
+            print(f"Warning: job {job_id} faalde: {type(e).__name__}: {e}", file=sys.stderr)
+            bericht = str(e) if self.fout_details else 'Internal server error'
+            self._zet(job_id, status='fout', klaar_op=time.time(), error=bericht, http_status=500)
+        else:
+            self._zet(job_id, status='klaar', klaar_op=time.time(), resultaat=resultaat, http_status=200)
+
+    def get(self, job_id: str) -> dict:
+        """
+        Status (en bij klaar het resultaat) van een job.
+
+        Returns:
+            dict met id, type, status (wachtend/bezig/klaar/fout), tijdstippen en
+            resultaat of error + http_status; None als de job onbekend of verlopen is
+        """
+        with closing(self._connectie()) as db:
+            self._ruim_op(db)
+            rij = db.execute("""
+                SELECT id, type, status, aangemaakt_op, gestart_op, klaar_op, resultaat, error, http_status
+                FROM jobs WHERE id = ?
+            """, (job_id,)).fetchone()
+        if rij is None:
+            return None
+
+        job_id, soort, status, aangemaakt_op, gestart_op, klaar_op, resultaat, error, http_status = rij
+        job = {
+            'id': job_id,
+            'type': soort,
+            'status': status,
+            'aangemaakt_op': _iso(aangemaakt_op),
+            'gestart_op': _iso(gestart_op),
+            'klaar_op': _iso(klaar_op),
+            'verloopt_op': _iso(klaar_op + self.ttl) if klaar_op is not None else None,
+        }
+        if status == 'klaar':
+            job['resultaat'] = json.loads(resultaat)
+        elif status == 'fout':
+            job['error'] = error
+            job['http_status'] = http_status
+        return job
+
+    def stats(self) -> dict:
+        """Aantal jobs per status (alle workers)."""
+        with closing(self._connectie()) as db:
+            self._ruim_op(db)
+            per_status = dict(db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        return {
+            **{status: per_status.get(status, 0) for status in STATUSSEN},
+            'max_jobs': self.max_jobs,
+            'workers': self.workers,
+        }
@@ -0,0 +1,233 @@
+"""
+Monte Carlo onzekerheidsbanden voor de projectie (/api/montecarlo).
+
+De CSV bevat laag/midden/hoog varianten voor demografie, onvervulde vraag en de
+niet-demografische trends, de API gebruikt alleen midden. Deze module trekt
+duizenden parametersets uit verdelingen rond die varianten en rekent ze met de
+NumPy engine door: elk blok van `blok` trekkingen is één array-berekening.
+
+- Driehoeksverdeling (laag, midden, hoog) als standaard; uniform en normaal
+  zijn per parameter in te stellen
+- Vallen laag en hoog samen (zoals in raming 2025), dan spreidt de verdeling
+  `spreiding` × het VALIDATION_RULES bereik rond midden
+- Het aantal trekkingen groeit tot het 95% betrouwbaarheidsinterval van de
+  P5/P50/P95 van de gap in het evenwichtsjaar smaller is dan `doel_breedte`
+- Met een vaste seed is de uitkomst reproduceerbaar (en dus cachebaar)
+"""
+
+import math
+
+import numpy as np
+
+import scenario_engine
+
+PERCENTIELEN = (5, 50, 95)
+
+# Z-waarde voor het 95% betrouwbaarheidsinterval van een percentiel
+_Z = 1.96
+
+# Standaard onzekere parameters -> prefix van de laag/midden/hoog varianten in de CSV
+VARIANTEN = {
+    'epi_midden': 'epi',
+    'soc_midden': 'soc',
+    'vak_midden': 'vak',
+    'eff_midden': 'eff',
+    'hor_midden': 'hor',
+    'tijd_midden': 'tijd',
+    'ver_midden': 'ver',
+    'totale_zorgvraag_excl_ATV_midden': 'totale_zorgvraag_excl_ATV',
+    'onv_vraag_midden': 'onv_vraag',
+    'demografie_factor': 'demo_20',  # factor op demo_X_midden: varianten als verhouding
+}
+
+# Plausibel bereik voor CSV parameters zonder VALIDATION_RULES (geen API parameter)
+CSV_BEREIKEN = {
+    'onv_vraag_midden': (0.0, 0.2),
+}
+
+VERDELINGEN = ('driehoek', 'uniform', 'normaal')
+
+
+def standaard_verdelingen(csv_params: dict, params: dict) -> dict:
+    """
+    Verdelingen rond de CSV varianten, verschoven naar de waarden van het scenario.
+
+    Args:
+        csv_params: params_list uit scenario_engine.laad_parameters()
+        params: Scenario parameters (None = CSV default)
+
+    Returns:
+        dict: parameter -> onvolledige verdeling (zie vul_verdeling_aan());
+              laag/hoog ontbreken als de varianten samenvallen
+    """
+    verdelingen = {}
+    for naam, prefix in VARIANTEN.items():
+        midden = csv_params[f'{prefix}_midden']
+        laag, hoog = csv_params[f'{prefix}_laag'], csv_params[f'{prefix}_hoog']
+
+        if naam == 'demografie_factor':
+            anker = params.get(naam) if params.get(naam) is not None else 1.0
+            laag, hoog = anker * laag / midden, anker * hoog / midden
+        else:
+            anker = params.get(naam) if params.get(naam) is not None else midden
+            laag, hoog = anker + laag - midden, anker + hoog - midden
+
+        spec = {'verdeling': 'driehoek', 'modus': anker}
+        if not math.isclose(laag, hoog):
+            # Bij negatieve trends kan de "laag" variant de hoogste waarde zijn
+            spec.update(laag=min(laag, hoog, anker), hoog=max(laag, hoog, anker))
+        verdelingen[naam] = spec
+    return verdelingen
+
+
+def vul_verdeling_aan(naam: str, spec: dict, anker: float, bereik: tuple,
+                      spreiding: float) -> dict:
+    """
+    Maak een verdeling compleet en controleer hem.
+
+    Args:
+        naam: Parameter naam (voor foutmeldingen)
+        spec: {"verdeling", "laag", "modus", "hoog", "sd"}, alles optioneel
+        anker: Modus als spec er geen heeft (waarde van het scenario)
+        bereik: (min, max) waarbinnen getrokken wordt
+        spreiding: Ontbrekende laag/hoog = modus ∓ spreiding × bereik (sd de helft)
+
+    Returns:
+        dict met verdeling, laag, modus, hoog, sd, min en max
+
+    Raises:
+        ValueError: Bij een onbekende verdeling of inconsistente waarden
+    """
+    min_val, max_val = bereik
+    marge = spreiding * (max_val - min_val)
+
+    soort = spec.get('verdeling', 'driehoek')
+    if soort not in VERDELINGEN:
+        raise ValueError(f"{naam}: verdeling moet een van {', '.join(VERDELINGEN)} zijn")
+
+    waarden = {k: spec.get(k) for k in ('laag', 'modus', 'hoog', 'sd')}
+    if any(v is not None and not isinstance(v, (int, float)) for v in waarden.values()):
+        raise ValueError(f"{naam}: laag, modus, hoog en sd moeten getallen zijn")
+
+    modus = waarden['modus'] if waarden['modus'] is not None else anker
+    laag = waarden['laag'] if waarden['laag'] is not None else modus - marge
+    hoog = waarden['hoog'] if waarden['hoog'] is not None else modus + marge
+    laag, hoog = max(min_val, laag), min(max_val, hoog)
+    sd = waarden['sd'] if waarden['sd'] is not None else marge / 2
+
+    if not laag <= modus <= hoog:
+        raise ValueError(f"{naam}: modus {modus} ligt niet binnen [{laag}, {hoog}] (bereik {min_val} - {max_val})")
+    if sd < 0:
+        raise ValueError(f"{naam}: sd moet positief zijn")
+
+    return {'verdeling': soort, 'laag': laag, 'modus': modus, 'hoog': hoog,
+            'sd': sd, 'min': min_val, 'max': max_val}
+
+
+def trek(rng: np.random.Generator, spec: dict, n: int) -> np.ndarray:
+    """Trek n waarden uit een (complete) verdeling."""
+    if spec['verdeling'] == 'normaal':
+        return np.clip(rng.normal(spec['modus'], spec['sd'], n), spec['min'], spec['max'])
+    if spec['laag'] == spec['hoog']:
+        return np.full(n, float(spec['laag']))
+    if spec['verdeling'] == 'uniform':
+        return rng.uniform(spec['laag'], spec['hoog'], n)
+    return rng.triangular(spec['laag'], spec['modus'], spec['hoog'], n)
+
+
+def percentiel_ci_breedte(x: np.ndarray, percentielen=PERCENTIELEN) -> float:
+    """
+    Grootste breedte van het 95% betrouwbaarheidsinterval van de percentielen.
+
+    Verdelingsvrij via rangnummers: het interval van percentiel q loopt van
+    rang n·q - z·√(n·q·(1-q)) tot n·q + z·√(n·q·(1-q)).
+
+    Args:
+        x: Trekkingen van de uitkomst
+        percentielen: Percentielen (0-100) die nauwkeurig moeten zijn
+
+    Returns:
+        float: breedte in de eenheid van x
+    """
+    x = np.sort(x)
+    n = len(x)
+    breedtes = []
+    for p in percentielen:
+        q = p / 100
+        marge = _Z * math.sqrt(n * q * (1 - q))
+        laag = max(0, math.floor(n * q - marge))
+        hoog = min(n - 1, math.ceil(n * q + marge))
+        breedtes.append(x[hoog] - x[laag])
+    return float(max(breedtes))
+
+
+def simuleer(csv_path, params: dict, verdelingen: dict, seed: int = None,
+             doel_breedte: float = 25.0, min_samples: int = 1000,
+             max_samples: int = 100000, blok: int = 1000,
+             jaar: int = scenario_engine.EVENWICHTSJAAR) -> dict:
+    """
+    Monte Carlo simulatie van aanbod, benodigd FTE (scenario 6) en gap.
+
+    Args:
+        csv_path: Pad naar de parameterwaarden CSV (DATA_PATH)
+        params: Vaste scenario parameters (zoals parse_scenario_params())
+        verdelingen: parameter -> complete verdeling (zie vul_verdeling_aan())
+        seed: Seed voor de random generator (None = willekeurig)
+        doel_breedte: Gewenste CI breedte (FTE) van de gap percentielen in `jaar`
+        min_samples: Minimaal aantal trekkingen
+        max_samples: Maximaal aantal trekkingen
+        blok: Trekkingen per array-berekening
+        jaar: Laatste jaar van de banden (evenwichtsjaar)
+
+    Returns:
+        dict met jaren, per reeks de P5/P50/P95 banden, percentielen in het
+        evenwichtsjaar, samples, ci_breedte en converged
+    """
+    rng = np.random.default_rng(seed)
+    csv_params = scenario_engine.laad_parameters(csv_path)
+    reeksen = {'aanbod_fte': [], 'benodigd_fte': [], 'gap_fte': []}
+    instroomadvies = []
+
+    n = 0
+    while True:
+        trekking = {naam: trek(rng, spec, blok) for naam, spec in verdelingen.items()}
+        api_params = {**params, **{k: v for k, v in trekking.items() if k in scenario_engine.API_PARAMETERS}}
+        csv_waarden = {k: v for k, v in trekking.items() if k not in scenario_engine.API_PARAMETERS}
+
+        # Vraagcomponenten werken alleen als epi_midden is gezet (OVERRIDE_VRAAGCOMP)
+        if api_params.get('epi_midden') is None and any(k in scenario_engine.VRAAG_OVERRIDES for k in trekking):
+            api_params['epi_midden'] = csv_params['epi_midden']
+
+        resultaat = scenario_engine.bereken_scenarios(csv_path, api_params, csv_waarden)
+        jaren = resultaat['jaar'][0]
+        tot_jaar = jaren <= jaar
+
+        aanbod = resultaat['fte_totaal'][:, tot_jaar]
+        benodigd = resultaat['scen6_fte_midden_a'][:, tot_jaar]
+        reeksen['aanbod_fte'].append(aanbod)
+        reeksen['benodigd_fte'].append(benodigd)
+        reeksen['gap_fte'].append(benodigd - aanbod)
+        instroomadvies.append(resultaat['ben_instroom_sc6_midden_a'][:, tot_jaar][:, -1])
+
+        n += len(aanbod)
+        gap_eind = np.concatenate([g[:, -1] for g in reeksen['gap_fte']])
+        breedte = percentiel_ci_breedte(gap_eind)
+        if (n >= min_samples and breedte <= doel_breedte) or n >= max_samples or not verdelingen:
+            break
+
+    def banden(x):
+        return {f'p{p}': waarden.tolist() for p, waarden in zip(PERCENTIELEN, np.percentile(x, PERCENTIELEN, axis=0))}
+
+    reeksen = {naam: np.concatenate(delen) for naam, delen in reeksen.items()}
+    return {
+        'jaren': jaren[tot_jaar].astype(int).tolist(),
+        'banden': {naam: banden(x) for naam, x in reeksen.items()},
+        'evenwichtsjaar': {
+            'jaar': int(jaren[tot_jaar][-1]),
+            'gap_fte': banden(reeksen['gap_fte'][:, -1]),
+            'instroomadvies': banden(np.concatenate(instroomadvies)),
+        },
+        'samples': n,
+        'ci_breedte': breedte,
+        'converged': breedte <= doel_breedte,
+    }
@@ -0,0 +1,252 @@
+"""
+Gedeelde, persistente tweede cache laag (L2) op basis van SQLite.
+
+Gunicorn draait meerdere workers, elk met een eigen in-memory cache (L1):
+zonder L2 rekent elke worker hetzelfde scenario opnieuw uit en begint elke
+redeploy koud. Deze cache staat in één SQLite bestand op lokale schijf:
+
+- Gedeeld door alle workers op de host (WAL mode: lezers blokkeren niet)
+- Overleeft herstarts (bestand op een volume, zie L2_CACHE_PATH)
+- Waarden zijn compacte bytes (CompacteProjectie.naar_bytes()); keys bevatten
+  de dataset/engine namespace, dus een nieuwe CSV geeft nieuwe keys
+- Begrensd op bytes: de minst recent gebruikte entries worden verwijderd
+- Eén connectie per thread per proces (connecties overleven geen fork)
+- Leases (claim/release) zodat maar één worker een scenario berekent terwijl
+  de andere op het resultaat in L2 wachten (single-flight tussen workers)
+"""
+
+import os
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Na zoveel puts per proces wordt de bytegrens gecontroleerd
+OPRUIM_INTERVAL = 50
+
+# Bij opruimen terug naar deze fractie van max_bytes (voorkomt opruimen bij elke put)
+OPRUIM_DOEL = 0.9
+
+# Laatst-gebruikt tijdstip bij een hit alleen bijwerken als het ouder is dan dit (seconden)
+AANRAAK_INTERVAL = 60
+
+
+class SQLiteCache:
+    """
+    Key/value cache (str -> bytes) in een SQLite bestand, gedeeld tussen processen.
+
+    Args:
+        path: Pad naar het SQLite bestand (map wordt aangemaakt)
+        max_bytes: Maximale totale grootte van de waarden
+        timeout: Wachttijd in seconden als een ander proces schrijft
+    """
+
+    def __init__(self, path, max_bytes: int, timeout: float = 5.0):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+
+        self._lokaal = threading.local()
+        self._lock = threading.Lock()
+        self._puts = 0
+        self._tellers = {'hits': 0, 'misses': 0, 'evictions': 0, 'errors': 0}
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connectie() as db:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    waarde BLOB NOT NULL,
+                    grootte INTEGER NOT NULL,
+                    laatst_gebruikt REAL NOT NULL
+                )
+            """)
+            db.execute("CREATE INDEX IF NOT EXISTS idx_laatst_gebruikt ON entries (laatst_gebruikt)")
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS bezig (
+                    key TEXT PRIMARY KEY,
+                    pid INTEGER NOT NULL,
+                    sinds REAL NOT NULL
+                )
+            """)
+
+    def _connectie(self) -> sqlite3.Connection:
+        db = getattr(self._lokaal, 'db', None)
+        if db is None or self._lokaal.pid != os.getpid():
+            db = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._lokaal.db, self._lokaal.pid = db, os.getpid()
+        return db
+
+    def _tel(self, teller: str, aantal: int = 1):
+        with self._lock:
+            self._tellers[teller] += aantal
+
+    def _fout(self, actie: str, e: Exception):
+        # L2 is een optimalisatie: een fout (schijf vol, lock timeout) mag een request niet breken
+        self._tel('errors')
+        try:
+            print(f"Warning: L2 cache {actie} faalde: {e}", file=sys.stderr)
+        except (BrokenPipeError, IOError):
+            pass
+
+    def get(self, key: str, tel: bool = True):
+        """Geef de opgeslagen bytes of None bij een miss (of fout); tel=False telt niet mee."""
+        try:
+            db = self._connectie()
+            rij = db.execute("SELECT waarde, laatst_gebruikt FROM entries WHERE key = ?", (key,)).fetchone()
+            if rij is None:
+                if tel:
+                    self._tel('misses')
+                return None
+            nu = time.time()
+            if nu - rij[1] > AANRAAK_INTERVAL:
+                db.execute("UPDATE entries SET laatst_gebruikt = ? WHERE key = ?", (nu, key))
+        except sqlite3.Error as e:
+            self._fout('get', e)
+            return None
+        if tel:
+            self._tel('hits')
+        return rij[0]
+
+    def claim(self, key: str, ttl: float) -> bool:
+        """
+        Neem de lease om `key` te berekenen (atomair tussen processen).
+
+        Args:
+            key: Cache key
+            ttl: Een lease ouder dan dit (seconden) geldt als verlopen (gecrashte worker)
+
+        Returns:
+            bool: True als deze worker moet rekenen; ook bij een fout (liever
+                  dubbel rekenen dan wachten)
+        """
+        try:
+            db = self._connectie()
+            db.execute("DELETE FROM bezig WHERE key = ? AND sinds < ?", (key, time.time() - ttl))
+            return db.execute(
+                "INSERT OR IGNORE INTO bezig (key, pid, sinds) VALUES (?, ?, ?)", (key, os.getpid(), time.time())
+            ).rowcount == 1
+        except sqlite3.Error as e:
+            self._fout('claim', e)
+            return True
+
+    def release(self, key: str):
+        """Geef de lease van deze worker vrij."""
+        try:
+            self._connectie().execute("DELETE FROM bezig WHERE key = ? AND pid = ?", (key, os.getpid()))
+        except sqlite3.Error as e:
+            self._fout('release', e)
+
+    def wacht_op(self, key: str, timeout: float, interval: float = 0.05):
+        """
+        Wacht tot een andere worker `key` in de cache heeft gezet.
+
+        Returns:
+            bytes of None als de lease verdwijnt zonder resultaat (fout bij de
+            andere worker) of na `timeout` seconden
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            data = self.get(key, tel=False)
+            if data is not None:
+                return data
+            try:
+                bezig = self._connectie().execute("SELECT 1 FROM bezig WHERE key = ?", (key,)).fetchone()
+            except sqlite3.Error as e:
+                self._fout('wacht_op', e)
+                return None
+            if bezig is None:
+                return self.get(key, tel=False)  # net klaar, of mislukt
+            time.sleep(interval)
+        return None
+
+    def put(self, key: str, waarde: bytes):
+        """Sla bytes op; waarden groter dan max_bytes worden overgeslagen."""
+        if len(waarde) > self.max_bytes:
+            return
+        try:
+            self._connectie().execute(
+                "INSERT OR REPLACE INTO entries (key, waarde, grootte, laatst_gebruikt) VALUES (?, ?, ?, ?)",
+                (key, waarde, len(waarde), time.time()),
+            )
+        except sqlite3.Error as e:
+            self._fout('put', e)
+            return
+
+        with self._lock:
+            self._puts += 1
+            opruimen = self._puts % OPRUIM_INTERVAL == 0
+        if opruimen:
+            self.ruim_op()
+
+    def ruim_op(self) -> int:
+        """
+        Verwijder de minst recent gebruikte entries als de cache boven max_bytes zit.
+
+        Returns:
+            int: aantal verwijderde entries
+        """
+        try:
+            db = self._connectie()
+            totaal = db.execute("SELECT COALESCE(SUM(grootte), 0) FROM entries").fetchone()[0]
+            if totaal <= self.max_bytes:
+                return 0
+            # Houd de meest recente entries tot OPRUIM_DOEL × max_bytes
+            verwijderd = db.execute("""
+                DELETE FROM entries WHERE key IN (
+                    SELECT key FROM (
+                        SELECT key, SUM(grootte) OVER (ORDER BY laatst_gebruikt DESC, key) AS cumulatief
+                        FROM entries
+                    ) WHERE cumulatief > ?
+                )
+            """, (int(self.max_bytes * OPRUIM_DOEL),)).rowcount
+        except sqlite3.Error as e:
+            self._fout('opruimen', e)
+            return 0
+
+        self._tel('evictions', verwijderd)
+        try:
+            print(f"🗑️  L2 cache eviction: {verwijderd} entries ({totaal / 1e6:.1f}/{self.max_bytes / 1e6:.0f} MB)", file=sys.stderr)
+        except (BrokenPipeError, IOError):
+            pass
+        return verwijderd
+
+    def verwijder_behalve_prefix(self, prefix: str) -> int:
+        """
+        Verwijder alle entries waarvan de key niet met `prefix` begint (oude namespace).
+
+        Returns:
+            int: aantal verwijderde entries
+        """
+        try:
+            return self._connectie().execute(
+                "DELETE FROM entries WHERE substr(key, 1, ?) != ?", (len(prefix), prefix)
+            ).rowcount
+        except sqlite3.Error as e:
+            self._fout('opruimen', e)
+            return 0
+
+    def clear(self):
+        """Verwijder alle entries (voor alle workers) en zet de tellers van dit proces op nul."""
+        try:
+            self._connectie().execute("DELETE FROM entries")
+        except sqlite3.Error as e:
+            self._fout('clear', e)
+        with self._lock:
+            self._tellers = dict.fromkeys(self._tellers, 0)
+
+    def stats(self) -> dict:
+        """Tellers van dit proces plus aantal entries en bytes in het bestand."""
+        try:
+            entries, totaal = self._connectie().execute(
+                "SELECT COUNT(*), COALESCE(SUM(grootte), 0) FROM entries"
+            ).fetchone()
+        except sqlite3.Error as e:
+            self._fout('stats', e)
+            entries, totaal = None, None
+        with self._lock:
+            tellers = dict(self._tellers)
+        return {**tellers, 'entries': entries, 'bytes': totaal, 'max_bytes': self.max_bytes, 'path': str(self.path)}
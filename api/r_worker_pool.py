@@ -0,0 +1,262 @@
+"""
+Pool van warme R workers voor het scenario model.
+
+Elke worker is een langlevend `Rscript r_scripts/scenario_worker.R` proces dat
+tidyverse, de parameter CSV en beschikbaar_aanbod.R eenmalig laadt. Per request
+wordt alleen nog run_scenario_api_v2.R geëvalueerd, zonder opstartkosten van R.
+
+Protocol (zie scenario_worker.R): één regel met tab-gescheiden argumenten
+naar stdin, één regel "OK" of "ERROR<tab>melding" terug op stdout.
+
+- Pool grootte volgt het CPU quotum van de container (cgroup), niet het aantal
+  cores van de host
+- Workers worden pas gestart bij het eerste request (na de gunicorn fork)
+- Een worker wordt vervangen na `max_jobs` opdrachten, bij een crash of timeout
+"""
+
+import os
+import queue
+import select
+import subprocess
+import threading
+from pathlib import Path
+
+
+class RWorkerError(RuntimeError):
+    """Worker proces is gecrasht, reageert niet of spreekt het protocol niet."""
+
+
+def cpu_quotum() -> int:
+    """
+    Bepaal het aantal CPU's dat dit proces daadwerkelijk mag gebruiken.
+
+    Kijkt achtereenvolgens naar cgroup v2 (cpu.max), cgroup v1
+    (cfs_quota_us / cfs_period_us) en de CPU affinity van het proces.
+
+    Returns:
+        Aantal bruikbare CPU's (minimaal 1)
+    """
+    quotum = None
+
+    try:
+        quota, period = Path('/sys/fs/cgroup/cpu.max').read_text().split()
+        if quota != 'max':
+            quotum = int(quota) / int(period)
+    except (OSError, ValueError):
+        try:
+            quota = int(Path('/sys/fs/cgroup/cpu/cpu.cfs_quota_us').read_text())
+            period = int(Path('/sys/fs/cgroup/cpu/cpu.cfs_period_us').read_text())
+            if quota > 0:
+                quotum = quota / period
+        except (OSError, ValueError):
+            pass
+
+    try:
+        beschikbaar = len(os.sched_getaffinity(0))
+    except AttributeError:
+        beschikbaar = os.cpu_count() or 1
+
+    if quotum is not None:
+        beschikbaar = min(beschikbaar, int(quotum))
+
+    return max(1, beschikbaar)
+
+
+class RWorker:
+    """Eén warm R proces dat scenario opdrachten via stdin/stdout afhandelt."""
+
+    def __init__(self, command: list, env: dict = None, opstart_timeout: float = 120):
+        self.command = command
+        self.env = env
+        self.opstart_timeout = opstart_timeout
+        self.jobs = 0
+        self.proc = None
+
+    def start(self):
+        """Start het proces en wacht tot de worker READY meldt."""
+        self.proc = subprocess.Popen(
+            self.command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=None,  # R warnings/fouten direct in de server log
+            text=True,
+            bufsize=1,
+            env=self.env,
+        )
+
+        try:
+            regel = self._lees_regel(self.opstart_timeout)
+        except RWorkerError:
+            self.stop()
+            raise
+        if regel != 'READY':
+            self.stop()
+            raise RWorkerError(f"R worker start niet op (antwoord: {regel!r})")
+
+    @property
+    def alive(self) -> bool:
+        return self.proc is not None and self.proc.poll() is None
+
+    def run(self, args: list, timeout: float):
+        """
+        Voer één scenario uit.
+
+        Args:
+            args: Argumenten voor run_scenario_api_v2.R (incl. output bestand)
+            timeout: Maximale rekentijd in seconden
+
+        Raises:
+            RuntimeError: Als het R script een fout geeft (worker blijft bruikbaar)
+            RWorkerError: Als de worker crasht of niet op tijd antwoordt
+        """
+        if any('\t' in a or '\n' in a for a in args):
+            raise ValueError("R worker argumenten mogen geen tabs of newlines bevatten")
+
+        try:
+            self.proc.stdin.write('\t'.join(args) + '\n')
+            self.proc.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            raise RWorkerError(f"R worker niet bereikbaar: {e}")
+
+        regel = self._lees_regel(timeout)
+        self.jobs += 1
+
+        if regel == 'OK':
+            return
+        if regel.startswith('ERROR\t'):
+            melding = regel.split('\t', 1)[1]
+            raise RuntimeError(f"R script failed: {melding}")
+        raise RWorkerError(f"Onverwacht antwoord van R worker: {regel!r}")
+
+    def _lees_regel(self, timeout: float) -> str:
+        gereed, _, _ = select.select([self.proc.stdout], [], [], timeout)
+        if not gereed:
+            raise RWorkerError(f"R worker reageert niet binnen {timeout}s")
+
+        regel = self.proc.stdout.readline()
+        if not regel:
+            raise RWorkerError(f"R worker gestopt (exit code {self.proc.poll()})")
+        return regel.rstrip('\n')
+
+    def stop(self):
+        """Sluit stdin (worker stopt netjes bij EOF), kill als dat niet lukt."""
+        if self.proc is None:
+            return
+        try:
+            self.proc.stdin.close()
+            self.proc.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            self.proc.kill()
+            self.proc.wait()
+
+
+class RWorkerPool:
+    """
+    Thread-safe pool van warme R workers.
+
+    Een request pakt een vrije worker; zijn alle workers bezet en is de pool
+    vol, dan wacht het request tot er een vrijkomt.
+    """
+
+    def __init__(self, command: list, env: dict = None, size: int = None,
+                 max_jobs: int = 200, opstart_timeout: float = 120):
+        self.command = command
+        self.env = env
+        self.size = size or cpu_quotum()
+        self.max_jobs = max_jobs
+        self.opstart_timeout = opstart_timeout
+
+        self._vrij = queue.LifoQueue()  # LIFO: recent gebruikte (warme) worker eerst
+        self._lock = threading.Lock()
+        self._aantal = 0
+        # Tellers worden vanuit meerdere request threads bijgewerkt: alleen onder self._lock
+        self.stats = {'jobs': 0, 'gestart': 0, 'herstart': 0, 'fouten': 0}
+
+    def run(self, args: list, timeout: float = 120):
+        """
+        Voer één scenario uit op een vrije worker.
+
+        Args:
+            args: Argumenten voor run_scenario_api_v2.R (incl. output bestand)
+            timeout: Maximale wachttijd op een worker plus rekentijd (seconden)
+
+        Raises:
+            RuntimeError: Als het R script faalt
+            RWorkerError: Als er geen worker beschikbaar is of de worker crasht
+        """
+        worker = self._claim(timeout)
+        try:
+            worker.run(args, timeout)
+        except RWorkerError:
+            with self._lock:
+                self.stats['fouten'] += 1
+            worker.stop()
+            worker = None
+            raise
+        finally:
+            self._release(worker)
+            with self._lock:
+                self.stats['jobs'] += 1
+
+    def _claim(self, timeout: float) -> RWorker:
+        # None in de wachtrij = lege plek van een vervangen worker (zie _release)
+        try:
+            worker = self._vrij.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                mag_starten = self._aantal < self.size
+                if mag_starten:
+                    self._aantal += 1
+
+            if mag_starten:
+                worker = None
+            else:
+                try:
+                    worker = self._vrij.get(timeout=timeout)
+                except queue.Empty:
+                    raise RWorkerError(f"Geen R worker vrij binnen {timeout}s")
+
+        if worker is None:
+            worker = RWorker(self.command, self.env, self.opstart_timeout)
+            try:
+                worker.start()
+            except Exception:
+                self._vrij.put(None)  # Plek blijft beschikbaar voor de volgende claim
+                raise
+            with self._lock:
+                self.stats['gestart'] += 1
+        return worker
+
+    def _release(self, worker: RWorker):
+        if worker is not None and worker.alive and worker.jobs < self.max_jobs:
+            self._vrij.put(worker)
+            return
+
+        # Worker versleten of gecrasht: lege plek terug in de wachtrij, zodat ook een
+        # request dat al op een worker wacht wakker wordt en een nieuwe start
+        if worker is not None:
+            worker.stop()
+        with self._lock:
+            self.stats['herstart'] += 1
+        self._vrij.put(None)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                'size': self.size,
+                'actief': self._aantal,
+                'vrij': self._vrij.qsize(),
+                **self.stats,
+            }
+
+    def shutdown(self):
+        """Stop alle vrije workers (bij afsluiten van de server)."""
+        while True:
+            try:
+                worker = self._vrij.get_nowait()
+            except queue.Empty:
+                break
+            if worker is not None:
+                worker.stop()
+            with self._lock:
+                self._aantal -= 1
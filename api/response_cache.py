@@ -0,0 +1,79 @@
+"""
+Voorgeserialiseerde, voorgecomprimeerde response bodies.
+
+Een herhaald scenario hoeft dan niet opnieuw door dataframe_to_projectie_json,
+jsonify en Flask-Compress: de JSON bytes en de gzip/brotli varianten worden bij
+de eerste berekening één keer gemaakt (met de hoogste compressie, want dat
+gebeurt maar één keer per scenario) en daarna ongewijzigd verstuurd.
+
+- Brotli is optioneel (pakket `brotli`, ook een dependency van Flask-Compress)
+- Bodies kleiner dan MIN_GROOTTE worden niet gecomprimeerd (zoals COMPRESS_MIN_SIZE)
+- Flask-Compress slaat responses met een Content-Encoding header over
+"""
+
+import gzip
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli komt mee met flask-compress
+    brotli = None
+
+# Niet comprimeren onder deze grootte (Flask-Compress default)
+MIN_GROOTTE = 500
+
+GZIP_NIVEAU = 9
+BROTLI_KWALITEIT = 11
+
+
+class GecodeerdeResponse:
+    """
+    JSON body plus gecomprimeerde varianten, klaar om te versturen.
+
+    Args:
+        body: JSON bytes (identity)
+        encodings: Content-Encoding -> gecomprimeerde bytes
+    """
+
+    __slots__ = ('body', 'encodings')
+
+    def __init__(self, body: bytes, encodings: dict):
+        self.body = body
+        self.encodings = encodings
+
+    @classmethod
+    def van_json(cls, body: bytes) -> 'GecodeerdeResponse':
+        """
+        Comprimeer een JSON body met alle beschikbare encodings.
+
+        Args:
+            body: Geserialiseerde JSON (zoals app.json.dumps(...).encode())
+
+        Returns:
+            GecodeerdeResponse
+        """
+        encodings = {}
+        if len(body) >= MIN_GROOTTE:
+            if brotli is not None:
+                encodings['br'] = brotli.compress(body, quality=BROTLI_KWALITEIT)
+            encodings['gzip'] = gzip.compress(body, compresslevel=GZIP_NIVEAU, mtime=0)
+        return cls(body, encodings)
+
+    @property
+    def nbytes(self) -> int:
+        """Totale grootte van body en varianten (voor de cache grens)."""
+        return len(self.body) + sum(len(data) for data in self.encodings.values())
+
+    def kies(self, accept_encodings) -> tuple:
+        """
+        Kies de variant die de client accepteert (voorkeur van de client, dan br boven gzip).
+
+        Args:
+            accept_encodings: werkzeug Accept object (request.accept_encodings)
+
+        Returns:
+            (encoding, bytes): encoding is None voor de ongecomprimeerde body
+        """
+        encoding = accept_encodings.best_match(list(self.encodings) + ['identity'], default='identity')
+        if encoding in self.encodings:
+            return encoding, self.encodings[encoding]
+        return None, self.body
@@ -0,0 +1,350 @@
+"""
+Thread-safe LRU cache voor scenario resultaten.
+
+Vervangt de handmatige dict + lijst LRU in scenario_model.py:
+
+- O(1) get/put/eviction via OrderedDict (move_to_end / popitem)
+- Begrensd op gemeten bytes i.p.v. aantal entries (een scenario DataFrame
+  is ~290 kolommen, aanbod arrays zijn veel kleiner)
+- Optionele TTL per entry
+- Eén lock per cache: gunicorn draait meerdere threads per worker; tellers
+  (hits, misses, evictions, expirations) worden onder dezelfde lock bijgewerkt
+- CompacteProjectie: scenario resultaten als read-only kolommen (alleen wat de
+  responses lezen, float32 waar dat de weergegeven precisie niet raakt), zodat
+  een cache hit zonder kopie terug kan en dezelfde MB's meer scenario's bevatten
+"""
+
+import json
+import struct
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+# Responses ronden FTE, aantallen en impact af op 2 decimalen; float32 alleen als
+# die afronding gelijk blijft en de afwijking ruim onder de weergegeven precisie ligt
+WEERGAVE_DECIMALEN = 2
+FLOAT32_TOLERANTIE = 1e-4
+
+# Versie van CompacteProjectie (float32 regel + byte layout van naar_bytes()); komt in de
+# cache namespace, dus ophogen bij een wijziging die gecachte waarden of bytes verandert.
+# 2: float32 check ook op afgeleide totalen, afronding zoals round() (rond_af)
+FORMAAT_VERSIE = 2
+
+
+def rond_af(waarden: np.ndarray, decimalen: int) -> np.ndarray:
+    """
+    Rond af zoals Python round() (dezelfde waarden als de rij-voor-rij serializer).
+
+    np.round vermenigvuldigt, rondt af en deelt terug; op halve waarden zoals
+    863.325 rondt dat soms de andere kant op (863.32 i.p.v. 863.33).
+
+    Args:
+        waarden: Array (een kolom van ~19 jaren, dus de Python loop kost weinig)
+        decimalen: Aantal decimalen
+
+    Returns:
+        np.ndarray: float64
+    """
+    return np.array([round(waarde, decimalen) for waarde in np.asarray(waarden, dtype=np.float64).tolist()],
+                    dtype=np.float64)
+
+
+def _float32_ongewijzigd(origineel: np.ndarray, benaderd: np.ndarray, decimalen: int = WEERGAVE_DECIMALEN) -> bool:
+    """True als `benaderd` (uit float32) binnen FLOAT32_TOLERANTIE ligt en gelijk afrondt."""
+    eindig = np.isfinite(origineel)
+    origineel, benaderd = origineel[eindig], np.asarray(benaderd, dtype=np.float64)[eindig]
+    return bool(np.all(np.abs(benaderd - origineel) <= FLOAT32_TOLERANTIE)
+                and np.array_equal(rond_af(benaderd, decimalen), rond_af(origineel, decimalen)))
+
+
+class CompacteProjectie:
+    """
+    Onveranderlijke, kolom-gesnoeide model output (vervangt een DataFrame kopie in de cache).
+
+    Args:
+        kolommen: kolomnaam -> 1-D array (één waarde per jaar, inclusief 'jaar')
+    """
+
+    __slots__ = ('_kolommen', '_jaren')
+
+    def __init__(self, kolommen: dict):
+        for array in kolommen.values():
+            array.setflags(write=False)
+        self._kolommen = kolommen
+        self._jaren = {int(jaar): i for i, jaar in enumerate(kolommen['jaar'])}
+
+    @classmethod
+    def van_dataframe(cls, df: pd.DataFrame, kolommen: tuple, afgeleid: tuple = ()) -> 'CompacteProjectie':
+        """
+        Bewaar alleen `kolommen` (voor zover aanwezig) uit de model output.
+
+        Float kolommen worden float32 als de afwijking binnen FLOAT32_TOLERANTIE
+        blijft en de afronding op WEERGAVE_DECIMALEN niet verandert; anders
+        (grote waarden zoals FTE totalen) blijven ze float64. Totalen die de
+        responses uit meerdere kolommen berekenen (`afgeleid`) krijgen dezelfde
+        afrondingscheck; verandert zo'n totaal, dan blijven de bronkolommen float64.
+
+        Args:
+            df: DataFrame van R of NumPy model output
+            kolommen: Kolommen die de responses lezen
+            afgeleid: (bronkolommen, functie, decimalen) per berekend totaal,
+                bijv. (('a', 'b'), lambda a, b: a + b, 2)
+
+        Returns:
+            CompacteProjectie
+        """
+        compact = {'jaar': df['jaar'].to_numpy(dtype=np.int16)}
+        origineel = {}
+        for kolom in kolommen:
+            if kolom == 'jaar' or kolom not in df.columns:
+                continue
+            waarden = origineel[kolom] = df[kolom].to_numpy(dtype=np.float64)
+            compact[kolom] = waarden.astype(np.float32) if _float32_ongewijzigd(waarden, waarden.astype(np.float32)) else waarden
+
+        # Terugzetten naar float64 kan een ander totaal met dezelfde bron raken: herhaal tot stabiel
+        gewijzigd = True
+        while gewijzigd:
+            gewijzigd = False
+            for bronnen, functie, decimalen in afgeleid:
+                if not all(bron in compact for bron in bronnen):
+                    continue
+                if all(compact[bron].dtype == np.float64 for bron in bronnen):
+                    continue
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    exact = functie(*(origineel[bron] for bron in bronnen))
+                    benaderd = functie(*(compact[bron].astype(np.float64) for bron in bronnen))
+                if not _float32_ongewijzigd(exact, benaderd, decimalen):
+                    for bron in bronnen:
+                        compact[bron] = origineel[bron]
+                    gewijzigd = True
+        return cls(compact)
+
+    def naar_bytes(self) -> bytes:
+        """
+        Compacte binaire vorm voor de persistente cache (persistent_cache.py).
+
+        Returns:
+            bytes: header lengte (uint32), JSON header [[kolom, dtype], ...], ruwe kolommen
+        """
+        header = json.dumps([[kolom, array.dtype.str] for kolom, array in self._kolommen.items()]).encode()
+        return b''.join([struct.pack('<I', len(header)), header, *(array.tobytes() for array in self._kolommen.values())])
+
+    @classmethod
+    def van_bytes(cls, data: bytes) -> 'CompacteProjectie':
+        """Inverse van naar_bytes(); de kolommen zijn views op `data` (geen kopie)."""
+        (lengte,) = struct.unpack_from('<I', data)
+        header = json.loads(data[4:4 + lengte])
+        dtypes = [np.dtype(dtype) for _, dtype in header]
+        rijen = (len(data) - 4 - lengte) // sum(dtype.itemsize for dtype in dtypes)
+
+        kolommen, offset = {}, 4 + lengte
+        for (kolom, _), dtype in zip(header, dtypes):
+            kolommen[kolom] = np.frombuffer(data, dtype=dtype, count=rijen, offset=offset)
+            offset += rijen * dtype.itemsize
+        return cls(kolommen)
+
+    def __getitem__(self, kolom: str) -> np.ndarray:
+        return self._kolommen[kolom]
+
+    def __contains__(self, kolom: str) -> bool:
+        return kolom in self._kolommen
+
+    def __len__(self) -> int:
+        return len(self._jaren)
+
+    @property
+    def kolommen(self) -> list:
+        """Namen van de bewaarde kolommen."""
+        return list(self._kolommen)
+
+    @property
+    def nbytes(self) -> int:
+        """Geheugengebruik van de kolommen in bytes."""
+        return sum(array.nbytes for array in self._kolommen.values())
+
+    def rij(self, jaar: int) -> dict:
+        """
+        Waarden van één jaar.
+
+        Raises:
+            KeyError: Als het jaar niet in de projectie zit
+        """
+        i = self._jaren[jaar]
+        return {kolom: array[i].item() for kolom, array in self._kolommen.items()}
+
+    def kolom(self, kolom: str, tot_jaar: int = None) -> np.ndarray:
+        """
+        Eén kolom als float64 array (voor berekeningen op hele kolommen).
+
+        Args:
+            kolom: Kolomnaam
+            tot_jaar: Alleen jaren tot en met dit jaar
+
+        Raises:
+            KeyError: Als de kolom niet bewaard is
+        """
+        array = self._kolommen[kolom]
+        if tot_jaar is not None:
+            array = array[self._kolommen['jaar'] <= tot_jaar]
+        return array.astype(np.float64)
+
+    def rijen(self, tot_jaar: int = None):
+        """Waarden per jaar (dict per rij), optioneel tot en met `tot_jaar`."""
+        for jaar in self._jaren:
+            if tot_jaar is None or jaar <= tot_jaar:
+                yield self.rij(jaar)
+
+    def __repr__(self) -> str:
+        return f"CompacteProjectie({len(self)} jaren × {len(self._kolommen)} kolommen, {self.nbytes} bytes)"
+
+
+def geschatte_grootte(waarde) -> int:
+    """
+    Schat het geheugengebruik van een cache waarde in bytes.
+
+    Args:
+        waarde: DataFrame, CompacteProjectie, NumPy array, dict/list/tuple daarvan of ander object
+
+    Returns:
+        int: aantal bytes (diep voor DataFrames en containers)
+    """
+    if isinstance(waarde, pd.DataFrame):
+        return int(waarde.memory_usage(index=True, deep=True).sum())
+    if isinstance(waarde, CompacteProjectie):
+        return waarde.nbytes
+    if isinstance(waarde, np.ndarray):
+        # Views (broadcast_to) delen geheugen met hun basis; tel de basis één keer
+        return int(waarde.base.nbytes if isinstance(waarde.base, np.ndarray) else waarde.nbytes)
+    if isinstance(waarde, dict):
+        return sys.getsizeof(waarde) + sum(geschatte_grootte(k) + geschatte_grootte(v) for k, v in waarde.items())
+    if isinstance(waarde, (list, tuple)):
+        return sys.getsizeof(waarde) + sum(geschatte_grootte(v) for v in waarde)
+    return sys.getsizeof(waarde)
+
+
+class LRUCache:
+    """
+    LRU cache begrensd op bytes, met optionele TTL.
+
+    Args:
+        max_bytes: Maximaal totaal geschatte grootte van alle entries
+        ttl: Levensduur van een entry in seconden (None = onbeperkt)
+        max_entries: Optioneel maximaal aantal entries
+        sizeof: Functie die de grootte van een waarde in bytes bepaalt
+        naam: Naam voor log meldingen
+    """
+
+    def __init__(self, max_bytes: int, ttl: float = None, max_entries: int = None,
+                 sizeof=geschatte_grootte, naam: str = 'cache'):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.sizeof = sizeof
+        self.naam = naam
+
+        self._data = OrderedDict()  # key -> (waarde, bytes, verloopt_op)
+        self._lock = threading.RLock()
+        self._bytes = 0
+        self._tellers = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+
+    def get(self, key, default=None, tel: bool = True):
+        """
+        Geef de waarde (en markeer als recent gebruikt) of default bij een miss.
+
+        Met tel=False telt de lookup niet mee in hits/misses (tweede controle
+        binnen hetzelfde request, zie single-flight in scenario_model).
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[2] is not None and entry[2] <= time.monotonic():
+                self._verwijder(key)
+                self._tellers['expirations'] += 1
+                entry = None
+            if entry is None:
+                if tel:
+                    self._tellers['misses'] += 1
+                return default
+            self._data.move_to_end(key)
+            if tel:
+                self._tellers['hits'] += 1
+            return entry[0]
+
+    def put(self, key, waarde):
+        """
+        Sla een waarde op en verwijder de minst recent gebruikte entries tot de cache past.
+
+        Een waarde groter dan max_bytes wordt niet opgeslagen.
+        """
+        grootte = self.sizeof(waarde)
+        if grootte > self.max_bytes:
+            return
+        verloopt_op = time.monotonic() + self.ttl if self.ttl else None
+
+        with self._lock:
+            if key in self._data:
+                self._verwijder(key)
+            self._data[key] = (waarde, grootte, verloopt_op)
+            self._bytes += grootte
+
+            evictions = 0
+            while self._bytes > self.max_bytes or (self.max_entries and len(self._data) > self.max_entries):
+                oudste = next(iter(self._data))
+                self._verwijder(oudste)
+                evictions += 1
+            self._tellers['evictions'] += evictions
+            bytes_na_eviction = self._bytes  # Na de lock kan een andere thread _bytes al veranderen
+
+        if evictions:
+            try:
+                print(f"🗑️  {self.naam} eviction: {evictions} entries ({bytes_na_eviction / 1e6:.1f}/{self.max_bytes / 1e6:.0f} MB)", file=sys.stderr)
+            except (BrokenPipeError, IOError):
+                pass
+
+    def _verwijder(self, key):
+        _, grootte, _ = self._data.pop(key)
+        self._bytes -= grootte
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and (entry[2] is None or entry[2] > time.monotonic())
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def verwijder_waar(self, predicaat) -> int:
+        """
+        Verwijder alle entries waarvan de key aan het predicaat voldoet.
+
+        Returns:
+            int: aantal verwijderde entries
+        """
+        with self._lock:
+            keys = [key for key in self._data if predicaat(key)]
+            for key in keys:
+                self._verwijder(key)
+            return len(keys)
+
+    def clear(self, tellers: bool = True):
+        """Leeg de cache (en zet de tellers op nul)."""
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+            if tellers:
+                self._tellers = dict.fromkeys(self._tellers, 0)
+
+    def stats(self) -> dict:
+        """Tellers, aantal entries en bytes (consistente momentopname)."""
+        with self._lock:
+            return {
+                **self._tellers,
+                'entries': len(self._data),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'ttl': self.ttl,
+            }
@@ -0,0 +1,686 @@
+"""
+Scenario Engine - NumPy implementatie van het R model
+===============================================================================
+
+In-process vertaling van run_scenario_api_v2.R + beschikbaar_aanbod.R naar
+NumPy. Alle berekeningen werken op arrays met vorm (scenario's × jaren), zodat
+één aanroep zowel één scenario als een hele batch kan doorrekenen.
+
+De output gebruikt exact dezelfde kolomnamen als de R output, zodat
+dataframe_to_projectie_json() en extract_impact_analysis() ongewijzigd blijven.
+Het R model blijft de referentie: selecteer deze engine via
+SCENARIO_ENGINE=numpy (zie scenario_model.py).
+
+LET OP: de Stata/R eigenaardigheden zijn bewust overgenomen, o.a.:
+- extern rendement jaren 6-9 en 11-14 wordt recursief (niet lineair) opgevuld
+- buitenland extern rendement gebruikt ALTIJD de CSV waarden (de R override
+  schrijft naar `..._1jaartbl` i.p.v. `..._1jaarbl`)
+- vraagcomponent overrides zijn alleen actief als epi_midden is opgegeven
+- uitstroom factors hebben geen effect zolang de absolute uitstroom override
+  actief is (altijd in API mode)
+
+Datum: 2025-11-12
+"""
+
+from functools import lru_cache
+from pathlib import Path
+import os
+
+import numpy as np
+import pandas as pd
+
+# ==================================================================================
+# CONFIGURATIE
+# ==================================================================================
+
+# Aantal rijen per scenario: basisjaar t/m basisjaar + 20 (zoals `jaren <- 21` in R)
+JAREN = 21
+
+# Evenwichtsjaar waarop de API output wordt afgekapt (filter(jaar <= 2043) in R)
+EVENWICHTSJAAR = 2043
+
+# API parameters in de volgorde van _call_r_model_uncached() / commandArgs in R
+API_PARAMETERS = (
+    'instroom', 'fte_vrouw', 'fte_man', 'intern_rendement',
+    'extern_rendement_vrouw_1jaar', 'extern_rendement_vrouw_5jaar',
+    'extern_rendement_vrouw_10jaar', 'extern_rendement_vrouw_15jaar',
+    'extern_rendement_man_1jaar', 'extern_rendement_man_5jaar',
+    'extern_rendement_man_10jaar', 'extern_rendement_man_15jaar',
+    'uitstroom_vrouw_5j', 'uitstroom_man_5j', 'uitstroom_vrouw_10j', 'uitstroom_man_10j',
+    'uitstroom_vrouw_15j', 'uitstroom_man_15j', 'uitstroom_vrouw_20j', 'uitstroom_man_20j',
+    'epi_midden', 'soc_midden', 'vak_midden', 'eff_midden',
+    'hor_midden', 'tijd_midden', 'ver_midden', 'totale_zorgvraag_excl_ATV_midden',
+    'demografie_factor', 'uitstroom_factor_vrouw', 'uitstroom_factor_man',
+    'opleidingsduur',
+)
+
+# Vraagcomponenten die samen overschreven worden (OVERRIDE_VRAAGCOMP in R)
+VRAAG_OVERRIDES = (
+    'epi_midden', 'soc_midden', 'vak_midden', 'eff_midden',
+    'hor_midden', 'tijd_midden', 'ver_midden', 'totale_zorgvraag_excl_ATV_midden',
+)
+
+# Parameters van de vraagkant; bereken_beschikbaar_aanbod() leest ze niet, dus het
+# aanbod hangt alleen af van AANBOD_PARAMETERS (basis voor de aanbod cache)
+VRAAG_PARAMETERS = VRAAG_OVERRIDES + ('demografie_factor',)
+AANBOD_PARAMETERS = tuple(naam for naam in API_PARAMETERS if naam not in VRAAG_PARAMETERS)
+
+_PERIODES = ('vijf', 'tien', 'vijftien', 'twintig')
+_UITSTROOM_JAREN = ('5j', '10j', '15j', '20j')
+_ER_JAREN = ('1jaar', '5jaar', '10jaar', '15jaar')
+
+
+# ==================================================================================
+# PARAMETERS LADEN
+# ==================================================================================
+
+@lru_cache(maxsize=4)
+def _laad_parameters_cached(csv_path: str, versie: tuple) -> dict:
+    params_raw = pd.read_csv(csv_path, sep=';', dtype=str, encoding='utf-8-sig',
+                             keep_default_na=False)
+
+    # Zelfde volgorde als in R: meta, actual, projection (laatste waarde wint)
+    soort = params_raw['actual-projection']
+    params_combined = pd.concat([
+        params_raw[soort == ''],
+        params_raw[soort == 'actual'],
+        params_raw[soort == 'projection'],
+    ])
+
+    raming_2025_numeric = pd.to_numeric(
+        params_combined['raming_2025'].str.replace(',', '.', regex=False),
+        errors='coerce'
+    )
+
+    params_list = {}
+    for var, waarde in zip(params_combined['Variabele'], raming_2025_numeric):
+        # dict behoudt de volgorde van eerste voorkomen, de laatste waarde wint
+        params_list[var] = float(waarde)
+
+    # Buitenland extern rendement aliassen
+    for var in list(params_list):
+        if var.startswith('extern_rendement_') and var.endswith(_ER_JAREN) and \
+                var.split('_')[2] in ('vrouw', 'man'):
+            params_list[f'{var}bl'] = params_list[var]
+
+    params_list['beroepsgroep'] = 'Huisartsen'
+    return params_list
+
+
+def laad_parameters(csv_path) -> dict:
+    """
+    Laad de parameterwaarden CSV zoals run_scenario_api_v2.R dat doet (params_list).
+
+    Het resultaat wordt gememoized op pad + (inode, size, mtime), dus een
+    vervangen CSV wordt automatisch opnieuw ingelezen.
+
+    Args:
+        csv_path: Pad naar de parameterwaarden CSV (DATA_PATH)
+
+    Returns:
+        dict: Variabele -> waarde (raming_2025)
+    """
+    csv_path = Path(csv_path)
+    st = os.stat(csv_path)
+    return dict(_laad_parameters_cached(str(csv_path), (st.st_ino, st.st_size, st.st_mtime_ns)))
+
+
+def _als_array(waarden) -> np.ndarray:
+    """Zet een scalar of lijst (None = NA) om naar een float array met NaN voor NA."""
+    if np.ndim(waarden) == 0:
+        waarden = [waarden]
+    return np.array([np.nan if w is None else w for w in waarden], dtype=float)
+
+
+def pas_api_parameters_toe(basis: dict, scenarios: dict) -> dict:
+    """
+    Overschrijf CSV parameters met API parameters (STAP 1.5 in R).
+
+    Args:
+        basis: params_list uit laad_parameters()
+        scenarios: API parameter -> array met één waarde per scenario (NaN = "NA")
+
+    Returns:
+        dict: params_list met arrays (vorm (S,)) voor overschreven parameters
+    """
+    p = dict(basis)
+    s = {naam: _als_array(scenarios.get(naam)) for naam in API_PARAMETERS}
+
+    # Instroom wordt door de API als integer doorgegeven (str(int(instroom)))
+    p['n_inopleiding_perjaar3'] = np.trunc(s['instroom'])
+
+    # Intern rendement - ALLE drie cohorten
+    for suffix in ('', '2', '3'):
+        p[f'intern_rendement{suffix}'] = s['intern_rendement']
+
+    # FTE - ALLEEN toekomstige perioden (niet _basis)
+    for periode in _PERIODES:
+        p[f'fte_vrouw_basis_{periode}'] = s['fte_vrouw']
+        p[f'fte_man_basis_{periode}'] = s['fte_man']
+
+    # Vraagcomponenten - alleen als epi_midden is opgegeven (OVERRIDE_VRAAGCOMP)
+    override_vraag = ~np.isnan(s['epi_midden'])
+    for naam in VRAAG_OVERRIDES:
+        waarde = np.where(np.isnan(s[naam]), basis[naam], s[naam])
+        p[naam] = np.where(override_vraag, waarde, basis[naam])
+
+    # Uitstroom - altijd absolute waarden (factors worden dan genegeerd)
+    for periode, jaren in zip(_PERIODES, _UITSTROOM_JAREN):
+        p[f'uitstroom_vrouw_basis_{periode}'] = s[f'uitstroom_vrouw_{jaren}']
+        p[f'uitstroom_man_basis_{periode}'] = s[f'uitstroom_man_{jaren}']
+
+    # Demografie factor (alleen midden variant)
+    factor = np.where(np.isnan(s['demografie_factor']), 1.0, s['demografie_factor'])
+    for jaren in (5, 10, 15, 20):
+        p[f'demo_{jaren}_midden'] = basis[f'demo_{jaren}_midden'] * factor
+
+    # Extern rendement - cohort 1, 2 en 3 (buitenland blijft CSV, zie module docstring)
+    for geslacht in ('vrouw', 'man'):
+        for jaren in _ER_JAREN:
+            for suffix in ('', '2', '3'):
+                p[f'extern_rendement_{geslacht}_{jaren}{suffix}'] = s[f'extern_rendement_{geslacht}_{jaren}']
+
+    # Opleidingsduur - ALLE drie cohorten (NA = CSV default)
+    for suffix in ('', '2', '3'):
+        naam = f'opleidingsduur{suffix}'
+        p[naam] = np.where(np.isnan(s['opleidingsduur']), basis[naam], s['opleidingsduur'])
+
+    return p
+
+
+# ==================================================================================
+# HULPFUNCTIES
+# ==================================================================================
+
+def _kolom(p: dict, naam: str) -> np.ndarray:
+    """Parameter als kolomvector (S, 1) zodat hij broadcast tegen (S, jaren)."""
+    return np.asarray(p[naam], dtype=float).reshape(-1, 1)
+
+
+def _interpoleer_5jaars(knopen) -> np.ndarray:
+    """
+    Lineaire interpolatie tussen knopen op t = 0, 5, 10, 15, 20.
+
+    Equivalent aan de `lag(x, offset) - ((lag(x, offset) - lead(x, 5 - offset)) / 5) * offset`
+    loops in R (huidig_vrouw/man, fte_vrouw/man, demografie).
+    """
+    k = list(np.broadcast_arrays(*[np.asarray(x, dtype=float).reshape(-1, 1) for x in knopen]))
+    k = np.concatenate(k + [k[-1]], axis=1)
+    t = np.arange(JAREN)
+    blok, offset = t // 5, t % 5
+    laag, hoog = k[:, blok], k[:, blok + 1]
+    return laag - ((laag - hoog) / 5) * offset
+
+
+def _extern_rendement_reeks(er_1, er_5, er_10, er_15) -> np.ndarray:
+    """
+    Extern rendement per jaar sinds afstuderen, exact zoals beschikbaar_aanbod.R.
+
+    Jaren 2-4 lineair tussen 1 en 5, jaren 6-9 en 11-14 recursief op basis
+    van het vorige jaar (lag 1), jaren 16-20 lineaire extrapolatie na 15.
+    """
+    er_1, er_5, er_10, er_15 = np.broadcast_arrays(
+        *[np.asarray(x, dtype=float).reshape(-1) for x in (er_1, er_5, er_10, er_15)]
+    )
+    e = np.full((er_1.shape[0], JAREN), np.nan)
+    e[:, 0], e[:, 1], e[:, 5], e[:, 10], e[:, 15] = 0.0, er_1, er_5, er_10, er_15
+
+    for offset in range(1, 4):
+        e[:, 1 + offset] = e[:, 1] - ((e[:, 1] - e[:, 5]) / 4) * offset
+
+    for blok in (5, 10):
+        for offset in range(1, 5):
+            vorige = e[:, blok + offset - 1]
+            e[:, blok + offset] = vorige - ((vorige - e[:, blok + 5]) / 5) * offset
+
+    for offset in range(1, 6):
+        e[:, 15 + offset] = e[:, 15] - ((e[:, 10] - e[:, 15]) / 5) * offset
+
+    return e
+
+
+def extern_rendement_gemiddelde(e: np.ndarray, eindjaar, venster=np.inf) -> np.ndarray:
+    """
+    Gemiddeld extern rendement over een venster van jaren, via prefix sommen.
+
+    Alle injaarx reeksen in beschikbaar_aanbod.R zijn een gemiddelde van e over
+    t = eindjaar - venster + 1 .. eindjaar (t = 0 telt niet mee). Met cumulatieve
+    sommen zijn alle jaren, scenario's en cohorten in O(jaren) te berekenen in
+    plaats van met de kwadratische `for (n in ...)` loops.
+    R tegenhanger: extern_rendement_gemiddelde() in r_scripts/beschikbaar_aanbod.R
+
+    Args:
+        e: Extern rendement reeks (S, jaren)
+        eindjaar: Laatste jaar van het venster, broadcastbaar naar (S, jaren)
+        venster: Maximaal aantal jaren in het venster (np.inf = vanaf t = 1)
+
+    Returns:
+        Array (S, jaren) met het gemiddelde rendement
+    """
+    cumsom = np.concatenate([np.zeros((e.shape[0], 1)), np.cumsum(e[:, 1:], axis=1)], axis=1)
+    s = np.clip(np.asarray(eindjaar, dtype=float), 1, JAREN - 1)
+    lengte = np.minimum(s, venster)
+
+    shape = np.broadcast_shapes(cumsom.shape, s.shape, np.shape(lengte))
+    cumsom = np.broadcast_to(cumsom, shape)
+    eind = np.broadcast_to(s, shape).astype(int)
+    begin = np.broadcast_to(s - lengte, shape).astype(int)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (np.take_along_axis(cumsom, eind, axis=1)
+                - np.take_along_axis(cumsom, begin, axis=1)) / lengte
+
+
+def _injaarx_nuopl(e: np.ndarray, opleidingsduur: np.ndarray) -> np.ndarray:
+    """
+    Gemiddeld extern rendement cohort 1 (extern_rendement_*_injaarx).
+
+    Venster van ceil(opleidingsduur) jaar; bij een niet-gehele opleidingsduur
+    schuift het venster na jaar ceil(opleidingsduur) een jaar op.
+    """
+    t = np.arange(JAREN)[None, :]
+    plafond = np.ceil(opleidingsduur)
+    eindjaar = np.where((opleidingsduur != plafond) & (t > plafond), t - 1, t)
+    return np.where(t == 0, e, extern_rendement_gemiddelde(e, eindjaar, plafond))
+
+
+def _injaarx_tussopl(e: np.ndarray, opleidingsduur2: np.ndarray, bijsturing: np.ndarray) -> np.ndarray:
+    """
+    Gemiddeld extern rendement cohort 2 (extern_rendement_*_injaarx2).
+
+    Venster van `bijsturing` jaar, ceil(opleidingsduur2) jaar verschoven.
+    """
+    t = np.arange(JAREN)[None, :]
+    plafond = np.ceil(opleidingsduur2)
+    return np.where(t <= plafond, 1.0, extern_rendement_gemiddelde(e, t - plafond, bijsturing))
+
+
+def _injaarx_nabijst(e: np.ndarray, opleidingsduur3: np.ndarray, bijsturing: np.ndarray) -> np.ndarray:
+    """
+    Gemiddeld extern rendement cohort 3 (extern_rendement_*_injaarx3).
+
+    Cumulatief gemiddelde, ceil(opleidingsduur3) + bijsturing jaar verschoven.
+    """
+    t = np.arange(JAREN)[None, :]
+    verschuiving = np.ceil(opleidingsduur3) + bijsturing
+    return np.where(t <= verschuiving, 1.0, extern_rendement_gemiddelde(e, t - verschuiving))
+
+
+def _injaarx_buitenland(e: np.ndarray) -> np.ndarray:
+    """Gemiddeld extern rendement buitenland (extern_rendement_*_injaarxbl): cumulatief gemiddelde."""
+    t = np.arange(JAREN)[None, :]
+    return np.where(t == 0, e[:, :1], extern_rendement_gemiddelde(e, t))
+
+
+# ==================================================================================
+# STAP 1-7: BESCHIKBAAR AANBOD
+# ==================================================================================
+
+def bereken_beschikbaar_aanbod(p: dict) -> dict:
+    """
+    Bereken beschikbaar aanbod (vertaling van bereken_beschikbaar_aanbod() in R).
+
+    Args:
+        p: params_list (scalars of (S,) arrays per parameter)
+
+    Returns:
+        dict: kolomnaam -> array (S, jaren) in dezelfde volgorde als de R output
+    """
+    k = lambda naam: _kolom(p, naam)
+    data = {}
+    t = np.arange(JAREN, dtype=float)[None, :]
+
+    basisjaar = k('basisjaar')
+    bijsturing = k('bijsturingsjaar') - basisjaar
+
+    # Stap 1: Huidige groep werkzame personen
+    for geslacht, aandeel in (('vrouw', k('per_vrouw_basis')), ('man', 1 - k('per_vrouw_basis'))):
+        basis = k('aanbod_personen') * aandeel
+        data[f'huidig_{geslacht}'] = _interpoleer_5jaars(
+            [basis] + [basis - basis * k(f'uitstroom_{geslacht}_basis_{periode}') for periode in _PERIODES]
+        )
+    data['huidig_totaal'] = data['huidig_vrouw'] + data['huidig_man']
+
+    # Stap 2: Groep in opleiding in basisjaar
+    duur = k('opleidingsduur')
+    for geslacht in ('vrouw', 'man'):
+        aandeel = k('per_vrouw_opleiding') if geslacht == 'vrouw' else 1 - k('per_vrouw_opleiding')
+        e = _extern_rendement_reeks(*[k(f'extern_rendement_{geslacht}_{jaren}') for jaren in _ER_JAREN])
+        injaarx = _injaarx_nuopl(e, duur)
+        data[f'extern_rendement_{geslacht}'] = e
+        data[f'extern_rendement_{geslacht}_injaarx'] = injaarx
+        data[f'n_{geslacht}_uit_nuopl'] = np.where(
+            t <= duur,
+            k('n_inopleiding_perjaar') * aandeel * k('intern_rendement') * t * injaarx,
+            k('n_inopleiding_perjaar') * aandeel * k('intern_rendement') * duur * injaarx
+        )
+    data['n_totaal_uit_nuopl'] = data['n_vrouw_uit_nuopl'] + data['n_man_uit_nuopl']
+
+    # Stap 3: Groep in opleiding tot 1e bijsturingsjaar
+    duur2 = k('opleidingsduur2')
+    for geslacht in ('vrouw', 'man'):
+        aandeel = k('per_vrouw_opleiding2') if geslacht == 'vrouw' else 1 - k('per_vrouw_opleiding2')
+        e = _extern_rendement_reeks(*[k(f'extern_rendement_{geslacht}_{jaren}2') for jaren in _ER_JAREN])
+        injaarx2 = _injaarx_tussopl(e, duur2, bijsturing)
+        data[f'extern_rendement_{geslacht}2'] = e
+        data[f'extern_rendement_{geslacht}_injaarx2'] = injaarx2
+
+        basis = k('n_inopleiding_perjaar2') * aandeel * k('intern_rendement2')
+        na_opleiding = t - duur2
+        data[f'n_{geslacht}_uit_tussopl'] = np.select(
+            [(na_opleiding > 0) & (na_opleiding < bijsturing),
+             na_opleiding >= bijsturing,
+             na_opleiding <= 0],
+            [basis * na_opleiding * injaarx2,
+             basis * bijsturing * injaarx2,
+             basis * 0 * injaarx2],
+            default=0.0
+        )
+    data['n_totaal_uit_tussopl'] = data['n_vrouw_uit_tussopl'] + data['n_man_uit_tussopl']
+
+    # Stap 4: Groep in opleiding vanaf het 1e bijsturingsjaar
+    duur3 = k('opleidingsduur3')
+    for geslacht in ('vrouw', 'man'):
+        aandeel = k('per_vrouw_opleiding3') if geslacht == 'vrouw' else 1 - k('per_vrouw_opleiding3')
+        e = _extern_rendement_reeks(*[k(f'extern_rendement_{geslacht}_{jaren}3') for jaren in _ER_JAREN])
+        injaarx3 = _injaarx_nabijst(e, duur3, bijsturing)
+        data[f'extern_rendement_{geslacht}3'] = e
+        data[f'extern_rendement_{geslacht}_injaarx3'] = injaarx3
+
+        basis = k('n_inopleiding_perjaar3') * aandeel * k('intern_rendement3')
+        data[f'n_{geslacht}_nabijst'] = np.where(
+            (t - bijsturing - duur3) < 0,
+            basis * 0 * injaarx3,
+            basis * (t - duur3 - bijsturing) * injaarx3
+        )
+    data['n_totaal_nabijst'] = data['n_vrouw_nabijst'] + data['n_man_nabijst']
+
+    # Stap 5: Instroom vanuit het buitenland
+    for geslacht in ('vrouw', 'man'):
+        aandeel = k('per_vrouw_buitenland') if geslacht == 'vrouw' else 1 - k('per_vrouw_buitenland')
+        e = _extern_rendement_reeks(*[k(f'extern_rendement_{geslacht}_{jaren}bl') for jaren in _ER_JAREN])
+        injaarxbl = _injaarx_buitenland(e)
+        data[f'extern_rendement_{geslacht}bl'] = e
+        data[f'extern_rendement_{geslacht}_injaarxbl'] = injaarxbl
+        data[f'n_{geslacht}_buitenland'] = k('n_buitenland') * aandeel * t * injaarxbl
+    data['n_totaal_buitenland'] = data['n_vrouw_buitenland'] + data['n_man_buitenland']
+
+    # Stap 6: Totaal beschikbare aanbod
+    for geslacht in ('vrouw', 'man'):
+        data[f'fte_{geslacht}'] = _interpoleer_5jaars(
+            [k(f'fte_{geslacht}_basis')] + [k(f'fte_{geslacht}_basis_{periode}') for periode in _PERIODES]
+        )
+
+    for geslacht, meervoud in (('vrouw', 'vrouwen'), ('man', 'mannen')):
+        data[f'n_{meervoud}'] = (data[f'huidig_{geslacht}'] + data[f'n_{geslacht}_uit_nuopl'] +
+                                 data[f'n_{geslacht}_uit_tussopl'] + data[f'n_{geslacht}_nabijst'] +
+                                 data[f'n_{geslacht}_buitenland'])
+    data['n_totaal'] = data['n_vrouwen'] + data['n_mannen']
+    data['n_totaal_check'] = (data['huidig_totaal'] + data['n_totaal_uit_nuopl'] + data['n_totaal_uit_tussopl'] +
+                              data['n_totaal_nabijst'] + data['n_totaal_buitenland'])
+
+    data['fte_vrouwen'] = data['n_vrouwen'] * data['fte_vrouw']
+    data['fte_mannen'] = data['n_mannen'] * data['fte_man']
+    data['fte_totaal'] = data['fte_mannen'] + data['fte_vrouwen']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        data['fte_gem'] = data['fte_totaal'] / data['n_totaal']
+        data['aandeel_vrouwen'] = data['n_vrouwen'] / data['n_totaal']
+        data['groei_fte'] = np.where(t >= 1, (1 - (data['fte_totaal'][:, :1] / data['fte_totaal'])) * 100, np.nan)
+
+    # Stap 7: Totaal aantal in opleiding
+    n1, n2, n3 = k('n_inopleiding_perjaar'), k('n_inopleiding_perjaar2'), k('n_inopleiding_perjaar3')
+    data['inopl_nu'] = np.where(t <= duur, (n1 * duur) - (n1 * t), 0.0)
+    data['inopl_tussen'] = np.select(
+        [t == 0,
+         t <= bijsturing,
+         t < duur2,
+         (t > bijsturing) & (t <= (bijsturing + duur2))],
+        [0.0,
+         n2 * t,
+         n2 * t,
+         (n2 * bijsturing) - (n2 * (t - duur2))],
+        default=0.0
+    )
+    data['inopl_straks'] = np.select(
+        [t <= bijsturing, (t - bijsturing) <= duur3, (t - bijsturing) > duur3],
+        [0.0, n3 * (t - bijsturing), n3 * duur3],
+        default=0.0
+    )
+    data['inopl_totaal'] = data['inopl_nu'] + data['inopl_tussen'] + data['inopl_straks']
+
+    return data
+
+
+# ==================================================================================
+# STAP 2-4.5: VRAAG, BENODIGDE INSTROOM EN IMPACTANALYSE
+# ==================================================================================
+
+def bereken_vraag_en_impact(p: dict, aanbod: dict) -> dict:
+    """
+    Bereken scenario 1/6 vraag, benodigde instroom en impactanalyse (STAP 2-4.5 in R).
+
+    Args:
+        p: params_list (scalars of (S,) arrays per parameter)
+        aanbod: output van bereken_beschikbaar_aanbod()
+
+    Returns:
+        dict: nieuwe kolommen -> array (S, jaren) in R volgorde
+    """
+    k = lambda naam: _kolom(p, naam)
+    data = {}
+    t = np.arange(JAREN, dtype=float)[None, :]
+
+    fte_totaal = aanbod['fte_totaal']
+    fte_man, fte_vrouw = aanbod['fte_man'], aanbod['fte_vrouw']
+    fte_basis = fte_totaal[:, :1]
+    n3 = k('n_inopleiding_perjaar3')
+
+    # STAP 2: Scenario 1 (hulpvariabelen, demografie, groei)
+    trendjaren = k('trendjaar') - k('basisjaar')
+    data['trend_t'] = np.broadcast_to(np.where(t < trendjaren, t, trendjaren), fte_totaal.shape)
+    data['trend_d'] = np.broadcast_to(t, fte_totaal.shape)
+    data['fte_toekomst'] = aanbod['n_man_nabijst'] * fte_man + aanbod['n_vrouw_nabijst'] * fte_vrouw
+    data['fte_zonder_toekomst'] = fte_totaal - data['fte_toekomst']
+
+    varianten = ('laag', 'midden', 'hoog')
+    for variant in varianten:
+        data[f'demografie_{variant}'] = _interpoleer_5jaars(
+            [0.0] + [k(f'demo_{jaren}_{variant}') for jaren in (5, 10, 15, 20)]
+        )
+    for variant in varianten:
+        data[f'scen1_groei_{variant}'] = (1 + k(f'onv_vraag_{variant}')) * (1 + data[f'demografie_{variant}']) - 1
+    for variant in varianten:
+        data[f'scen1_fte_{variant}'] = fte_basis * (1 + data[f'scen1_groei_{variant}'])
+
+    # STAP 3: Scenario 6 (multiplicatief model)
+    for variant in varianten:
+        niet_demo = (((1 / (1 - k(f'tijd_{variant}'))) - 1) + k(f'epi_{variant}') + k(f'soc_{variant}') +
+                     k(f'vak_{variant}') + k(f'eff_{variant}') + k(f'hor_{variant}') + k(f'ver_{variant}'))
+        data[f'scen6_groei_{variant}_a'] = ((1 + niet_demo * data['trend_t']) *
+                                            (1 + data[f'demografie_{variant}']) *
+                                            (1 + k(f'onv_vraag_{variant}'))) - 1
+    for variant in varianten:
+        data[f'scen6_fte_{variant}_a'] = fte_basis * (1 + data[f'scen6_groei_{variant}_a'])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for variant in varianten:
+            data[f'scen6_tekort_{variant}_a'] = fte_totaal / data[f'scen6_fte_{variant}_a'] - 1
+
+        # STAP 4: Benodigde instroom
+        for variant in varianten:
+            data[f'sc6_ftetekort_{variant}_a'] = data[f'scen6_fte_{variant}_a'] - fte_totaal
+            data[f'ben_instroom_sc6_{variant}_a'] = n3 + data[f'sc6_ftetekort_{variant}_a'] / data['fte_toekomst'] * n3
+
+        # STAP 4.5: Impactanalyse
+        data['fte_start'] = np.broadcast_arrays(fte_basis, fte_totaal)[0]
+        data['fte_nabijst'] = aanbod['n_man_nabijst'] * fte_man + aanbod['n_vrouw_nabijst'] * fte_vrouw
+
+        onv_vraag = k('onv_vraag_midden')
+        demografie = data['demografie_midden']
+        schaal = data['fte_start'] * (1 + onv_vraag) * n3 / data['fte_nabijst']
+
+        data['impact_demo_midden'] = demografie * (data['fte_start'] * (1 + onv_vraag)) * n3 / data['fte_nabijst']
+        for factor in ('epi', 'soc', 'vak', 'eff', 'hor'):
+            for trend in ('t', 'd'):
+                data[f'impact_{factor}_midden_{trend}'] = (
+                    (data[f'trend_{trend}'] * k(f'{factor}_midden') * (1 + demografie)) * schaal
+                )
+        data['atv_effect'] = np.broadcast_arrays((1 / (1 - k('tijd_midden'))) - 1, fte_totaal)[0]
+        for trend in ('t', 'd'):
+            data[f'impact_atv_midden_{trend}'] = (data[f'trend_{trend}'] * data['atv_effect'] * (1 + demografie)) * schaal
+        for trend in ('t', 'd'):
+            data[f'impact_ver_midden_{trend}'] = (data[f'trend_{trend}'] * k('ver_midden') * (1 + demografie)) * schaal
+
+        data['impact_ovv_midden'] = onv_vraag * data['fte_start'] * n3 / data['fte_nabijst']
+        data['impact_uitstroom'] = ((data['fte_start'] - (aanbod['huidig_man'] * fte_man + aanbod['huidig_vrouw'] * fte_vrouw)) *
+                                    n3 / data['fte_nabijst'])
+        for cohort, naam in (('uit_nuopl', 'nuinopl'), ('uit_tussopl', 'tussenopl'), ('buitenland', 'buitenland')):
+            data[f'impact_{naam}'] = -((aanbod[f'n_man_{cohort}'] * fte_man + aanbod[f'n_vrouw_{cohort}'] * fte_vrouw) *
+                                       n3 / data['fte_nabijst'])
+
+    # Totalen per scenario
+    with np.errstate(invalid='ignore'):
+        basis_impact = (data['impact_uitstroom'] + data['impact_nuinopl'] + data['impact_tussenopl'] +
+                        data['impact_buitenland'] + data['impact_ovv_midden'] + data['impact_demo_midden'])
+        trend_t = sum(data[f'impact_{f}_midden_t'] for f in ('epi', 'soc', 'vak', 'eff', 'hor'))
+        trend_d = sum(data[f'impact_{f}_midden_d'] for f in ('epi', 'soc', 'vak', 'eff', 'hor'))
+        data['totaal_impact_sc1_midden'] = basis_impact
+        data['totaal_impact_sc2_midden'] = basis_impact + trend_t
+        data['totaal_impact_sc3_midden'] = basis_impact + trend_d
+        data['totaal_impact_sc6_midden'] = (basis_impact + trend_t +
+                                            data['impact_atv_midden_t'] + data['impact_ver_midden_t'])
+
+    return data
+
+
+# ==================================================================================
+# PUBLIEKE API
+# ==================================================================================
+
+def bereken_aanbod(csv_path, scenarios: dict) -> dict:
+    """
+    Stap 1 apart: alleen het beschikbaar aanbod (hergebruik bij vraag-only wijzigingen).
+
+    Args:
+        csv_path: Pad naar de parameterwaarden CSV (DATA_PATH)
+        scenarios: API parameters; alleen AANBOD_PARAMETERS worden gebruikt
+
+    Returns:
+        dict: output van bereken_beschikbaar_aanbod() (read-only arrays)
+    """
+    aanbod_params = {naam: scenarios.get(naam) for naam in AANBOD_PARAMETERS}
+    aanbod = bereken_beschikbaar_aanbod(pas_api_parameters_toe(laad_parameters(csv_path), aanbod_params))
+    for waarde in aanbod.values():
+        if isinstance(waarde, np.ndarray):
+            waarde.setflags(write=False)
+    return aanbod
+
+
+def aanbod_dataframe(csv_path, aanbod: dict) -> pd.DataFrame:
+    """
+    Zet het aanbod uit bereken_aanbod() om naar een DataFrame, vóór de vraagkant.
+
+    Voor progressieve responses: het aanbod is stap 1 van het model en kan al
+    getoond worden terwijl vraag en impact nog berekend worden.
+
+    Args:
+        csv_path: Pad naar de parameterwaarden CSV (DATA_PATH)
+        aanbod: output van bereken_aanbod() voor één scenario
+
+    Returns:
+        DataFrame met jaar en de aanbod kolommen, basisjaar t/m evenwichtsjaar
+    """
+    jaar = _kolom(laad_parameters(csv_path), 'basisjaar') + np.arange(JAREN, dtype=float)[None, :]
+    return scenario_dataframe({'jaar': jaar, **aanbod})
+
+
+def bereken_scenarios(csv_path, scenarios: dict, csv_waarden: dict = None, aanbod: dict = None) -> dict:
+    """
+    Bereken een of meer scenario's in één array-berekening.
+
+    Args:
+        csv_path: Pad naar de parameterwaarden CSV (DATA_PATH)
+        scenarios: API parameter -> waarde of lijst waarden (één per scenario, None = CSV default)
+        csv_waarden: Optioneel CSV variabele -> waarde of array (S,), vervangt de
+            CSV waarde vóór de API overrides (bijv. onv_vraag_midden in Monte Carlo)
+        aanbod: Optioneel eerder berekend aanbod (bereken_aanbod()) voor dezelfde
+            AANBOD_PARAMETERS; dan wordt alleen de vraagkant doorgerekend
+
+    Returns:
+        dict: kolomnaam -> array (S, jaren) voor ALLE jaren (basisjaar t/m basisjaar + 20),
+              plus de parameters als (S, 1) kolommen
+    """
+    basis = laad_parameters(csv_path)
+    basis.update(csv_waarden or {})
+    p = pas_api_parameters_toe(basis, scenarios)
+
+    if aanbod is None:
+        aanbod = bereken_beschikbaar_aanbod(p)
+    vraag = bereken_vraag_en_impact(p, aanbod)
+
+    aantal = max(np.size(w) for w in p.values() if not isinstance(w, str))
+    t = np.arange(JAREN, dtype=float)[None, :]
+    jaar = _kolom(p, 'basisjaar') + t
+
+    data = {}
+    for naam, waarde in p.items():
+        if naam in aanbod:
+            # fte_vrouw/fte_man worden in R in-place vervangen door de reeks
+            data[naam] = aanbod[naam]
+        elif not isinstance(waarde, str):
+            data[naam] = _kolom(p, naam)
+    data['jaar'] = jaar
+    data['jaren_sinds_basis'] = jaar - _kolom(p, 'basisjaar')
+    data.update((naam, w) for naam, w in aanbod.items() if naam not in data)
+    data.update(vraag)
+
+    return {naam: np.broadcast_to(w, (aantal, JAREN)) for naam, w in data.items()}
+
+
+def scenario_dataframe(resultaat: dict, index: int = 0) -> pd.DataFrame:
+    """
+    Zet één scenario uit bereken_scenarios() om naar een DataFrame zoals de R output.
+
+    Args:
+        resultaat: output van bereken_scenarios()
+        index: welk scenario
+
+    Returns:
+        DataFrame met projectie basisjaar t/m evenwichtsjaar (filter(jaar <= 2043) in R)
+    """
+    df = pd.DataFrame({naam: w[index] for naam, w in resultaat.items()})
+    df.insert(0, 'beroepsgroep', 'Huisartsen')
+    df['jaar'] = df['jaar'].astype(int)
+    return df[df['jaar'] <= EVENWICHTSJAAR].reset_index(drop=True)
+
+
+def run_scenario(csv_path, aanbod: dict = None, **params) -> pd.DataFrame:
+    """
+    NumPy equivalent van één Rscript run_scenario_api_v2.R aanroep.
+
+    Args:
+        csv_path: Pad naar de parameterwaarden CSV (DATA_PATH)
+        aanbod: Optioneel gecachet aanbod uit bereken_aanbod() voor deze parameters
+        **params: Dezelfde parameters als _call_r_model_uncached() (None = "NA")
+
+    Returns:
+        DataFrame met projectie 2025-2043 en dezelfde kolomnamen als de R output
+    """
+    return scenario_dataframe(bereken_scenarios(csv_path, params, aanbod=aanbod))
+
+
+def run_scenarios(csv_path, param_sets: list) -> list:
+    """
+    Bereken meerdere scenario's in één array-berekening.
+
+    Args:
+        csv_path: Pad naar de parameterwaarden CSV (DATA_PATH)
+        param_sets: Lijst met parameter dicts zoals bij run_scenario() (None = "NA")
+
+    Returns:
+        Lijst DataFrames in dezelfde volgorde als param_sets
+    """
+    if not param_sets:
+        return []
+    scenarios = {naam: [params.get(naam) for params in param_sets] for naam in API_PARAMETERS}
+    resultaat = bereken_scenarios(csv_path, scenarios)
+    return [scenario_dataframe(resultaat, i) for i in range(len(param_sets))]
@@ -12,23 +12,51 @@ Datum: 2025-11-05
 Versie: 3.0 (R Wrapper - Railway Deployment)
 """
 
-from flask import Flask, jsonify, request
+from flask import Flask, jsonify, redirect, request, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from flask_compress import Compress
 import subprocess
+import io
+import numpy as np
 import pandas as pd
 from pathlib import Path
 import tempfile
+import shutil
 import os
 import traceback
 import sys
 import hashlib
 import json
+import math
+import secrets
+import threading
+import time
+import atexit
+from urllib.parse import urlencode
 from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+# Sibling modules importeerbaar maken, ook als gunicorn `api.scenario_model` laadt
+sys.path.insert(0, str(Path(__file__).parent))
+import scenario_engine
+from r_worker_pool import RWorkerPool
+from solver import brent, GeenBracketError
+import monte_carlo
+from dataset_fingerprint import FingerprintService
+from scenario_cache import FORMAAT_VERSIE, CompacteProjectie, LRUCache, rond_af
+from response_cache import GecodeerdeResponse
+from persistent_cache import SQLiteCache
+from warmup import ToegangsLog, WarmUp
+from single_flight import SingleFlight
+from job_store import JobStore, JobStoreVol, JobFout
+import binaire_formaten
+from binaire_formaten import JSON, MSGPACK, ARROW
+from http_cache import maak_etag, etag_match, cache_control
+
 # ==================================================================================
 # CONFIGURATIE
 # ==================================================================================
@@ -37,9 +65,41 @@ from datetime import datetime
 R_SCRIPT_PATH = Path(os.getenv('R_SCRIPT_PATH', "/Users/mgmheck/Library/CloudStorage/OneDrive-Capaciteitsorgaan/040 - 049 HA/047 Capaciteitsplan/Capaciteitsplan 2025-2030/Visuals/Scripts/run_scenario_api_v2.R"))
 DATA_PATH = Path(os.getenv('DATA_PATH', "/Users/mgmheck/Library/CloudStorage/OneDrive-Capaciteitsorgaan/040 - 049 HA/046 Data en analyse/2025-10-22_Parameterwaarden-2010-2013-2016-2019-2025_DEF.csv"))
 
+# Rekenengine bij cache misses:
+# - 'r'     = gevalideerd R model via Rscript (referentie, seconden per scenario)
+# - 'numpy' = in-process NumPy vertaling (scenario_engine.py, milliseconden per scenario)
+SCENARIO_ENGINE = os.getenv('SCENARIO_ENGINE', 'r').lower()
+
+# Warme R worker pool (r_scripts/scenario_worker.R) i.p.v. een Rscript proces per request
+# R_WORKERS=0 → pool grootte volgt het CPU quotum van de container
+R_WORKER_POOL = os.getenv('R_WORKER_POOL', 'true').lower() == 'true'
+R_WORKERS = int(os.getenv('R_WORKERS', 0))
+R_WORKER_MAX_JOBS = int(os.getenv('R_WORKER_MAX_JOBS', 200))
+
+# Cache keys bevatten een fingerprint van dataset + engine code; de watcher pollt de
+# bestanden elke FINGERPRINT_INTERVAL seconden en ruimt oude entries op (0 = geen watcher)
+FINGERPRINT_INTERVAL = float(os.getenv('FINGERPRINT_INTERVAL', 2))
+
+# Uitwisseling R → API: binaire kolommen (CompacteProjectie formaat) in een map in
+# het geheugen (/dev/shm) i.p.v. een CSV met alle tussenkolommen op schijf
+R_OUTPUT_DIR = os.getenv('R_OUTPUT_DIR', '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir())
+
 # Flask app
 app = Flask(__name__)
 
+
+class NumpyJSONProvider(DefaultJSONProvider):
+    """JSON provider die ook NumPy arrays en scalars serialiseert (kolommen formaat, sweep, Monte Carlo)."""
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, (np.ndarray, np.generic)):
+            return binaire_formaten.json_default(o)
+        return DefaultJSONProvider.default(o)
+
+
+app.json = NumpyJSONProvider(app)
+
 # CORS configuratie - specifieke origins voor security
 # Toegepast op ALLE routes (inclusief /health)
 CORS(app, resources={
@@ -58,13 +118,15 @@ CORS(app, resources={
         ],
         "methods": ["GET", "POST", "OPTIONS"],
         "allow_headers": ["Content-Type"],
+        "expose_headers": ["ETag", "Content-Location"],
         "supports_credentials": False,
         "max_age": 3600
     }
 })
 
 # Response compression voor snelere data transfers
-# Compresseert JSON responses met gzip (40-80% kleiner)
+# Compresseert JSON responses met gzip (40-80% kleiner); bodies uit de response
+# cache zijn al gecomprimeerd (Content-Encoding gezet) en worden overgeslagen
 Compress(app)
 
 # Rate limiting configuratie - ruime limieten voor normale usage
@@ -123,15 +185,114 @@ DEFAULT_PARAMS = {
 # CACHE CONFIGURATION
 # ==================================================================================
 
-# Cache size: 100 most recent scenario calculations
-CACHE_SIZE = 500  # Verhoogd van 100 naar 500 voor betere cache hits
+# Scenario cache begrensd op gemeten geheugen i.p.v. aantal entries
+# (een entry is een CompacteProjectie: ~30 kolommen × 19 jaar, zie PROJECTIE_KOLOMMEN)
+CACHE_MAX_BYTES = int(float(os.getenv('CACHE_MAX_MB', 64)) * 1024 * 1024)
+
+# Optionele levensduur van cache entries in seconden (0 = onbeperkt)
+CACHE_TTL = float(os.getenv('CACHE_TTL', 0)) or None
+
+# Aanbod cache (NumPy engine): aanbod arrays per set aanbod parameters, zodat een
+# vraag slider alleen de vraagkant herberekent
+AANBOD_CACHE_MAX_BYTES = 16 * 1024 * 1024
+
+# Monte Carlo resultaten (alleen met seed van de client)
+MONTE_CARLO_CACHE_SIZE = 20
+MONTE_CARLO_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+# Response cache: kant-en-klare JSON bodies plus gzip/brotli varianten per request
+# (/api/scenario, /api/baseline), zodat een herhaald scenario zonder serialisatie
+# en compressie verstuurd wordt
+RESPONSE_CACHE_MAX_BYTES = int(float(os.getenv('RESPONSE_CACHE_MAX_MB', 32)) * 1024 * 1024)
+
+# HTTP caching van GET responses (http_cache.py): browser en edge gebruiken een response
+# HTTP_MAX_AGE seconden zonder request, daarna hervalideren ze met de ETag (304).
+# Na een nieuwe dataset verandert de ETag, dus dit bepaalt hoe lang oude data zichtbaar blijft
+HTTP_MAX_AGE = int(os.getenv('HTTP_MAX_AGE', 300))
+HTTP_STALE_WHILE_REVALIDATE = int(os.getenv('HTTP_STALE_WHILE_REVALIDATE', 3600))
+
+# Thread-safe LRU caches (scenario_cache.py); hits/misses/evictions tellen ze zelf
+_scenario_cache = LRUCache(CACHE_MAX_BYTES, ttl=CACHE_TTL, naam='Scenario cache')
+_response_cache = LRUCache(RESPONSE_CACHE_MAX_BYTES, ttl=CACHE_TTL, sizeof=lambda r: r.nbytes,
+                           naam='Response cache')
+_aanbod_cache = LRUCache(AANBOD_CACHE_MAX_BYTES, ttl=CACHE_TTL, naam='Aanbod cache')
+_monte_carlo_cache = LRUCache(MONTE_CARLO_CACHE_MAX_BYTES, ttl=CACHE_TTL,
+                              max_entries=MONTE_CARLO_CACHE_SIZE, naam='Monte Carlo cache')
+
+_tijdelijke_map = None
+
+
+def _proces_tijdelijk_pad(naam: str) -> Path:
+    """
+    Pad in een tijdelijke map van dit proces, opgeruimd bij afsluiten.
+
+    Voor SQLite bestanden (toegangslog, job store) als er geen L2_CACHE_PATH is:
+    lokale runs en de tests delen dan geen bestanden in /tmp die blijven staan.
+
+    Args:
+        naam: Bestandsnaam
+
+    Returns:
+        Path
+    """
+    global _tijdelijke_map
+    if _tijdelijke_map is None:
+        _tijdelijke_map = tempfile.mkdtemp(prefix='huisartsen_scenario_')
+        eigenaar = os.getpid()
+        # Alleen het proces dat de map maakte ruimt op (geforkte gunicorn workers erven atexit)
+        atexit.register(lambda: os.getpid() == eigenaar and shutil.rmtree(_tijdelijke_map, ignore_errors=True))
+    return Path(_tijdelijke_map) / naam
+
+
+# Gedeelde, persistente L2 cache (SQLite) voor alle gunicorn workers op de host.
+# Overleeft herstarts als het pad op een volume staat; leeg of niet gezet = uit
+# (de Docker image zet hem aan)
+L2_CACHE_PATH = os.getenv('L2_CACHE_PATH', '')
+L2_CACHE_MAX_BYTES = int(float(os.getenv('L2_CACHE_MAX_MB', 256)) * 1024 * 1024)
+
+_l2_cache = None
+if L2_CACHE_PATH:
+    try:
+        _l2_cache = SQLiteCache(L2_CACHE_PATH, L2_CACHE_MAX_BYTES)
+    except Exception as e:
+        print(f"Warning: L2 cache ({L2_CACHE_PATH}) niet beschikbaar, alleen in-memory cache: {e}", file=sys.stderr)
+
+# Single-flight: identieke gelijktijdige scenario's één keer berekenen (single_flight.py).
+# Tussen workers via een lease in de L2 cache; wachten duurt hooguit de R timeout + marge
+_single_flight = SingleFlight()
+SINGLE_FLIGHT_TIMEOUT = 130
+
+# Cache warm-up bij het opstarten (warmup.py): baseline, sliderstappen naast de
+# defaults en de meest gevraagde scenario's. Standaard uit; de Docker image zet hem aan
+WARMUP = os.getenv('WARMUP', 'false').lower() == 'true'
+WARMUP_STAPPEN = int(os.getenv('WARMUP_STAPPEN', 1))  # sliderstappen aan weerszijden van de default
+WARMUP_TOP_N = int(os.getenv('WARMUP_TOP_N', 50))
+WARMUP_LOG_PATH = os.getenv('WARMUP_LOG_PATH', str(
+    Path(L2_CACHE_PATH).with_name('scenario_toegang.sqlite') if L2_CACHE_PATH
+    else _proces_tijdelijk_pad('scenario_toegang.sqlite')
+))
+WARMUP_RUST = 1.0    # seconden zonder live request voordat de warm-up verder rekent
+WARMUP_PAUZE = 0.05  # seconden tussen twee warm-up scenario's
+
+# Asynchrone jobs (job_store.py): zware berekeningen buiten de gunicorn request threads.
+# Het SQLite bestand is gedeeld, zodat elke worker de status van een job kan geven
+# Zonder L2 cache per proces (lokaal, tests); meerdere workers zonder L2 hebben JOB_STORE_PATH nodig
+JOB_STORE_PATH = os.getenv('JOB_STORE_PATH', str(
+    Path(L2_CACHE_PATH).with_name('scenario_jobs.sqlite') if L2_CACHE_PATH
+    else _proces_tijdelijk_pad('scenario_jobs.sqlite')
+))
+JOB_MAX = int(os.getenv('JOB_MAX', 200))      # jobs in de store (lopend + afgerond)
+JOB_TTL = float(os.getenv('JOB_TTL', 600))    # seconden dat een resultaat opvraagbaar blijft
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', 2))  # job threads per gunicorn worker
+
+_job_store = None
+try:
+    _job_store = JobStore(JOB_STORE_PATH, max_jobs=JOB_MAX, ttl=JOB_TTL, workers=JOB_WORKERS, fout_details=DEBUG)
+except Exception as e:
+    print(f"Warning: job store ({JOB_STORE_PATH}) niet beschikbaar, /api/jobs uit: {e}", file=sys.stderr)
 
 # Cache statistics tracking
 cache_stats = {
-    'hits': 0,
-    'misses': 0,
-    'total_requests': 0,
-    'cache_size': 0,
     'started_at': datetime.now().isoformat()
 }
 
@@ -183,6 +344,16 @@ VALIDATION_RULES = {
     'uitstroom_factor_man': (0.0, 0.8, 'Uitstroom factor man moet tussen 0.0 en 0.8 zijn (0% tot 80%)'),
 }
 
+# Maximaal aantal scenario's per /api/scenarios/batch request
+BATCH_MAX_SCENARIOS = 100
+
+# Maximaal aantal cellen (x × y) per /api/sweep en scenario's per array-berekening
+SWEEP_MAX_CELLEN = 10000
+SWEEP_BLOK = 2000
+
+# Monte Carlo (/api/montecarlo): bovengrens aantal trekkingen
+MONTE_CARLO_MAX_SAMPLES = 200000
+
 def validate_parameters(data: dict) -> tuple[bool, str]:
     """
     Valideer parameters volgens VALIDATION_RULES config.
@@ -202,20 +373,229 @@ def validate_parameters(data: dict) -> tuple[bool, str]:
 
     return True, None
 
+
+# Parameters zonder waarde in de request → None (= CSV default in het R model)
+OPTIONAL_PARAMS = (
+    'epi_midden', 'soc_midden', 'vak_midden', 'eff_midden',
+    'hor_midden', 'tijd_midden', 'ver_midden', 'totale_zorgvraag_excl_ATV_midden',
+    'demografie_factor', 'uitstroom_factor_vrouw', 'uitstroom_factor_man',
+)
+
+
+def parse_scenario_params(data: dict) -> dict:
+    """
+    Lees de modelparameters uit een request body.
+
+    Aanbod, extern rendement en uitstroom vallen terug op DEFAULT_PARAMS,
+    vraagcomponenten en factors op None (CSV default in het R model).
+
+    Args:
+        data: JSON body van /api/scenario (of één scenario uit een batch)
+
+    Returns:
+        dict: keyword arguments voor call_r_model()
+    """
+    params = {
+        naam: data.get(naam, default)
+        for naam, default in DEFAULT_PARAMS.items()
+        if naam not in OPTIONAL_PARAMS
+    }
+    params.update({naam: data.get(naam, None) for naam in OPTIONAL_PARAMS})
+    return params
+
+
+# Resolutie per parameter in model eenheden = kleinste slider stap in de frontend
+# (parameterConfig.ts, ScenarioModelAPI.tsx); instroom is al geheel (str(int()) richting R)
+SLIDER_STAPPEN = {
+    'intern_rendement': 0.01,
+    'opleidingsduur': 0.1,
+    'fte_vrouw': 0.01,
+    'fte_man': 0.01,
+    **{f'extern_rendement_{g}_{j}': 0.001 for g in ('vrouw', 'man') for j in ('1jaar', '5jaar', '10jaar', '15jaar')},
+    **{f'uitstroom_{g}_{j}': 0.001 for g in ('vrouw', 'man') for j in ('5j', '10j', '15j', '20j')},
+    **{naam: 0.0001 for naam in scenario_engine.VRAAG_OVERRIDES},  # 0.01%
+    'demografie_factor': 0.001,
+}
+
+# Parameters zonder effect in API mode: de absolute uitstroom override is altijd actief
+GENEGEERDE_PARAMS = ('uitstroom_factor_vrouw', 'uitstroom_factor_man')
+
+
+def snap_waarde(parameter: str, waarde):
+    """
+    Rond een waarde af op de slider stap van de parameter (0.7200000001 → 0.72).
+
+    Args:
+        parameter: Parameter naam
+        waarde: Waarde (None en parameters zonder slider stap blijven ongewijzigd)
+
+    Returns:
+        Afgeronde waarde
+    """
+    stap = SLIDER_STAPPEN.get(parameter)
+    if stap is None or waarde is None or isinstance(waarde, bool):
+        return waarde
+    # floor(x + 0.5) i.p.v. round(): geen banker's rounding op het midden tussen twee
+    # stappen; de 1e-9 vangt deling ruis op (0.745 / 0.01 = 74.49999999999999)
+    return round(math.floor(waarde / stap + 0.5 + 1e-9) * stap, 10)
+
+
+def canonicalize_params(params: dict, exact: tuple = ()) -> dict:
+    """
+    Canonieke parameterset: parametersets met dezelfde uitkomst worden gelijk.
+
+    Het model rekent met de canonieke set, dus de cache key en het resultaat
+    horen altijd bij elkaar.
+
+    - Floats afgerond op SLIDER_STAPPEN (behalve parameters in `exact`)
+    - instroom als geheel getal (zoals str(int(instroom)) richting R)
+    - None → effectieve CSV default (vraagcomponenten, demografie factor, opleidingsduur)
+    - Vraagcomponenten zonder epi_midden → CSV waarden (R negeert ze, OVERRIDE_VRAAGCOMP)
+    - GENEGEERDE_PARAMS → None
+
+    Args:
+        params: Parameterset zoals parse_scenario_params()
+        exact: Parameters die niet afgerond worden (bijv. de gezochte waarde in solve_parameter())
+
+    Returns:
+        dict: canonieke kopie van params
+    """
+    canoniek = {naam: waarde if naam in exact else snap_waarde(naam, waarde) for naam, waarde in params.items()}
+    csv = scenario_engine.laad_parameters(DATA_PATH)
+
+    if canoniek.get('instroom') is not None:
+        canoniek['instroom'] = int(canoniek['instroom'])
+
+    vraag_actief = canoniek.get('epi_midden') is not None
+    for naam in scenario_engine.VRAAG_OVERRIDES:
+        if not vraag_actief or canoniek.get(naam) is None:
+            canoniek[naam] = csv[naam]
+
+    if canoniek.get('demografie_factor') is None:
+        canoniek['demografie_factor'] = 1.0
+
+    # Eén opleidingsduur voor alle drie cohorten: alleen invullen als de CSV dat ook doet
+    if (canoniek.get('opleidingsduur') is None and
+            csv['opleidingsduur'] == csv['opleidingsduur2'] == csv['opleidingsduur3']):
+        canoniek['opleidingsduur'] = csv['opleidingsduur']
+
+    for naam in GENEGEERDE_PARAMS:
+        canoniek[naam] = None
+
+    return canoniek
+
+
+def met_vraag_defaults(params: dict) -> dict:
+    """
+    Vul ontbrekende vraagcomponenten met DEFAULT_PARAMS (= CSV waarden).
+
+    Vraagcomponenten hebben alleen effect als ze expliciet zijn gezet (zie R
+    OVERRIDE_VRAAGCOMP); analyses die ze variëren moeten ze dus altijd meegeven.
+
+    Args:
+        params: Parameterset zoals parse_scenario_params()
+
+    Returns:
+        dict: kopie van params zonder None vraagcomponenten
+    """
+    return {**params, **{naam: DEFAULT_PARAMS[naam] for naam in OPTIONAL_PARAMS
+                         if naam in DEFAULT_PARAMS and params[naam] is None}}
+
+
+# Query parameters van GET /api/scenario die geen modelparameter zijn
+SCENARIO_QUERY_OPTIES = ('scenario', 'format', 'fields', 'mode')
+
+
+def lees_scenario_query(args) -> dict:
+    """
+    Lees de GET vorm van een scenario: query parameters in plaats van een JSON body.
+
+    Args:
+        args: Query parameters (request.args), namen zoals in de JSON body
+
+    Returns:
+        dict: body voor parse_scenario_params() (getallen als float, plus 'scenario')
+
+    Raises:
+        ValueError: Bij een onbekende parameter of een waarde die geen eindig getal is
+    """
+    data = {}
+    for naam, waarde in args.items():
+        if naam in SCENARIO_QUERY_OPTIES:
+            if naam == 'scenario':
+                data[naam] = waarde
+            continue
+        if naam not in DEFAULT_PARAMS and naam not in OPTIONAL_PARAMS:
+            raise ValueError(f"Onbekende parameter: {naam}")
+        try:
+            getal = float(waarde)
+        except ValueError:
+            getal = math.nan
+        if not math.isfinite(getal):
+            raise ValueError(f"{naam} moet een getal zijn")
+        data[naam] = getal
+    return data
+
+
+def scenario_url(data: dict, args=None) -> str:
+    """
+    Canonieke GET URL van een scenario (voor browser en edge caching).
+
+    Alleen parameters waarvan de canonieke waarde afwijkt van de default, op
+    naam gesorteerd: requests met dezelfde uitkomst (andere volgorde,
+    onafgeronde sliderwaarden, expliciete defaults, genegeerde parameters)
+    krijgen dezelfde URL en delen dus één cache entry.
+
+    Args:
+        data: Request body (zoals voor POST /api/scenario)
+        args: Optioneel query parameters; format, fields en mode gaan mee in de URL
+
+    Returns:
+        str: pad plus query string
+    """
+    canoniek = canonicalize_params(parse_scenario_params(data))
+    standaard = canonicalize_params(parse_scenario_params({}))
+    query = {naam: waarde for naam, waarde in canoniek.items() if waarde != standaard[naam]}
+    # Vraagcomponenten tellen alleen mee als epi_midden gezet is (zie canonicalize_params())
+    if any(naam in query for naam in scenario_engine.VRAAG_OVERRIDES):
+        query['epi_midden'] = canoniek['epi_midden']
+    if data.get('scenario', 'scenario6') != 'scenario6':
+        query['scenario'] = data['scenario']
+    for optie in ('format', 'fields', 'mode'):
+        if args and args.get(optie):
+            query[optie] = args[optie]
+    return f"/api/scenario?{urlencode(sorted(query.items()), safe=',')}" if query else '/api/scenario'
+
 # ==================================================================================
 # HELPER FUNCTIES
 # ==================================================================================
 
+def _engine_bestanden() -> list:
+    """Bestanden die de uitkomst van de engine bepalen (voor de engine fingerprint)."""
+    bestanden = [Path(scenario_engine.__file__)]  # Monte Carlo/sweep rekenen altijd met NumPy
+    if SCENARIO_ENGINE != 'numpy':
+        r_dir = R_SCRIPT_PATH.parent
+        bestanden += [R_SCRIPT_PATH, r_dir / 'beschikbaar_aanbod.R', r_dir / 'parameters_laden.R',
+                      r_dir / 'scenario_worker.R']
+    return bestanden
+
+
+# FORMAAT_VERSIE in de namespace: L2 entries met een oude float32 regel of byte layout worden niet gelezen
+fingerprints = FingerprintService(DATA_PATH, _engine_bestanden(), SCENARIO_ENGINE, FINGERPRINT_INTERVAL,
+                                  cache_formaat=FORMAAT_VERSIE)
+
+
 def get_csv_hash() -> str:
     """
     Bereken MD5 hash van CSV data file voor cache invalidatie.
 
+    Alleen herberekend als (inode, size, mtime) van het bestand wijzigt.
+
     Returns:
         str: MD5 hash van CSV bestand
     """
     try:
-        with open(DATA_PATH, 'rb') as f:
-            return hashlib.md5(f.read()).hexdigest()
+        return fingerprints.data_hash()
     except Exception as e:
         print(f"Warning: Could not calculate CSV hash: {e}", file=sys.stderr)
         return "unknown"
@@ -225,15 +605,18 @@ def create_cache_key(**params) -> str:
     """
     Create a unique cache key from scenario parameters.
 
+    De key begint met de namespace van dataset + engine versie, zodat een nieuwe
+    CSV of gewijzigde engine code nooit oude resultaten oplevert.
+
     Args:
         **params: All scenario parameters
 
     Returns:
-        str: MD5 hash of parameters (cache key)
+        str: "<namespace>:<MD5 hash of parameters>" (cache key)
     """
     # Sort parameters for consistent hashing
     param_str = json.dumps(params, sort_keys=True)
-    return hashlib.md5(param_str.encode()).hexdigest()
+    return f"{fingerprints.namespace()}:{hashlib.md5(param_str.encode()).hexdigest()}"
 
 
 def get_cache_stats() -> dict:
@@ -241,36 +624,79 @@ def get_cache_stats() -> dict:
     Get current cache statistics.
 
     Returns:
-        dict: Cache stats including hits, misses, hit rate
+        dict: Cache stats including hits, misses, hit rate, evictions and bytes
     """
-    total = cache_stats['total_requests']
-    hits = cache_stats['hits']
-    hit_rate = (hits / total * 100) if total > 0 else 0
+    scenario = _scenario_cache.stats()
+    total = scenario['hits'] + scenario['misses']
+    hit_rate = (scenario['hits'] / total * 100) if total > 0 else 0
 
     return {
-        'hits': hits,
-        'misses': cache_stats['misses'],
+        'hits': scenario['hits'],
+        'misses': scenario['misses'],
         'total_requests': total,
         'hit_rate_percent': round(hit_rate, 2),
-        'cache_size': cache_stats['cache_size'],
-        'max_cache_size': CACHE_SIZE,
+        'evictions': scenario['evictions'],
+        'expirations': scenario['expirations'],
+        'cache_size': scenario['entries'],
+        'cache_bytes': scenario['bytes'],
+        'max_cache_bytes': scenario['max_bytes'],
+        'ttl_seconds': scenario['ttl'],
+        'l2_cache': _l2_cache.stats() if _l2_cache is not None else None,
+        'aanbod_cache': _cache_samenvatting(_aanbod_cache),
+        'response_cache': _cache_samenvatting(_response_cache),
+        'single_flight': _single_flight.stats(),
         'started_at': cache_stats['started_at'],
         'uptime_seconds': (datetime.now() - datetime.fromisoformat(cache_stats['started_at'])).total_seconds()
     }
 
 
+def _cache_samenvatting(cache: LRUCache) -> dict:
+    """Tellers en grootte van een tweede cache (aanbod, responses) voor get_cache_stats()."""
+    stats = cache.stats()
+    return {
+        'hits': stats['hits'],
+        'misses': stats['misses'],
+        'evictions': stats['evictions'],
+        'cache_size': stats['entries'],
+        'cache_bytes': stats['bytes'],
+        'max_cache_bytes': stats['max_bytes'],
+    }
+
+
 def clear_cache():
     """Clear the scenario cache and reset statistics."""
-    global _scenario_cache, _cache_order
-    _scenario_cache.clear()
-    _cache_order.clear()
-    cache_stats['hits'] = 0
-    cache_stats['misses'] = 0
-    cache_stats['total_requests'] = 0
-    cache_stats['cache_size'] = 0
+    for cache in (_scenario_cache, _aanbod_cache, _response_cache, _monte_carlo_cache):
+        cache.clear()
+    if _l2_cache is not None:
+        _l2_cache.clear()
+    _single_flight.reset()
     cache_stats['started_at'] = datetime.now().isoformat()
 
 
+_r_worker_pool = None
+_r_worker_pool_lock = threading.Lock()
+
+
+def get_r_worker_pool() -> RWorkerPool:
+    """
+    Geef de R worker pool van dit proces (lazy, dus pas na de gunicorn fork).
+
+    Returns:
+        RWorkerPool met warme scenario_worker.R processen
+    """
+    global _r_worker_pool
+    with _r_worker_pool_lock:
+        if _r_worker_pool is None:
+            _r_worker_pool = RWorkerPool(
+                command=['Rscript', str(R_SCRIPT_PATH.parent / 'scenario_worker.R'), str(R_SCRIPT_PATH)],
+                env={**os.environ, 'DATA_PATH': str(DATA_PATH)},
+                size=R_WORKERS or None,
+                max_jobs=R_WORKER_MAX_JOBS,
+            )
+            atexit.register(_r_worker_pool.shutdown)
+        return _r_worker_pool
+
+
 def _call_r_model_uncached(instroom: float, intern_rendement: float, fte_vrouw: float, fte_man: float,
                  # Extern rendement - 8 individuele waarden (verplicht)
                  extern_rendement_vrouw_1jaar: float, extern_rendement_vrouw_5jaar: float,
@@ -330,8 +756,8 @@ def _call_r_model_uncached(instroom: float, intern_rendement: float, fte_vrouw:
     Raises:
         RuntimeError: Als R script faalt
     """
-    # Maak tijdelijk output bestand
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as f:
+    # Maak tijdelijk output bestand (.bin = binaire kolommen, zie lees_r_output())
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.bin', dir=R_OUTPUT_DIR, delete=False) as f:
         output_file = f.name
 
     try:
@@ -378,23 +804,27 @@ def _call_r_model_uncached(instroom: float, intern_rendement: float, fte_vrouw:
             # Opleidingsduur (1 parameter)
             "NA" if opleidingsduur is None else str(opleidingsduur),
             # Output file
-            output_file
+            output_file,
+            # Alleen de kolommen die de API leest
+            ','.join(PROJECTIE_KOLOMMEN),
         ]
 
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=120  # 120 seconden timeout (R berekeningen kunnen lang duren)
-        )
-
-        if result.returncode != 0:
-            raise RuntimeError(f"R script failed: {result.stderr}")
+        if R_WORKER_POOL:
+            # Warme worker: zelfde argumenten, zonder 'Rscript <script>'
+            get_r_worker_pool().run(cmd[2:], timeout=120)
+        else:
+            result = subprocess.run(
+                cmd,
+                capture_output=True,
+                text=True,
+                timeout=120  # 120 seconden timeout (R berekeningen kunnen lang duren)
+            )
 
-        # Lees output CSV
-        df = pd.read_csv(output_file)
+            if result.returncode != 0:
+                raise RuntimeError(f"R script failed: {result.stderr}")
 
-        return df
+        # Lees output (binaire kolommen, of CSV van een oudere R versie)
+        return lees_r_output(Path(output_file).read_bytes())
 
     finally:
         # Cleanup temp file
@@ -402,73 +832,345 @@ def _call_r_model_uncached(instroom: float, intern_rendement: float, fte_vrouw:
             os.remove(output_file)
 
 
-# Manual cache for DataFrames (LRU not possible with non-hashable types)
-_scenario_cache = {}
-_cache_order = []  # Track access order for LRU
+def lees_r_output(data: bytes) -> pd.DataFrame:
+    """
+    Lees de output van run_scenario_api_v2.R.
+
+    Het R script schrijft de API kolommen in het formaat van
+    CompacteProjectie.naar_bytes() (uint32 header lengte, JSON header, ruwe
+    float64 kolommen); die worden zonder parsen als views ingelezen. Een R
+    script zonder binaire output (bijv. een lokaal R_SCRIPT_PATH) schrijft
+    nog CSV: dat wordt herkend en als CSV gelezen.
+
+    Args:
+        data: Inhoud van het output bestand
+
+    Returns:
+        DataFrame met één rij per jaar
+    """
+    if data[4:6] != b'[[':
+        return pd.read_csv(io.BytesIO(data))
+    projectie = CompacteProjectie.van_bytes(data)
+    return pd.DataFrame({kolom: projectie[kolom] for kolom in projectie.kolommen}, copy=False)
+
+
+def _get_aanbod(params: dict) -> dict:
+    """
+    Aanbod arrays voor de aanbod parameters van dit scenario (uit cache of berekend).
+
+    Args:
+        params: Scenario parameters; alleen scenario_engine.AANBOD_PARAMETERS tellen mee
+
+    Returns:
+        dict: read-only aanbod arrays (scenario_engine.bereken_aanbod())
+    """
+    aanbod_params = {naam: params.get(naam) for naam in scenario_engine.AANBOD_PARAMETERS}
+    cache_key = create_cache_key(**aanbod_params)
+
+    aanbod = _aanbod_cache.get(cache_key)
+    if aanbod is None:
+        aanbod = scenario_engine.bereken_aanbod(DATA_PATH, aanbod_params)
+        _aanbod_cache.put(cache_key, aanbod)
+    return aanbod
+
+
+def _call_numpy_model_uncached(**params) -> pd.DataFrame:
+    """
+    Bereken het scenario in-process met de NumPy engine (scenario_engine.py).
+
+    Accepteert exact dezelfde parameters als _call_r_model_uncached() en levert
+    een DataFrame met dezelfde kolomnamen als de R output. Het aanbod komt uit
+    de aanbod cache: wijzigt alleen een vraagparameter, dan wordt alleen de
+    vraagkant (scenario 6, tekort, instroomadvies, impact) herberekend.
+
+    Returns:
+        DataFrame met projectie 2025-2043
+    """
+    return scenario_engine.run_scenario(DATA_PATH, aanbod=_get_aanbod(params), **params)
+
+
+def _call_model_uncached(**params) -> pd.DataFrame:
+    """Dispatch naar de engine die via SCENARIO_ENGINE is geselecteerd."""
+    if SCENARIO_ENGINE == 'numpy':
+        return _call_numpy_model_uncached(**params)
+    return _call_r_model_uncached(**params)
+
+
+# Impact kolommen in 2043 per veld van impact_analysis
+IMPACT_VRAAGFACTOREN = {
+    'demografie': 'impact_demo_midden',
+    'epidemiologie_t': 'impact_epi_midden_t',
+    'epidemiologie_d': 'impact_epi_midden_d',
+    'sociaal_cultureel_t': 'impact_soc_midden_t',
+    'sociaal_cultureel_d': 'impact_soc_midden_d',
+    'vakinhoudelijk_t': 'impact_vak_midden_t',
+    'vakinhoudelijk_d': 'impact_vak_midden_d',
+    'efficiency_t': 'impact_eff_midden_t',
+    'efficiency_d': 'impact_eff_midden_d',
+    'horizontale_substitutie_t': 'impact_hor_midden_t',
+    'horizontale_substitutie_d': 'impact_hor_midden_d',
+    'atv_t': 'impact_atv_midden_t',
+    'atv_d': 'impact_atv_midden_d',
+    'verticale_substitutie_t': 'impact_ver_midden_t',
+    'verticale_substitutie_d': 'impact_ver_midden_d',
+}
+IMPACT_AANBODFACTOREN = {
+    'onvervulde_vraag': 'impact_ovv_midden',
+    'uitstroom': 'impact_uitstroom',
+    'nu_in_opleiding': 'impact_nuinopl',
+    'tussen_opleiding': 'impact_tussenopl',
+    'buitenland': 'impact_buitenland',
+}
+IMPACT_SCENARIO_TOTALEN = {
+    'scenario1': 'totaal_impact_sc1_midden',
+    'scenario2': 'totaal_impact_sc2_midden',
+    'scenario3': 'totaal_impact_sc3_midden',
+    'scenario6': 'totaal_impact_sc6_midden',
+}
+
+# Kolommen die de responses lezen; de rest van de model output (hulpextern,
+# injaarx, laag/hoog varianten, ...) gaat niet de cache in
+PROJECTIE_KOLOMMEN = (
+    'jaar', 'fte_totaal', 'scen1_fte_midden', 'scen6_fte_midden_a', 'ben_instroom_sc6_midden_a',
+    'n_totaal_uit_nuopl', 'n_totaal_uit_tussopl', 'n_totaal_nabijst',
+    *IMPACT_VRAAGFACTOREN.values(), *IMPACT_AANBODFACTOREN.values(), *IMPACT_SCENARIO_TOTALEN.values(),
+)
+
+# Totalen die de responses uit meerdere kolommen berekenen (aanbod_velden(), vraag_velden()):
+# CompacteProjectie controleert ook hun afronding voordat bronkolommen float32 worden
+_COHORTEN = ('n_totaal_uit_nuopl', 'n_totaal_uit_tussopl', 'n_totaal_nabijst')
+AFGELEIDE_VELDEN = (
+    (_COHORTEN, lambda a, b, c: a + b + c, 2),           # aanbod_personen
+    (_COHORTEN, lambda a, b, c: (a + b + c) * 0.66, 2),  # vrouwen
+    (_COHORTEN, lambda a, b, c: (a + b + c) * 0.34, 2),  # mannen
+    *(
+        afgeleid
+        for benodigd in ('scen1_fte_midden', 'scen6_fte_midden_a')
+        for afgeleid in (
+            ((benodigd, 'fte_totaal'), lambda b, a: b - a, 2),                              # gap_fte
+            ((benodigd, 'fte_totaal'), lambda b, a: np.where(a > 0, (b - a) / a, 0.0), 4),  # gap_percentage
+        )
+    ),
+)
+
+# Kolommen van alleen de aanbodkant (stap 1), voor het eerste event van /api/scenario/stream
+AANBOD_KOLOMMEN = ('jaar', 'fte_totaal', 'n_totaal_uit_nuopl', 'n_totaal_uit_tussopl', 'n_totaal_nabijst')
+
+
+def _cache_get(cache_key: str):
+    """
+    Haal een projectie uit L1 (in-memory) of anders L2 (gedeeld, persistent).
+
+    Een L2 hit wordt ook in L1 gezet. Read-only, dus geen kopie.
+
+    Returns:
+        CompacteProjectie of None bij een miss in beide lagen
+    """
+    result = _scenario_cache.get(cache_key)
+    if result is None and _l2_cache is not None:
+        data = _l2_cache.get(cache_key)
+        if data is not None:
+            result = CompacteProjectie.van_bytes(data)
+            _scenario_cache.put(cache_key, result)
+    return result
+
+
+def _cache_put(cache_key: str, result: pd.DataFrame) -> CompacteProjectie:
+    """Comprimeer model output tot een CompacteProjectie en sla die op in L1 en L2."""
+    compact = CompacteProjectie.van_dataframe(result, PROJECTIE_KOLOMMEN, AFGELEIDE_VELDEN)
+    _scenario_cache.put(cache_key, compact)
+    if _l2_cache is not None:
+        _l2_cache.put(cache_key, compact.naar_bytes())
+    return compact
+
+
+def _evict_oude_namespace(nieuw: str, oud: str):
+    """
+    Verwijder entries van een oude dataset/engine versie uit alle caches.
+
+    Aangeroepen door de fingerprint service zodra DATA_PATH of de engine code wijzigt.
+
+    Args:
+        nieuw: Huidige namespace
+        oud: Vorige namespace
+    """
+    prefix = f"{nieuw}:"
+    verwijderd = sum(
+        cache.verwijder_waar(lambda key: not key.startswith(prefix))
+        for cache in (_scenario_cache, _aanbod_cache, _response_cache, _monte_carlo_cache)
+    )
+    if _l2_cache is not None:
+        verwijderd += _l2_cache.verwijder_behalve_prefix(prefix)
+
+    try:
+        print(f"🔄 Dataset/engine gewijzigd ({oud} → {nieuw}): {verwijderd} cache entries verwijderd", file=sys.stderr)
+    except (BrokenPipeError, IOError):
+        pass
 
-def call_r_model(**params):
+
+fingerprints.on_change(_evict_oude_namespace)
+
+
+def call_r_model(exact: tuple = (), **params):
     """
     Cached wrapper for _call_r_model_uncached().
 
-    Uses manual LRU cache since pandas DataFrames are not hashable.
-    Cache key is MD5 hash of all parameters.
+    Cache key is MD5 hash of the canonical parameters (canonicalize_params()).
+    Zoekt eerst in het geheugen van deze worker (L1), dan in de gedeelde
+    SQLite cache (L2), en rekent pas daarna. Hit en miss geven dezelfde read-only CompacteProjectie (PROJECTIE_KOLOMMEN).
 
     Args:
+        exact: Parameters die niet op de slider stap worden afgerond
         **params: All parameters for scenario calculation
 
     Returns:
-        pd.DataFrame: Scenario calculation results
+        CompacteProjectie: Scenario calculation results
     """
-    global _scenario_cache, _cache_order
+    # Canonieke parameters: None/defaults, float ruis en genegeerde parameters gelijktrekken
+    params = canonicalize_params(params, exact)
 
     # Create cache key
     cache_key = create_cache_key(**params)
 
-    # Update stats
-    cache_stats['total_requests'] += 1
-
-    # Check cache
-    if cache_key in _scenario_cache:
+    # Check cache (hits/misses worden door de cache zelf geteld)
+    cached = _cache_get(cache_key)
+    stats = _scenario_cache.stats()
+    total = stats['hits'] + stats['misses']
+    if cached is not None:
         # Cache HIT
-        cache_stats['hits'] += 1
-
-        # Update LRU order (move to end = most recently used)
-        _cache_order.remove(cache_key)
-        _cache_order.append(cache_key)
-
         try:
-            print(f"✅ Cache HIT ({cache_stats['hits']}/{cache_stats['total_requests']})", file=sys.stderr)
+            print(f"✅ Cache HIT ({stats['hits']}/{total})", file=sys.stderr)
         except (BrokenPipeError, IOError):
             pass
-        return _scenario_cache[cache_key].copy()  # Return copy to prevent mutation
+        return cached
 
-    # Cache MISS - call R model
-    cache_stats['misses'] += 1
+    # Cache MISS - call model (R of NumPy, zie SCENARIO_ENGINE)
     try:
-        print(f"❌ Cache MISS ({cache_stats['misses']}/{cache_stats['total_requests']}) - Running R calculation...", file=sys.stderr)
+        print(f"❌ Cache MISS ({stats['misses']}/{total}) - Running {SCENARIO_ENGINE} calculation...", file=sys.stderr)
     except (BrokenPipeError, IOError):
         pass
 
-    result = _call_r_model_uncached(**params)
+    # Single-flight: loopt dit scenario al in een andere thread, dan wachten op dat resultaat
+    result, _ = _single_flight.do(cache_key, lambda: _bereken_als_leider(cache_key, params))
+    return result
+
 
-    # Store in cache
-    _scenario_cache[cache_key] = result.copy()
-    _cache_order.append(cache_key)
+def _bereken_als_leider(cache_key: str, params: dict) -> CompacteProjectie:
+    """
+    Bereken een scenario als single-flight leider en zet het in de cache.
 
-    # Enforce cache size limit (LRU eviction)
-    if len(_scenario_cache) > CACHE_SIZE:
-        # Remove oldest entry
-        oldest_key = _cache_order.pop(0)
-        del _scenario_cache[oldest_key]
-        print(f"🗑️  Cache eviction: {len(_scenario_cache)}/{CACHE_SIZE}", file=sys.stderr)
+    Tussen de cache miss en het leiderschap kan een andere thread klaar zijn
+    gekomen, dus eerst nog een keer kijken (telt niet mee in de statistieken).
+    Met een L2 cache rekent maar één worker: de andere wachten op het resultaat
+    in L2 en rekenen alleen zelf als dat uitblijft.
 
-    # Update cache size
-    cache_stats['cache_size'] = len(_scenario_cache)
+    Args:
+        cache_key: Key van de canonieke parameters
+        params: Canonieke parameters
 
-    return result
+    Returns:
+        CompacteProjectie
+    """
+    cached = _scenario_cache.get(cache_key, tel=False)
+    if cached is not None:
+        return cached
+
+    geclaimd = False
+    if _l2_cache is not None:
+        data = _l2_cache.get(cache_key, tel=False)
+        if data is None:
+            geclaimd = _l2_cache.claim(cache_key, SINGLE_FLIGHT_TIMEOUT)
+            if not geclaimd:
+                data = _l2_cache.wacht_op(cache_key, SINGLE_FLIGHT_TIMEOUT)
+        if data is not None:
+            result = CompacteProjectie.van_bytes(data)
+            _scenario_cache.put(cache_key, result)
+            return result
+
+    try:
+        return _cache_put(cache_key, _call_model_uncached(**params))
+    finally:
+        if geclaimd:
+            _l2_cache.release(cache_key)
 
 
-def extract_impact_analysis(df: pd.DataFrame) -> dict:
+def call_model_batch(param_sets: list) -> tuple[list, dict]:
+    """
+    Bereken meerdere scenario's met cache en deduplicatie.
+
+    Scenario's die al in de cache staan, dubbel in de batch voorkomen of op
+    dat moment door een ander request berekend worden (single-flight) worden
+    niet opnieuw berekend. De overige worden met de NumPy engine in één
+    array-berekening doorgerekend; met de R engine parallel over de worker pool.
+
+    Args:
+        param_sets: Lijst met parameter dicts (zoals parse_scenario_params())
+
+    Returns:
+        (resultaten, stats): CompacteProjecties in dezelfde volgorde als param_sets en
+        een dict met aantallen (scenarios, uniek, cache_hits, berekend, gedeeld)
+    """
+    param_sets = [canonicalize_params(params) for params in param_sets]
+    keys = [create_cache_key(**params) for params in param_sets]
+    resultaten_per_key = {}
+    te_berekenen = {}
+
+    for key, params in zip(keys, param_sets):
+        if key in resultaten_per_key or key in te_berekenen:
+            continue  # Dubbel in deze batch
+        cached = _cache_get(key)
+        if cached is not None:
+            resultaten_per_key[key] = cached
+        else:
+            te_berekenen[key] = params
+
+    # Single-flight: scenario's die een ander request al berekent niet nog eens starten
+    leiders, volgers = {}, {}
+    for key, params in te_berekenen.items():
+        future, leider = _single_flight.start(key)
+        if leider:
+            leiders[key] = params
+        else:
+            volgers[key] = future
+
+    if leiders:
+        try:
+            print(f"❌ Batch: {len(leiders)}/{len(param_sets)} scenario's berekenen met {SCENARIO_ENGINE}...", file=sys.stderr)
+        except (BrokenPipeError, IOError):
+            pass
+
+        try:
+            if SCENARIO_ENGINE == 'numpy':
+                berekend = scenario_engine.run_scenarios(DATA_PATH, list(leiders.values()))
+            else:
+                max_workers = get_r_worker_pool().size if R_WORKER_POOL else 1
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    berekend = list(executor.map(lambda params: _call_model_uncached(**params), leiders.values()))
+
+            for key, result in zip(leiders, berekend):
+                resultaten_per_key[key] = _cache_put(key, result)
+        except BaseException as e:
+            for key in leiders:
+                _single_flight.klaar(key, fout=e)
+            raise
+        for key in leiders:
+            _single_flight.klaar(key, resultaten_per_key[key])
+
+    # Pas wachten nadat de eigen scenario's klaar zijn (geen deadlock tussen twee batches)
+    for key, future in volgers.items():
+        resultaten_per_key[key] = future.result()
+
+    stats = {
+        'scenarios': len(param_sets),
+        'uniek': len(resultaten_per_key),
+        'cache_hits': len(resultaten_per_key) - len(te_berekenen),
+        'berekend': len(leiders),
+        'gedeeld': len(volgers),
+    }
+    return [resultaten_per_key[key] for key in keys], stats
+
+
+def extract_impact_analysis(df: CompacteProjectie) -> dict:
     """
     Extraheer impactanalyse data voor evenwichtsjaar 2043.
 
@@ -478,179 +1180,1035 @@ def extract_impact_analysis(df: pd.DataFrame) -> dict:
     - Aanbodfactoren: onvervulde vraag, uitstroom, nu in opleiding, tussen opleiding, buitenland
 
     Args:
-        df: DataFrame van R model output (met impact kolommen)
+        df: Model output (met impact kolommen)
 
     Returns:
         Dictionary met impact data voor 2043
     """
     # Filter jaar 2043 (evenwichtsjaar)
-    jaar_2043 = df[df['jaar'] == 2043].iloc[0]
+    jaar_2043 = df.rij(2043)
 
     # Controleer of impact kolommen aanwezig zijn
     if 'impact_demo_midden' not in jaar_2043:
         # Impact kolommen niet beschikbaar (oudere R model versie)
         print("⚠️  DEBUG: impact_demo_midden kolom NIET gevonden in R output")
-        print(f"   Beschikbare kolommen: {list(jaar_2043.index)[:20]}...")
+        print(f"   Beschikbare kolommen: {list(jaar_2043)[:20]}...")
         return None
 
     print("✅ DEBUG: impact_analysis data succesvol geëxtraheerd")
 
+    def afgerond(velden):
+        return {veld: round(jaar_2043.get(kolom, 0), 2) for veld, kolom in velden.items()}
+
     return {
         'jaar': 2043,
-        'vraagfactoren': {
-            'demografie': round(jaar_2043.get('impact_demo_midden', 0), 2),
-            'epidemiologie_t': round(jaar_2043.get('impact_epi_midden_t', 0), 2),
-            'epidemiologie_d': round(jaar_2043.get('impact_epi_midden_d', 0), 2),
-            'sociaal_cultureel_t': round(jaar_2043.get('impact_soc_midden_t', 0), 2),
-            'sociaal_cultureel_d': round(jaar_2043.get('impact_soc_midden_d', 0), 2),
-            'vakinhoudelijk_t': round(jaar_2043.get('impact_vak_midden_t', 0), 2),
-            'vakinhoudelijk_d': round(jaar_2043.get('impact_vak_midden_d', 0), 2),
-            'efficiency_t': round(jaar_2043.get('impact_eff_midden_t', 0), 2),
-            'efficiency_d': round(jaar_2043.get('impact_eff_midden_d', 0), 2),
-            'horizontale_substitutie_t': round(jaar_2043.get('impact_hor_midden_t', 0), 2),
-            'horizontale_substitutie_d': round(jaar_2043.get('impact_hor_midden_d', 0), 2),
-            'atv_t': round(jaar_2043.get('impact_atv_midden_t', 0), 2),
-            'atv_d': round(jaar_2043.get('impact_atv_midden_d', 0), 2),
-            'verticale_substitutie_t': round(jaar_2043.get('impact_ver_midden_t', 0), 2),
-            'verticale_substitutie_d': round(jaar_2043.get('impact_ver_midden_d', 0), 2),
-        },
-        'aanbodfactoren': {
-            'onvervulde_vraag': round(jaar_2043.get('impact_ovv_midden', 0), 2),
-            'uitstroom': round(jaar_2043.get('impact_uitstroom', 0), 2),
-            'nu_in_opleiding': round(jaar_2043.get('impact_nuinopl', 0), 2),
-            'tussen_opleiding': round(jaar_2043.get('impact_tussenopl', 0), 2),
-            'buitenland': round(jaar_2043.get('impact_buitenland', 0), 2),
-        },
-        'scenario_totalen': {
-            'scenario1': round(jaar_2043.get('totaal_impact_sc1_midden', 0), 2),
-            'scenario2': round(jaar_2043.get('totaal_impact_sc2_midden', 0), 2),
-            'scenario3': round(jaar_2043.get('totaal_impact_sc3_midden', 0), 2),
-            'scenario6': round(jaar_2043.get('totaal_impact_sc6_midden', 0), 2),
-        }
+        'vraagfactoren': afgerond(IMPACT_VRAAGFACTOREN),
+        'aanbodfactoren': afgerond(IMPACT_AANBODFACTOREN),
+        'scenario_totalen': afgerond(IMPACT_SCENARIO_TOTALEN),
     }
 
 
-def dataframe_to_projectie_json(df: pd.DataFrame, scenario: str = 'scenario6') -> list:
+# Velden per jaar in een projectie (fields= kiest hieruit; jaar is altijd de as)
+AANBOD_VELDEN = ('aanbod_fte', 'aanbod_personen', 'vrouwen', 'mannen', 'huidig_cohort',
+                 'cohort1_nuopl', 'cohort2_tussen', 'cohort3_nabijst')
+VRAAG_VELDEN = ('benodigd_fte', 'gap_fte', 'gap_percentage')
+PROJECTIE_VELDEN = AANBOD_VELDEN + VRAAG_VELDEN
+
+# Projectie formaten: een object per jaar, of één array per veld plus de jaar as
+PROJECTIE_FORMATEN = ('rijen', 'kolommen')
+
+
+def aanbod_velden(df: CompacteProjectie) -> dict:
     """
-    Converteer DataFrame naar JSON formaat voor frontend.
+    Aanbod velden van de projectie (stap 1 van het model) als hele kolommen.
 
     Args:
-        df: DataFrame van R model output
-        scenario: 'scenario1' of 'scenario6'
+        df: Model output, of alleen AANBOD_KOLOMMEN
 
     Returns:
-        List van dictionaries met projectie data (2025-2043, evenwichtsjaar)
+        dict: veld -> afgeronde NumPy array per jaar (2025-2043, evenwichtsjaar)
     """
-    # Filter alleen jaren tot en met 2043 (evenwichtsjaar)
-    df = df[df['jaar'] <= 2043].copy()
+    # Alleen jaren tot en met 2043 (evenwichtsjaar)
+    kolom = lambda naam: df.kolom(naam, tot_jaar=2043)
+    nuopl, tussopl, nabijst = kolom('n_totaal_uit_nuopl'), kolom('n_totaal_uit_tussopl'), kolom('n_totaal_nabijst')
 
-    projectie = []
+    # Bereken aanbod_personen als som van cohorten
+    aanbod_personen = nuopl + tussopl + nabijst
 
-    for _, row in df.iterrows():
-        # Selecteer juiste kolommen op basis van scenario
-        if scenario == 'scenario1':
-            benodigd_fte = row['scen1_fte_midden']
-        else:  # scenario6
-            benodigd_fte = row['scen6_fte_midden_a']
-
-        # BELANGRIJKE CORRECTIE: Bereken tekort ALTIJD als demand - supply
-        # De R kolom scen6_tekort_midden_a bevat iets anders (onbekend wat)
-        tekort_fte = benodigd_fte - row['fte_totaal']
+    return {
+        'aanbod_fte': rond_af(kolom('fte_totaal'), 2),
+        'aanbod_personen': rond_af(aanbod_personen, 2),
+        'vrouwen': rond_af(aanbod_personen * 0.66, 2),  # Schatting 66% vrouwen
+        'mannen': rond_af(aanbod_personen * 0.34, 2),   # Schatting 34% mannen
+        'huidig_cohort': np.zeros(len(nuopl), dtype=int),  # Niet beschikbaar in R output
+        'cohort1_nuopl': rond_af(nuopl, 2),
+        'cohort2_tussen': rond_af(tussopl, 2),
+        'cohort3_nabijst': rond_af(nabijst, 2),
+    }
 
-        # Bereken gap percentage (tekort als % van aanbod)
-        gap_percentage = (tekort_fte / row['fte_totaal']) if row['fte_totaal'] > 0 else 0
 
-        # Bereken aanbod_personen als som van cohorten
-        aanbod_personen = (
-            row['n_totaal_uit_nuopl'] +
-            row['n_totaal_uit_tussopl'] +
-            row['n_totaal_nabijst']
-        )
+def vraag_velden(df: CompacteProjectie, scenario: str = 'scenario6') -> dict:
+    """
+    Vraag velden van de projectie (benodigd FTE en gap) als hele kolommen.
 
-        projectie.append({
-            'jaar': int(row['jaar']),
-            'aanbod_fte': round(row['fte_totaal'], 2),
-            'benodigd_fte': round(benodigd_fte, 2),
-            'gap_fte': round(tekort_fte, 2),
-            'gap_percentage': round(gap_percentage, 4),
-            'aanbod_personen': round(aanbod_personen, 2),
-            'vrouwen': round(aanbod_personen * 0.66, 2),  # Schatting 66% vrouwen
-            'mannen': round(aanbod_personen * 0.34, 2),   # Schatting 34% mannen
-            'huidig_cohort': 0,  # Niet beschikbaar in R output
-            'cohort1_nuopl': round(row['n_totaal_uit_nuopl'], 2),
-            'cohort2_tussen': round(row['n_totaal_uit_tussopl'], 2),
-            'cohort3_nabijst': round(row['n_totaal_nabijst'], 2),
-        })
+    Args:
+        df: Model output (call_r_model())
+        scenario: 'scenario1' of 'scenario6'
 
-    return projectie
+    Returns:
+        dict: veld -> afgeronde NumPy array per jaar (2025-2043)
+    """
+    # Selecteer juiste kolommen op basis van scenario
+    benodigd_fte = df.kolom('scen1_fte_midden' if scenario == 'scenario1' else 'scen6_fte_midden_a', tot_jaar=2043)
+    aanbod_fte = df.kolom('fte_totaal', tot_jaar=2043)
 
+    # BELANGRIJKE CORRECTIE: Bereken tekort ALTIJD als demand - supply
+    # De R kolom scen6_tekort_midden_a bevat iets anders (onbekend wat)
+    tekort_fte = benodigd_fte - aanbod_fte
 
-# ==================================================================================
-# FLASK API ENDPOINTS
-# ==================================================================================
+    # Bereken gap percentage (tekort als % van aanbod)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gap_percentage = np.where(aanbod_fte > 0, tekort_fte / aanbod_fte, 0.0)
 
-@app.route('/health', methods=['GET'])
-def health():
-    """Health check endpoint met data versioning."""
-    r_script_exists = R_SCRIPT_PATH.exists()
-    data_exists = DATA_PATH.exists()
+    return {
+        'benodigd_fte': rond_af(benodigd_fte, 2),
+        'gap_fte': rond_af(tekort_fte, 2),
+        'gap_percentage': rond_af(gap_percentage, 4),
+    }
 
-    # Data versioning voor frontend cache invalidatie
-    data_hash = get_csv_hash() if data_exists else None
-    data_modified = os.path.getmtime(DATA_PATH) if data_exists else None
 
-    return jsonify({
-        'status': 'healthy' if (r_script_exists and data_exists) else 'degraded',
-        'versie': '3.0',
-        'r_script_found': r_script_exists,
-        'data_found': data_exists,
-        'r_script_path': str(R_SCRIPT_PATH),
-        'data_hash': data_hash,  # Voor cache invalidatie
-        'data_modified': data_modified,  # Unix timestamp
-    })
+def projectie_payload(df: CompacteProjectie, velden: dict, formaat: str = 'rijen'):
+    """
+    Zet projectie kolommen om naar JSON: een object per jaar of een array per veld.
 
+    Args:
+        df: Model output (voor de jaar as)
+        velden: veld -> NumPy array (aanbod_velden(), vraag_velden())
+        formaat: 'rijen' (list van dicts) of 'kolommen' ({'jaar': [...], veld: [...]})
 
-@app.route('/api/baseline', methods=['GET'])
-def api_baseline():
+    Returns:
+        list (rijen) of dict (kolommen, NumPy arrays: zonder Python object per
+        element naar msgpack/Arrow; JSON via NumpyJSONProvider)
     """
-    Bereken baseline scenario (huidige parameters, scenario 6).
+    kolommen = {'jaar': df['jaar'][df['jaar'] <= 2043], **velden}
+    if formaat == 'kolommen':
+        return kolommen
+    lijsten = {veld: waarden.tolist() for veld, waarden in kolommen.items()}
+    namen = list(lijsten)
+    return [dict(zip(namen, rij)) for rij in zip(*lijsten.values())]
 
-    Returns:
-        JSON met projectie 2025-2043
+
+def aanbod_projectie_json(df: CompacteProjectie, formaat: str = 'rijen'):
+    """Aanbod velden van de projectie (zie aanbod_velden()) in `formaat`."""
+    return projectie_payload(df, aanbod_velden(df), formaat)
+
+
+def vraag_projectie_json(df: CompacteProjectie, scenario: str = 'scenario6', formaat: str = 'rijen'):
+    """Vraag velden van de projectie (zie vraag_velden()) in `formaat`."""
+    return projectie_payload(df, vraag_velden(df, scenario), formaat)
+
+
+def dataframe_to_projectie_json(df: CompacteProjectie, scenario: str = 'scenario6',
+                                velden: tuple = None, formaat: str = 'rijen'):
+    """
+    Converteer model output naar JSON formaat voor frontend.
+
+    Args:
+        df: Model output (call_r_model())
+        scenario: 'scenario1' of 'scenario6'
+        velden: Alleen deze PROJECTIE_VELDEN (None = alle)
+        formaat: 'rijen' (object per jaar) of 'kolommen' (array per veld)
+
+    Returns:
+        Projectie data (2025-2043, evenwichtsjaar): list van dicts, of dict met
+        de jaar as en een array per veld
+    """
+    return projectie_payload(df, projectie_kolommen(df, scenario, velden), formaat)
+
+
+def projectie_kolommen(df: CompacteProjectie, scenario: str = 'scenario6', velden: tuple = None) -> dict:
+    """
+    Projectie velden als hele kolommen (alleen de stappen die nodig zijn).
+
+    Args:
+        df: Model output (call_r_model())
+        scenario: 'scenario1' of 'scenario6'
+        velden: Alleen deze PROJECTIE_VELDEN (None = alle)
+
+    Returns:
+        dict: veld -> afgeronde NumPy array per jaar (2025-2043)
+    """
+    kolommen = {}
+    if velden is None or any(veld in AANBOD_VELDEN for veld in velden):
+        kolommen.update(aanbod_velden(df))
+    if velden is None or any(veld in VRAAG_VELDEN for veld in velden):
+        kolommen.update(vraag_velden(df, scenario))
+    if velden is not None:
+        kolommen = {veld: kolommen[veld] for veld in velden}
+    return kolommen
+
+
+def lees_projectie_opties(args, standaard: str = 'rijen') -> tuple:
+    """
+    Formaat en velden van de projectie uit de query string (?format=kolommen&fields=gap_fte,aanbod_fte).
+
+    Args:
+        args: request.args
+        standaard: Formaat zonder ?format= (binaire responses: 'kolommen')
+
+    Returns:
+        (formaat, velden): velden is None voor alle velden
+
+    Raises:
+        ValueError: Bij een onbekend formaat of veld
+    """
+    formaat = args.get('format', standaard)
+    if formaat not in PROJECTIE_FORMATEN:
+        raise ValueError(f"format moet een van {', '.join(PROJECTIE_FORMATEN)} zijn")
+
+    velden = None
+    if args.get('fields'):
+        velden = tuple(dict.fromkeys(veld.strip() for veld in args['fields'].split(',') if veld.strip() != 'jaar'))
+        onbekend = [veld for veld in velden if veld not in PROJECTIE_VELDEN]
+        if onbekend:
+            raise ValueError(f"Onbekende fields: {', '.join(onbekend)} (kies uit {', '.join(PROJECTIE_VELDEN)})")
+    return formaat, velden
+
+
+def projectie_opties_key(formaat: str, velden: tuple) -> str:
+    """Achtervoegsel voor de response cache key; leeg voor de standaard response."""
+    if formaat == 'rijen' and velden is None:
+        return ''
+    return f":{formaat}:{','.join(velden) if velden is not None else '*'}"
+
+
+def instroomadvies_en_impact(df: CompacteProjectie) -> dict:
+    """
+    Instroomadvies 2043 en (indien beschikbaar) impact_analysis uit de model output.
+
+    Args:
+        df: Model output (call_r_model())
+
+    Returns:
+        dict met instroomadvies_2043 en eventueel impact_analysis
+    """
+    # Haal impact analyse data op voor evenwichtsjaar 2043
+    impact_analysis = extract_impact_analysis(df)
+
+    # Bereken instroomadvies voor evenwichtsjaar 2043
+    #
+    # BELANGRIJK: Instroomadvies wordt berekend door het R-model (run_scenario_api_v2.R)
+    # Python dupliceert GEEN logica - we lezen het direct uit de R-model output.
+    # Dit garandeert 100% consistentie met de officiële STATA/Excel berekeningen.
+    #
+    # Het R-model berekent: ben_instroom_sc6_midden_a = n_inopleiding_perjaar3 +
+    #                       (sc6_ftetekort_midden_a / fte_toekomst) * n_inopleiding_perjaar3
+    #
+    # Het instroomadvies wordt berekend op basis van het AANGEPASTE scenario (df),
+    # zodat het correct reageert op zowel aanbod- als vraagparameter wijzigingen.
+    # Dit zorgt ervoor dat het instroomadvies het tekort in 2043 compenseert.
+
+    # Lees instroomadvies uit het aangepaste scenario
+    jaar_2043_scenario = df.rij(2043)
+    instroomadvies = jaar_2043_scenario['ben_instroom_sc6_midden_a']
+
+    resultaat = {'instroomadvies_2043': round(instroomadvies, 0) if instroomadvies else None}
+
+    # Voeg impact analysis toe als beschikbaar
+    if impact_analysis is not None:
+        resultaat['impact_analysis'] = impact_analysis
+
+    return resultaat
+
+
+def build_scenario_response(df: CompacteProjectie, scenario: str = 'scenario6',
+                            velden: tuple = None, formaat: str = 'rijen') -> dict:
+    """
+    Bouw de response van /api/scenario uit de model output.
+
+    Args:
+        df: Model output (call_r_model())
+        scenario: 'scenario1' of 'scenario6'
+        velden: Alleen deze projectie velden (None = alle, zie lees_projectie_opties())
+        formaat: 'rijen' of 'kolommen'
+
+    Returns:
+        dict met projectie, instroomadvies_2043 en (indien beschikbaar) impact_analysis
+    """
+    return {
+        'projectie': dataframe_to_projectie_json(df, scenario=scenario, velden=velden, formaat=formaat),
+        **instroomadvies_en_impact(df),
+    }
+
+
+# Response modi van /api/scenario (?mode=): volledige projectie, of alleen de
+# verschillen met de baseline (GET /api/baseline) per jaar plus kerncijfers
+RESPONSE_MODI = ('volledig', 'delta')
+
+# Decimalen van een delta: zoals de velden zelf (2, gap_percentage 4), zodat
+# baseline + delta exact de volledige projectie geeft
+DELTA_DECIMALEN = 4
+
+
+def lees_response_modus(args) -> str:
+    """
+    Response modus uit de query string (?mode=delta).
+
+    Raises:
+        ValueError: Bij een onbekende modus
+    """
+    modus = args.get('mode', 'volledig')
+    if modus not in RESPONSE_MODI:
+        raise ValueError(f"mode moet een van {', '.join(RESPONSE_MODI)} zijn")
+    return modus
+
+
+def baseline_params() -> dict:
+    """Parameters van de baseline (huidige parameters, scenario 6): /api/baseline en mode=delta."""
+    # Default parameters (met 8 extern rendement en 8 uitstroom waarden)
+    return {
+        'instroom': DEFAULT_PARAMS['instroom'],
+        'intern_rendement': DEFAULT_PARAMS['intern_rendement'],
+        'fte_vrouw': DEFAULT_PARAMS['fte_vrouw'],
+        'fte_man': DEFAULT_PARAMS['fte_man'],
+        # Extern rendement - 8 individuele parameters
+        'extern_rendement_vrouw_1jaar': DEFAULT_PARAMS['extern_rendement_vrouw_1jaar'],
+        'extern_rendement_vrouw_5jaar': DEFAULT_PARAMS['extern_rendement_vrouw_5jaar'],
+        'extern_rendement_vrouw_10jaar': DEFAULT_PARAMS['extern_rendement_vrouw_10jaar'],
+        'extern_rendement_vrouw_15jaar': DEFAULT_PARAMS['extern_rendement_vrouw_15jaar'],
+        'extern_rendement_man_1jaar': DEFAULT_PARAMS['extern_rendement_man_1jaar'],
+        'extern_rendement_man_5jaar': DEFAULT_PARAMS['extern_rendement_man_5jaar'],
+        'extern_rendement_man_10jaar': DEFAULT_PARAMS['extern_rendement_man_10jaar'],
+        'extern_rendement_man_15jaar': DEFAULT_PARAMS['extern_rendement_man_15jaar'],
+        # Uitstroom - 8 individuele parameters
+        'uitstroom_vrouw_5j': DEFAULT_PARAMS['uitstroom_vrouw_5j'],
+        'uitstroom_man_5j': DEFAULT_PARAMS['uitstroom_man_5j'],
+        'uitstroom_vrouw_10j': DEFAULT_PARAMS['uitstroom_vrouw_10j'],
+        'uitstroom_man_10j': DEFAULT_PARAMS['uitstroom_man_10j'],
+        'uitstroom_vrouw_15j': DEFAULT_PARAMS['uitstroom_vrouw_15j'],
+        'uitstroom_man_15j': DEFAULT_PARAMS['uitstroom_man_15j'],
+        'uitstroom_vrouw_20j': DEFAULT_PARAMS['uitstroom_vrouw_20j'],
+        'uitstroom_man_20j': DEFAULT_PARAMS['uitstroom_man_20j'],
+        # Opleidingsduur
+        'opleidingsduur': DEFAULT_PARAMS['opleidingsduur'],
+    }
+
+
+def baseline_url(formaat: str, velden: tuple) -> str:
+    """URL van de baseline met dezelfde projectie opties (format, fields)."""
+    query = {}
+    if formaat != 'rijen':
+        query['format'] = formaat
+    if velden is not None:
+        query['fields'] = ','.join(velden)
+    return f"/api/baseline?{urlencode(query, safe=',')}" if query else '/api/baseline'
+
+
+def baseline_cache_key(formaat: str, velden: tuple) -> str:
+    """Response cache key van GET /api/baseline (ook de basis van de ETag)."""
+    return f"{create_cache_key(**canonicalize_params(baseline_params()))}:baseline{projectie_opties_key(formaat, velden)}"
+
+
+def kerncijfers_2043(df: CompacteProjectie, scenario: str = 'scenario6') -> dict:
+    """Aanbod, benodigd FTE, gap en instroomadvies in evenwichtsjaar 2043 (onafgerond)."""
+    rij = df.rij(2043)
+    benodigd = rij['scen1_fte_midden'] if scenario == 'scenario1' else rij['scen6_fte_midden_a']
+    return {
+        'aanbod_fte': rij['fte_totaal'],
+        'benodigd_fte': benodigd,
+        'gap_fte': benodigd - rij['fte_totaal'],
+        'instroomadvies': rij['ben_instroom_sc6_midden_a'],
+    }
+
+
+def build_delta_response(df: CompacteProjectie, baseline: CompacteProjectie, scenario: str = 'scenario6',
+                         velden: tuple = None, formaat: str = 'rijen') -> dict:
+    """
+    Bouw de response van /api/scenario?mode=delta: verschillen met de baseline.
+
+    De projectie bevat per jaar scenario - baseline, alleen voor velden die
+    ergens verschillen (de rest staat in 'ongewijzigd'); de baseline projectie
+    (GET /api/baseline, scenario 6) plus de delta geeft exact de volledige
+    projectie. Instroomadvies en impact_analysis zijn die van het scenario.
+
+    Args:
+        df: Model output van het scenario
+        baseline: Model output van de baseline (baseline_params())
+        scenario: 'scenario1' of 'scenario6'
+        velden: Alleen deze projectie velden (None = alle)
+        formaat: 'rijen' of 'kolommen'
+
+    Returns:
+        dict met projectie (delta's), ongewijzigd, kpis, instroomadvies_2043 en
+        (indien beschikbaar) impact_analysis
+    """
+    baseline_kolommen = projectie_kolommen(baseline, 'scenario6', velden)
+    delta, ongewijzigd = {}, []
+    for veld, waarden in projectie_kolommen(df, scenario, velden).items():
+        verschil = np.round(waarden - baseline_kolommen[veld], DELTA_DECIMALEN) + 0.0  # geen -0.0
+        if np.any(verschil):
+            delta[veld] = verschil
+        else:
+            ongewijzigd.append(veld)
+
+    kerncijfers = kerncijfers_2043(df, scenario)
+    kerncijfers_baseline = kerncijfers_2043(baseline)
+    kpis = {'jaar': 2043}
+    for naam, waarde in kerncijfers.items():
+        waarde, basis = round(waarde, 2) + 0.0, round(kerncijfers_baseline[naam], 2) + 0.0
+        kpis[naam] = {'scenario': waarde, 'baseline': basis, 'delta': round(waarde - basis, 2) + 0.0}
+
+    return {
+        'projectie': projectie_payload(df, delta, formaat),
+        'ongewijzigd': ongewijzigd,
+        'kpis': kpis,
+        **instroomadvies_en_impact(df),
+    }
+
+
+def scenario_stream(params: dict, scenario: str = 'scenario6'):
+    """
+    Bereken een scenario in stappen, voor /api/scenario/stream.
+
+    Met de NumPy engine komt het aanbod (stap 1, gecachet per aanbod parameters)
+    vóór de vraagkant; de R engine rekent alles in één proces, dus daar volgen
+    de events direct na elkaar zodra het resultaat er is. Een gecacht scenario
+    geeft alle events meteen.
+
+    Args:
+        params: Parameters zoals parse_scenario_params()
+        scenario: 'scenario1' of 'scenario6'
+
+    Yields:
+        (event, data): 'aanbod' (projectie met aanbod velden), 'vraag' (projectie
+        met benodigd FTE en gap) en 'impact' (instroomadvies_2043, impact_analysis)
+    """
+    df = None
+    if SCENARIO_ENGINE == 'numpy':
+        canoniek = canonicalize_params(params)
+        if _scenario_cache.get(create_cache_key(**canoniek), tel=False) is None:
+            aanbod = scenario_engine.aanbod_dataframe(DATA_PATH, _get_aanbod(canoniek))
+            yield 'aanbod', {'projectie': aanbod_projectie_json(CompacteProjectie.van_dataframe(aanbod, AANBOD_KOLOMMEN, AFGELEIDE_VELDEN))}
+            df = call_r_model(**params)
+
+    if df is None:
+        df = call_r_model(**params)
+        yield 'aanbod', {'projectie': aanbod_projectie_json(df)}
+
+    yield 'vraag', {'projectie': vraag_projectie_json(df, scenario)}
+    yield 'impact', instroomadvies_en_impact(df)
+
+
+def gecachte_response(cache_key: str, maak_payload, mimetype: str = JSON, tabel=None):
+    """
+    Verstuur een response uit de response cache, of bouw en cache hem.
+
+    Bij een hit worden de opgeslagen bytes verstuurd in de encoding die de
+    client accepteert (br, gzip of ongecomprimeerd); er wordt niets opnieuw
+    berekend, geserialiseerd of gecomprimeerd.
+
+    Elke response krijgt een sterke ETag van de cache key (http_cache.py). GET
+    responses krijgen Cache-Control; past If-None-Match, dan volgt een 304
+    zonder dat de cache of het model geraadpleegd wordt.
+
+    Args:
+        cache_key: Canonieke request key (met dataset/engine namespace)
+        maak_payload: Functie die de payload bouwt (alleen bij een miss)
+        mimetype: Response formaat (kies_mimetype()); elk formaat heeft een eigen entry
+        tabel: Functie payload -> (kolommen, metadata) voor Arrow
+
+    Returns:
+        Flask Response
+    """
+    cache_key = response_cache_key(cache_key, mimetype)
+    etag = maak_etag(cache_key)
+    cachebaar = request.method in ('GET', 'HEAD')
+
+    if cachebaar:
+        tag = etag_match(request.if_none_match, etag)
+        if tag is not None:
+            response = app.response_class(status=304)
+            response.set_etag(tag)
+            response.vary.update(('Accept', 'Accept-Encoding'))
+            response.headers['Cache-Control'] = cache_control(HTTP_MAX_AGE, HTTP_STALE_WHILE_REVALIDATE)
+            return response
+
+    gecodeerd = _response_cache.get(cache_key)
+    if gecodeerd is None:
+        body = codeer_resultaat(maak_payload(), mimetype, tabel)
+        gecodeerd = GecodeerdeResponse.van_json(body)
+        _response_cache.put(cache_key, gecodeerd)
+
+    encoding, data = gecodeerd.kies(request.accept_encodings)
+    response = app.response_class(data, mimetype=mimetype)
+    response.vary.update(('Accept', 'Accept-Encoding'))
+    if encoding is not None:
+        response.headers['Content-Encoding'] = encoding
+    # Eigen ETag per gecomprimeerde variant (zelfde vorm als Flask-Compress)
+    response.set_etag(f"{etag}:{encoding}" if encoding is not None else etag)
+    if cachebaar:
+        response.headers['Cache-Control'] = cache_control(HTTP_MAX_AGE, HTTP_STALE_WHILE_REVALIDATE)
+    return response
+
+
+def response_cache_key(cache_key: str, mimetype: str = JSON) -> str:
+    """Response cache key per formaat (JSON houdt de kale key)."""
+    return cache_key if mimetype == JSON else f"{cache_key}|{mimetype}"
+
+
+def kies_mimetype(tabel: bool = True) -> str:
+    """Response formaat voor dit request (Accept header): JSON, msgpack of Arrow."""
+    return binaire_formaten.kies_mimetype(request.accept_mimetypes, arrow=tabel)
+
+
+def codeer_resultaat(payload: dict, mimetype: str, tabel=None) -> bytes:
+    """
+    Serialiseer een payload in het gekozen formaat.
+
+    Args:
+        payload: Response payload (NumPy arrays toegestaan)
+        mimetype: JSON, MSGPACK of ARROW
+        tabel: Functie payload -> (kolommen, metadata), verplicht voor ARROW
+
+    Returns:
+        bytes
+    """
+    if mimetype == MSGPACK:
+        return binaire_formaten.naar_msgpack(payload)
+    if mimetype == ARROW:
+        return binaire_formaten.naar_arrow(*tabel(payload))
+    # Zelfde bytes als jsonify()
+    return f"{app.json.dumps(payload)}\n".encode()
+
+
+def resultaat_response(payload: dict, mimetype: str = JSON, tabel=None):
+    """Verstuur een (niet gecachete) payload in het gekozen formaat (zie codeer_resultaat())."""
+    response = app.response_class(codeer_resultaat(payload, mimetype, tabel), mimetype=mimetype)
+    response.vary.add('Accept')
+    return response
+
+
+def zonder(payload: dict, *sleutels) -> dict:
+    """Payload zonder de tabel velden: de rest gaat als metadata mee in Arrow."""
+    return {k: v for k, v in payload.items() if k not in sleutels}
+
+
+def projectie_tabel(payload: dict) -> tuple:
+    """Arrow tabel van /api/scenario en /api/baseline: de projectie kolommen."""
+    return payload['projectie'], zonder(payload, 'projectie')
+
+
+def batch_tabel(payload: dict) -> tuple:
+    """Arrow tabel van /api/scenarios/batch: projecties onder elkaar met een scenario index."""
+    projecties = [resultaat['projectie'] for resultaat in payload['resultaten']]
+    kolommen = {'scenario': np.repeat(np.arange(len(projecties)), [len(p['jaar']) for p in projecties])}
+    kolommen.update((veld, np.concatenate([p[veld] for p in projecties])) for veld in projecties[0])
+    metadata = {
+        'batch': payload['batch'],
+        'resultaten': [zonder(resultaat, 'projectie') for resultaat in payload['resultaten']],
+    }
+    return kolommen, metadata
+
+
+def sweep_tabel(payload: dict) -> tuple:
+    """Arrow tabel van /api/sweep: één rij per cel (x, y en de outputs)."""
+    x, y = np.meshgrid(payload['x']['waarden'], payload['y']['waarden'])
+    kolommen = {payload['x']['parameter']: x.ravel(), payload['y']['parameter']: y.ravel()}
+    kolommen.update((output, matrix.ravel()) for output, matrix in payload['outputs'].items())
+    return kolommen, zonder(payload, 'outputs')
+
+
+def monte_carlo_tabel(payload: dict) -> tuple:
+    """Arrow tabel van /api/montecarlo: jaar plus een kolom per reeks en percentiel (gap_fte_p5, ...)."""
+    kolommen = {'jaar': np.asarray(payload['jaren'])}
+    for naam, banden in payload['banden'].items():
+        kolommen.update((f"{naam}_{p}", waarden) for p, waarden in banden.items())
+    return kolommen, zonder(payload, 'jaren', 'banden')
+
+
+# Parameters die het model als geheel getal gebruikt (str(int(instroom)) richting R)
+INTEGER_PARAMS = ('instroom',)
+
+
+def gap_fte(df: CompacteProjectie, jaar: int = 2043, scenario: str = 'scenario6') -> float:
+    """
+    Tekort (benodigd - beschikbaar FTE) in een jaar, zoals gap_fte in de projectie.
+
+    Args:
+        df: Model output (call_r_model())
+        jaar: Jaar waarin het tekort bepaald wordt
+        scenario: 'scenario1' of 'scenario6'
+
+    Returns:
+        float: gap in FTE (positief = tekort)
+    """
+    rij = df.rij(jaar)
+    benodigd = rij['scen1_fte_midden'] if scenario == 'scenario1' else rij['scen6_fte_midden_a']
+    return float(benodigd - rij['fte_totaal'])
+
+
+def solve_parameter(params: dict, parameter: str, bereik: tuple, jaar: int = 2043,
+                    scenario: str = 'scenario6') -> dict:
+    """
+    Zoek de waarde van één parameter waarbij het tekort in `jaar` nul is.
+
+    Alle andere parameters blijven gelijk. Elke evaluatie loopt via call_r_model(),
+    dus de grenzen van het bereik en eerdere solves komen uit de cache.
+
+    Args:
+        params: Volledige parameterset (met_vraag_defaults(), anders hebben vraagcomponenten geen effect)
+        parameter: Naam van de te variëren parameter
+        bereik: (min, max) waarbinnen gezocht wordt
+        jaar: Jaar waarin gap_fte nul moet zijn
+        scenario: 'scenario1' of 'scenario6'
+
+    Returns:
+        dict met waarde, gap_fte, iteraties, evaluaties en converged
+
+    Raises:
+        GeenBracketError: Als het tekort binnen het bereik niet van teken wisselt
+    """
+    laag, hoog = bereik
+
+    def gap(waarde):
+        # Gezochte parameter niet afronden, anders ziet de zoeker een trapfunctie
+        return gap_fte(call_r_model(exact=(parameter,), **{**params, parameter: waarde}), jaar, scenario)
+
+    if parameter in INTEGER_PARAMS:
+        # Het model rekent met gehele waarden: zoek de sprong en kies het beste gehele getal
+        resultaat = brent(gap, laag, hoog, xtol=0.5)
+        kandidaten = {
+            int(w): gap(int(w))
+            for w in (math.floor(resultaat['x']), math.ceil(resultaat['x']))
+            if laag <= w <= hoog
+        }
+        waarde = min(kandidaten, key=lambda w: abs(kandidaten[w]))
+        resultaat.update(x=waarde, fx=kandidaten[waarde])
+    else:
+        resultaat = brent(gap, laag, hoog, xtol=(hoog - laag) * 1e-6)
+
+    return {
+        'waarde': resultaat['x'],
+        'gap_fte': resultaat['fx'],
+        'iteraties': resultaat['iteraties'],
+        'evaluaties': resultaat['evaluaties'],
+        'converged': resultaat['converged'],
+    }
+
+
+# Uitkomsten in het evenwichtsjaar waarop de gevoeligheidsanalyse rangschikt
+SENSITIVITY_METRICS = ('gap_fte', 'instroomadvies_2043', 'scenario1', 'scenario2', 'scenario3', 'scenario6')
+
+
+def scenario_metrics(df: CompacteProjectie) -> dict:
+    """
+    Kerncijfers voor evenwichtsjaar 2043: gap, instroomadvies en impact totalen.
+
+    Args:
+        df: Model output (call_r_model())
+
+    Returns:
+        dict: metric -> waarde (zie SENSITIVITY_METRICS)
+    """
+    jaar_2043 = df.rij(2043)
+    return {
+        'gap_fte': gap_fte(df),
+        'instroomadvies_2043': float(jaar_2043['ben_instroom_sc6_midden_a']),
+        'scenario1': float(jaar_2043.get('totaal_impact_sc1_midden', 0)),
+        'scenario2': float(jaar_2043.get('totaal_impact_sc2_midden', 0)),
+        'scenario3': float(jaar_2043.get('totaal_impact_sc3_midden', 0)),
+        'scenario6': float(jaar_2043.get('totaal_impact_sc6_midden', 0)),
+    }
+
+
+def sensitivity_analysis(params: dict, parameters: list, stap: float = 0.1,
+                         stappen: dict = None, modus: str = 'stap') -> tuple[dict, list, dict]:
+    """
+    Lokale gevoeligheidsanalyse (tornado): elke parameter omlaag en omhoog.
+
+    Alle 1 + 2 * len(parameters) scenario's gaan in één call_model_batch(),
+    dus met de NumPy engine is dat één array-berekening.
+
+    Args:
+        params: Basis parameterset (zoals parse_scenario_params())
+        parameters: Te variëren parameters (moeten in VALIDATION_RULES staan)
+        stap: Stapgrootte als fractie van het VALIDATION_RULES bereik
+        stappen: Optioneel absolute stapgrootte per parameter
+        modus: 'stap' (basis ± stap) of 'grenzen' (VALIDATION_RULES min en max)
+
+    Returns:
+        (basis, resultaten, batch_stats): basis metrics, per parameter de
+        laag/hoog waarden met delta's t.o.v. de basis, en de batch statistieken
+    """
+    stappen = stappen or {}
+    varianten = []
+    for parameter in parameters:
+        min_val, max_val, _ = VALIDATION_RULES[parameter]
+        waarde = params[parameter]
+        if modus == 'grenzen':
+            laag, hoog = min_val, max_val
+        else:
+            delta = stappen.get(parameter, stap * (max_val - min_val))
+            # Afronden voorkomt float ruis (0.01 - 0.01 = -1.7e-18) in waarden en cache keys
+            laag, hoog = round(max(min_val, waarde - delta), 10), round(min(max_val, waarde + delta), 10)
+        if parameter in INTEGER_PARAMS:
+            laag, hoog = math.ceil(laag), math.floor(hoog)
+        # Op de slider stap, zodat de gerapporteerde waarden de berekende zijn
+        laag, hoog = snap_waarde(parameter, laag), snap_waarde(parameter, hoog)
+        varianten.append((parameter, waarde, laag, hoog))
+
+    param_sets = [params]
+    for parameter, _, laag, hoog in varianten:
+        param_sets.append({**params, parameter: laag})
+        param_sets.append({**params, parameter: hoog})
+
+    resultaten, batch_stats = call_model_batch(param_sets)
+    metrics = [scenario_metrics(df) for df in resultaten]
+    basis = metrics[0]
+
+    per_parameter = []
+    for i, (parameter, waarde, laag, hoog) in enumerate(varianten):
+        metrics_laag, metrics_hoog = metrics[1 + 2 * i], metrics[2 + 2 * i]
+        per_parameter.append({
+            'parameter': parameter,
+            'basiswaarde': waarde,
+            'laag': laag,
+            'hoog': hoog,
+            'delta_laag': {m: metrics_laag[m] - basis[m] for m in SENSITIVITY_METRICS},
+            'delta_hoog': {m: metrics_hoog[m] - basis[m] for m in SENSITIVITY_METRICS},
+            'spreiding': {m: abs(metrics_hoog[m] - metrics_laag[m]) for m in SENSITIVITY_METRICS},
+        })
+
+    return basis, per_parameter, batch_stats
+
+
+# Uitkomsten per cel van /api/sweep
+SWEEP_OUTPUTS = ('gap_fte', 'aanbod_fte', 'benodigd_fte', 'instroomadvies')
+
+
+def sweep_waarden(parameter: str, spec: dict) -> list:
+    """
+    Roosterpunten voor één as van een sweep.
+
+    Args:
+        parameter: Parameter uit VALIDATION_RULES
+        spec: {"waarden": [...]} of {"min", "max", "stap"} / {"min", "max", "aantal"};
+              min/max default de VALIDATION_RULES grenzen, default 21 punten
+
+    Returns:
+        list: oplopende, unieke waarden (gehele getallen voor INTEGER_PARAMS)
+
+    Raises:
+        ValueError: Bij waarden buiten VALIDATION_RULES of een ongeldige stap
+    """
+    min_val, max_val, error_msg = VALIDATION_RULES[parameter]
+
+    if 'waarden' in spec:
+        waarden = spec['waarden']
+        if not isinstance(waarden, list) or not waarden or any(not isinstance(w, (int, float)) for w in waarden):
+            raise ValueError(f"{parameter}: waarden moet een lijst getallen zijn")
+    else:
+        laag, hoog = spec.get('min', min_val), spec.get('max', max_val)
+        if not isinstance(laag, (int, float)) or not isinstance(hoog, (int, float)) or laag > hoog:
+            raise ValueError(f"{parameter}: min moet kleiner dan max zijn")
+        if 'stap' in spec:
+            stap = spec['stap']
+            if not isinstance(stap, (int, float)) or stap <= 0:
+                raise ValueError(f"{parameter}: stap moet groter dan 0 zijn")
+            aantal = math.floor((hoog - laag) / stap + 1e-9) + 1
+            if aantal > SWEEP_MAX_CELLEN:
+                raise ValueError(f"{parameter}: meer dan {SWEEP_MAX_CELLEN} waarden")
+            waarden = [laag + i * stap for i in range(aantal)]
+        else:
+            aantal = spec.get('aantal', 21)
+            if not isinstance(aantal, int) or not 1 <= aantal <= SWEEP_MAX_CELLEN:
+                raise ValueError(f"{parameter}: aantal moet tussen 1 en {SWEEP_MAX_CELLEN} liggen")
+            waarden = [laag + (hoog - laag) * i / max(aantal - 1, 1) for i in range(aantal)]
+
+    # Afronden voorkomt float ruis (600 + 3 * 0.1) in waarden en output
+    waarden = sorted({int(round(w)) if parameter in INTEGER_PARAMS else round(w, 10) for w in waarden})
+    if not min_val <= waarden[0] <= waarden[-1] <= max_val:
+        raise ValueError(error_msg)
+    return waarden
+
+
+def parameter_sweep(params: dict, x: str, x_waarden: list, y: str, y_waarden: list,
+                    outputs: tuple = SWEEP_OUTPUTS, jaar: int = 2043,
+                    scenario: str = 'scenario6') -> dict:
+    """
+    Bereken uitkomsten in `jaar` voor elk punt van het rooster x × y.
+
+    Rekent met de NumPy engine direct op de arrays (geen DataFrame per cel), in
+    blokken van SWEEP_BLOK scenario's om het geheugen te begrenzen. Met de R
+    engine zou elke cel een losse modelrun zijn.
+
+    Args:
+        params: Vaste parameters (zoals parse_scenario_params())
+        x: Parameter op de kolommen
+        x_waarden: Waarden van x
+        y: Parameter op de rijen
+        y_waarden: Waarden van y
+        outputs: Uitkomsten uit SWEEP_OUTPUTS
+        jaar: Jaar waarin de uitkomsten bepaald worden
+        scenario: 'scenario1' of 'scenario6' (benodigd FTE en gap)
+
+    Returns:
+        dict: output -> array (len(y_waarden), len(x_waarden))
+    """
+    rooster_x, rooster_y = (a.ravel() for a in np.meshgrid(x_waarden, y_waarden))
+    benodigd_kolom = 'scen1_fte_midden' if scenario == 'scenario1' else 'scen6_fte_midden_a'
+
+    delen = {output: [] for output in outputs}
+    for start in range(0, len(rooster_x), SWEEP_BLOK):
+        blok = slice(start, start + SWEEP_BLOK)
+        resultaat = scenario_engine.bereken_scenarios(DATA_PATH, {**params, x: rooster_x[blok], y: rooster_y[blok]})
+        kolom = resultaat['jaar'][0] == jaar
+
+        aanbod = resultaat['fte_totaal'][:, kolom][:, 0]
+        benodigd = resultaat[benodigd_kolom][:, kolom][:, 0]
+        waarden = {
+            'gap_fte': benodigd - aanbod,
+            'aanbod_fte': aanbod,
+            'benodigd_fte': benodigd,
+            'instroomadvies': resultaat['ben_instroom_sc6_midden_a'][:, kolom][:, 0],
+        }
+        for output in outputs:
+            delen[output].append(waarden[output])
+
+    vorm = (len(y_waarden), len(x_waarden))
+    return {output: np.concatenate(d).reshape(vorm) for output, d in delen.items()}
+
+
+def monte_carlo_banden(params: dict, verdelingen: dict = None, spreiding: float = 0.05,
+                       seed: int = None, cache: bool = True, **opties) -> tuple[dict, bool]:
+    """
+    P5/P50/P95 banden voor aanbod, benodigd FTE en gap via Monte Carlo.
+
+    Rekent altijd met de NumPy engine (duizenden trekkingen per array-berekening;
+    met R zou elke trekking een losse modelrun zijn). Met dezelfde seed geeft
+    dezelfde request exact dezelfde banden, dus het resultaat is cachebaar.
+
+    Args:
+        params: Vaste scenario parameters (zoals parse_scenario_params())
+        verdelingen: parameter -> verdeling (None = vast houden), aanvullend op
+            de standaard verdelingen rond de CSV varianten
+        spreiding: Fractie van het VALIDATION_RULES bereik als laag/hoog ontbreken
+        seed: Seed voor reproduceerbare resultaten (None = willekeurige seed)
+        cache: Resultaat cachen (alleen zinvol bij een vaste seed van de client)
+        **opties: doel_breedte, min_samples, max_samples (zie monte_carlo.simuleer())
+
+    Returns:
+        (resultaat, cache_hit): resultaat van monte_carlo.simuleer() plus de
+        gebruikte verdelingen, en of het uit de cache kwam
+
+    Raises:
+        ValueError: Bij een onbekende parameter of ongeldige verdeling
+    """
+    verdelingen = verdelingen or {}
+    params = canonicalize_params(params)
+    if seed is None:
+        seed = secrets.randbelow(2**32)
+
+    cache_key = None
+    if cache:
+        cache_key = create_cache_key(params=params, verdelingen=verdelingen, spreiding=spreiding,
+                                     seed=seed, **opties)
+        cached = _monte_carlo_cache.get(cache_key)
+        if cached is not None:
+            return cached, True
+
+    bereiken = {naam: (min_val, max_val) for naam, (min_val, max_val, _) in VALIDATION_RULES.items()}
+    bereiken.update(monte_carlo.CSV_BEREIKEN)
+    onbekend = [naam for naam in verdelingen if naam not in bereiken]
+    if onbekend:
+        raise ValueError(f"Geen verdeling mogelijk voor: {', '.join(onbekend)}")
+
+    csv_params = scenario_engine.laad_parameters(DATA_PATH)
+    specs = monte_carlo.standaard_verdelingen(csv_params, params)
+    for naam, spec in verdelingen.items():
+        if spec is None:
+            specs.pop(naam, None)
+        elif not isinstance(spec, dict):
+            raise ValueError(f"{naam}: verdeling moet een object zijn")
+        else:
+            specs[naam] = {**specs.get(naam, {}), **spec}
+
+    compleet = {}
+    for naam, spec in specs.items():
+        anker = params.get(naam)
+        if anker is None:
+            anker = spec.get('modus', DEFAULT_PARAMS.get(naam, 0.0))  # factors: 0 = geen effect
+        compleet[naam] = monte_carlo.vul_verdeling_aan(naam, spec, anker, bereiken[naam], spreiding)
+
+    resultaat = monte_carlo.simuleer(DATA_PATH, params, compleet, seed=seed, **opties)
+    resultaat.update(verdelingen=compleet, seed=seed)
+
+    if cache_key is not None:
+        _monte_carlo_cache.put(cache_key, resultaat)
+
+    return resultaat, False
+
+
+# ==================================================================================
+# CACHE WARM-UP
+# ==================================================================================
+
+# Stapgrootte per slider in model eenheden (instroom: stappen van 10 in de frontend)
+WARMUP_SLIDERS = {'instroom': 10, **SLIDER_STAPPEN}
+
+
+def warmup_scenarios(stappen: int = WARMUP_STAPPEN, top_n: int = WARMUP_TOP_N) -> list:
     """
+    Parametersets voor de cache warm-up, in volgorde van belang en zonder dubbelen.
+
+    1. Baseline
+    2. Per slider de default ± 1..`stappen` sliderstappen (binnen VALIDATION_RULES)
+    3. De top-N meest gevraagde scenario's uit de toegangslog
+
+    Args:
+        stappen: Aantal sliderstappen aan weerszijden van de default
+        top_n: Aantal scenario's uit de toegangslog
+
+    Returns:
+        list: parameter dicts voor call_r_model()
+    """
+    basis = parse_scenario_params({})
+    kandidaten = [basis]
+
+    for parameter, stap in WARMUP_SLIDERS.items():
+        default = DEFAULT_PARAMS.get(parameter, 1.0)  # demografie_factor: 1.0
+        min_val, max_val, _ = VALIDATION_RULES[parameter]
+        for k in range(1, stappen + 1):
+            for waarde in (default - k * stap, default + k * stap):
+                if not min_val <= waarde <= max_val:
+                    continue
+                params = {**basis, parameter: waarde}
+                if parameter in scenario_engine.VRAAG_OVERRIDES:
+                    params = met_vraag_defaults(params)  # zoals de frontend: alle vraagcomponenten gezet
+                kandidaten.append(params)
+
+    if toegangslog is not None:
+        kandidaten += toegangslog.top(top_n)
+
+    uniek = {}
+    for params in kandidaten:
+        uniek.setdefault(create_cache_key(**canonicalize_params(params)), params)
+    return list(uniek.values())
+
+
+# Lopende requests (excl. /health): de warm-up rekent alleen als het rustig is
+_live_verkeer = {'actief': 0, 'laatste': 0.0}
+_live_verkeer_lock = threading.Lock()
+
+
+def is_druk() -> bool:
+    """True zolang er requests lopen of de laatste korter dan WARMUP_RUST geleden eindigde."""
+    with _live_verkeer_lock:
+        return _live_verkeer['actief'] > 0 or time.monotonic() - _live_verkeer['laatste'] < WARMUP_RUST
+
+
+@app.before_request
+def _request_start():
+    if request.path == '/health':
+        return
+    with _live_verkeer_lock:
+        _live_verkeer['actief'] += 1
+    if cache_warmup is not None:
+        cache_warmup.start()  # no-op behalve na een fork (gunicorn --preload)
+
+
+@app.teardown_request
+def _request_einde(exc):
+    if request.path == '/health':
+        return
+    with _live_verkeer_lock:
+        _live_verkeer['actief'] -= 1
+        _live_verkeer['laatste'] = time.monotonic()
+
+
+toegangslog = None
+cache_warmup = None
+if WARMUP:
     try:
-        # Roep R model aan met default parameters (met 8 extern rendement en 8 uitstroom waarden)
-        df = call_r_model(
-            instroom=DEFAULT_PARAMS['instroom'],
-            intern_rendement=DEFAULT_PARAMS['intern_rendement'],
-            fte_vrouw=DEFAULT_PARAMS['fte_vrouw'],
-            fte_man=DEFAULT_PARAMS['fte_man'],
-            # Extern rendement - 8 individuele parameters
-            extern_rendement_vrouw_1jaar=DEFAULT_PARAMS['extern_rendement_vrouw_1jaar'],
-            extern_rendement_vrouw_5jaar=DEFAULT_PARAMS['extern_rendement_vrouw_5jaar'],
-            extern_rendement_vrouw_10jaar=DEFAULT_PARAMS['extern_rendement_vrouw_10jaar'],
-            extern_rendement_vrouw_15jaar=DEFAULT_PARAMS['extern_rendement_vrouw_15jaar'],
-            extern_rendement_man_1jaar=DEFAULT_PARAMS['extern_rendement_man_1jaar'],
-            extern_rendement_man_5jaar=DEFAULT_PARAMS['extern_rendement_man_5jaar'],
-            extern_rendement_man_10jaar=DEFAULT_PARAMS['extern_rendement_man_10jaar'],
-            extern_rendement_man_15jaar=DEFAULT_PARAMS['extern_rendement_man_15jaar'],
-            # Uitstroom - 8 individuele parameters
-            uitstroom_vrouw_5j=DEFAULT_PARAMS['uitstroom_vrouw_5j'],
-            uitstroom_man_5j=DEFAULT_PARAMS['uitstroom_man_5j'],
-            uitstroom_vrouw_10j=DEFAULT_PARAMS['uitstroom_vrouw_10j'],
-            uitstroom_man_10j=DEFAULT_PARAMS['uitstroom_man_10j'],
-            uitstroom_vrouw_15j=DEFAULT_PARAMS['uitstroom_vrouw_15j'],
-            uitstroom_man_15j=DEFAULT_PARAMS['uitstroom_man_15j'],
-            uitstroom_vrouw_20j=DEFAULT_PARAMS['uitstroom_vrouw_20j'],
-            uitstroom_man_20j=DEFAULT_PARAMS['uitstroom_man_20j'],
-            # Opleidingsduur
-            opleidingsduur=DEFAULT_PARAMS['opleidingsduur']
-        )
+        toegangslog = ToegangsLog(WARMUP_LOG_PATH)
+        atexit.register(toegangslog.flush)
+    except Exception as e:
+        print(f"Warning: toegangslog ({WARMUP_LOG_PATH}) niet beschikbaar: {e}", file=sys.stderr)
+
+    cache_warmup = WarmUp(
+        bereken=lambda params: call_r_model(**params),
+        scenarios=warmup_scenarios,
+        is_druk=is_druk,
+        pauze=WARMUP_PAUZE,
+        # Met een gedeelde L2 cache warmt één worker op voor allemaal
+        lock_path=f"{L2_CACHE_PATH}.warmup.lock" if _l2_cache is not None else None,
+    )
+    cache_warmup.start()
+
+
+# ==================================================================================
+# FLASK API ENDPOINTS
+# ==================================================================================
+
+@app.route('/health', methods=['GET'])
+def health():
+    """Health check endpoint met data versioning."""
+    r_script_exists = R_SCRIPT_PATH.exists()
+    data_exists = DATA_PATH.exists()
+
+    # Data versioning voor frontend cache invalidatie
+    data_hash = get_csv_hash() if data_exists else None
+    data_modified = os.path.getmtime(DATA_PATH) if data_exists else None
+
+    # R script is alleen vereist als de R engine actief is
+    engine_ready = r_script_exists or SCENARIO_ENGINE == 'numpy'
+
+    return jsonify({
+        'status': 'healthy' if (engine_ready and data_exists) else 'degraded',
+        'versie': '3.0',
+        'r_script_found': r_script_exists,
+        'data_found': data_exists,
+        'r_script_path': str(R_SCRIPT_PATH),
+        'engine': SCENARIO_ENGINE,
+        'r_workers': _r_worker_pool.get_stats() if _r_worker_pool else None,
+        'data_hash': data_hash,  # Voor cache invalidatie
+        'cache_namespace': fingerprints.namespace(),  # dataset + engine versie in cache keys
+        'warmup': cache_warmup.status() if cache_warmup is not None else {'status': 'uit'},
+        'jobs': _job_store.stats() if _job_store is not None else None,
+        'data_modified': data_modified,  # Unix timestamp
+    })
 
-        # Converteer naar JSON (scenario 6)
-        projectie = dataframe_to_projectie_json(df, scenario='scenario6')
 
-        return jsonify({'projectie': projectie})
+@app.route('/api/baseline', methods=['GET'])
+def api_baseline():
+    """
+    Bereken baseline scenario (huidige parameters, scenario 6).
+
+    Query parameters (optioneel):
+        format=kolommen       projectie als één array per veld plus de jaar as
+                              (standaard bij msgpack en Arrow, zie kies_mimetype())
+        fields=gap_fte,...    alleen deze projectie velden (PROJECTIE_VELDEN)
+
+    Returns:
+        JSON met projectie 2025-2043
+    """
+    try:
+        params = baseline_params()
+
+        mimetype = kies_mimetype()
+        try:
+            formaat, velden = lees_projectie_opties(request.args, 'rijen' if mimetype == JSON else 'kolommen')
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if mimetype == ARROW:
+            formaat = 'kolommen'  # Arrow is altijd een tabel met kolommen
+
+        def payload():
+            # Roep R model aan en converteer naar JSON (scenario 6)
+            df = call_r_model(**params)
+            return {'projectie': dataframe_to_projectie_json(df, scenario='scenario6', velden=velden, formaat=formaat)}
+
+        return gecachte_response(baseline_cache_key(formaat, velden), payload, mimetype, tabel=projectie_tabel)
 
     except Exception as e:
         # Uitgebreide error logging
@@ -701,158 +2259,708 @@ def api_scenario():
         "uitstroom_factor_man": 1.0
     }
 
+    Query parameters (optioneel):
+        format=kolommen       projectie als één array per veld plus de jaar as
+                              (standaard bij msgpack en Arrow, zie kies_mimetype())
+        fields=gap_fte,...    alleen deze projectie velden (PROJECTIE_VELDEN)
+        mode=delta            alleen verschillen met de baseline plus kpis (build_delta_response())
+
     Returns:
-        JSON met projectie 2025-2043
+        JSON met projectie 2025-2043; Content-Location is de canonieke GET URL
     """
     try:
-        data = request.json
+        return scenario_response(request.json)
 
-        # Parse parameters (met defaults)
-        instroom = data.get('instroom', DEFAULT_PARAMS['instroom'])
-        intern_rendement = data.get('intern_rendement', DEFAULT_PARAMS['intern_rendement'])
-        opleidingsduur = data.get('opleidingsduur', DEFAULT_PARAMS['opleidingsduur'])
-        fte_vrouw = data.get('fte_vrouw', DEFAULT_PARAMS['fte_vrouw'])
-        fte_man = data.get('fte_man', DEFAULT_PARAMS['fte_man'])
-
-        # Extern rendement (8 waarden, verplicht vanaf frontend)
-        extern_rendement_vrouw_1jaar = data.get('extern_rendement_vrouw_1jaar', DEFAULT_PARAMS['extern_rendement_vrouw_1jaar'])
-        extern_rendement_vrouw_5jaar = data.get('extern_rendement_vrouw_5jaar', DEFAULT_PARAMS['extern_rendement_vrouw_5jaar'])
-        extern_rendement_vrouw_10jaar = data.get('extern_rendement_vrouw_10jaar', DEFAULT_PARAMS['extern_rendement_vrouw_10jaar'])
-        extern_rendement_vrouw_15jaar = data.get('extern_rendement_vrouw_15jaar', DEFAULT_PARAMS['extern_rendement_vrouw_15jaar'])
-        extern_rendement_man_1jaar = data.get('extern_rendement_man_1jaar', DEFAULT_PARAMS['extern_rendement_man_1jaar'])
-        extern_rendement_man_5jaar = data.get('extern_rendement_man_5jaar', DEFAULT_PARAMS['extern_rendement_man_5jaar'])
-        extern_rendement_man_10jaar = data.get('extern_rendement_man_10jaar', DEFAULT_PARAMS['extern_rendement_man_10jaar'])
-        extern_rendement_man_15jaar = data.get('extern_rendement_man_15jaar', DEFAULT_PARAMS['extern_rendement_man_15jaar'])
-
-        # Uitstroom (8 waarden, verplicht vanaf frontend)
-        uitstroom_vrouw_5j = data.get('uitstroom_vrouw_5j', DEFAULT_PARAMS['uitstroom_vrouw_5j'])
-        uitstroom_man_5j = data.get('uitstroom_man_5j', DEFAULT_PARAMS['uitstroom_man_5j'])
-        uitstroom_vrouw_10j = data.get('uitstroom_vrouw_10j', DEFAULT_PARAMS['uitstroom_vrouw_10j'])
-        uitstroom_man_10j = data.get('uitstroom_man_10j', DEFAULT_PARAMS['uitstroom_man_10j'])
-        uitstroom_vrouw_15j = data.get('uitstroom_vrouw_15j', DEFAULT_PARAMS['uitstroom_vrouw_15j'])
-        uitstroom_man_15j = data.get('uitstroom_man_15j', DEFAULT_PARAMS['uitstroom_man_15j'])
-        uitstroom_vrouw_20j = data.get('uitstroom_vrouw_20j', DEFAULT_PARAMS['uitstroom_vrouw_20j'])
-        uitstroom_man_20j = data.get('uitstroom_man_20j', DEFAULT_PARAMS['uitstroom_man_20j'])
+    except Exception as e:
+        # Uitgebreide error logging
+        print("\n" + "="*80, file=sys.stderr)
+        print("❌ ERROR in /api/scenario endpoint", file=sys.stderr)
+        print("="*80, file=sys.stderr)
+        print(f"\n🔴 Exception type: {type(e).__name__}", file=sys.stderr)
+        print(f"🔴 Exception message: {str(e)}", file=sys.stderr)
+        print(f"\n📋 Request data:", file=sys.stderr)
+        print(f"   {request.json}", file=sys.stderr)
+        print(f"\n📚 Full stack trace:", file=sys.stderr)
+        traceback.print_exc(file=sys.stderr)
+        print("="*80 + "\n", file=sys.stderr)
 
-        scenario = data.get('scenario', 'scenario6')
+        # Error sanitization - alleen details in DEBUG mode
+        if DEBUG:
+            return jsonify({'error': str(e)}), 500  # Development: details
+        else:
+            return jsonify({'error': 'Internal server error'}), 500  # Production: generiek
+
+
+@app.route('/api/scenario', methods=['GET'])
+# Zelfde limiet als POST; herhaalde views komen uit browser/edge cache. De redirect naar
+# de canonieke URL telt niet mee, anders kost een deelbare URL twee requests van het budget
+@limiter.limit("10 per minute", deduct_when=lambda response: response.status_code != 302)
+def api_scenario_get():
+    """
+    GET vorm van /api/scenario, cachebaar door browser en edge (Cloudflare).
+
+    De parameters staan in de query string (namen zoals in de JSON body), bijv.
+    /api/scenario?fte_vrouw=0.75&instroom=900&scenario=scenario1. Een andere
+    schrijfwijze dan de canonieke URL (scenario_url()) krijgt een redirect, zodat
+    gelijke scenario's één cache entry delen. De response heeft een ETag en
+    Cache-Control; met een passende If-None-Match volgt 304.
+
+    Returns:
+        Zelfde response als POST /api/scenario (of 302 naar de canonieke URL)
+    """
+    try:
+        try:
+            data = lees_scenario_query(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
 
-        # Nieuwe parameters: vraagcomponenten (defaults naar None)
-        epi_midden = data.get('epi_midden', None)
-        soc_midden = data.get('soc_midden', None)
-        vak_midden = data.get('vak_midden', None)
-        eff_midden = data.get('eff_midden', None)
-        hor_midden = data.get('hor_midden', None)
-        tijd_midden = data.get('tijd_midden', None)
-        ver_midden = data.get('ver_midden', None)
-        totale_zorgvraag_excl_ATV_midden = data.get('totale_zorgvraag_excl_ATV_midden', None)
-
-        # Nieuwe parameters: demografie en uitstroom factors (defaults naar None)
-        demografie_factor = data.get('demografie_factor', None)
-        uitstroom_factor_vrouw = data.get('uitstroom_factor_vrouw', None)
-        uitstroom_factor_man = data.get('uitstroom_factor_man', None)
-
-        # Validatie met helper function
         is_valid, error_message = validate_parameters(data)
         if not is_valid:
             return jsonify({'error': error_message}), 400
 
-        # Roep R model aan
-        df = call_r_model(
-            instroom=instroom,
-            intern_rendement=intern_rendement,
-            fte_vrouw=fte_vrouw,
-            fte_man=fte_man,
-            # Extern rendement (8 individuele waarden)
-            extern_rendement_vrouw_1jaar=extern_rendement_vrouw_1jaar,
-            extern_rendement_vrouw_5jaar=extern_rendement_vrouw_5jaar,
-            extern_rendement_vrouw_10jaar=extern_rendement_vrouw_10jaar,
-            extern_rendement_vrouw_15jaar=extern_rendement_vrouw_15jaar,
-            extern_rendement_man_1jaar=extern_rendement_man_1jaar,
-            extern_rendement_man_5jaar=extern_rendement_man_5jaar,
-            extern_rendement_man_10jaar=extern_rendement_man_10jaar,
-            extern_rendement_man_15jaar=extern_rendement_man_15jaar,
-            # Uitstroom (8 individuele waarden)
-            uitstroom_vrouw_5j=uitstroom_vrouw_5j,
-            uitstroom_man_5j=uitstroom_man_5j,
-            uitstroom_vrouw_10j=uitstroom_vrouw_10j,
-            uitstroom_man_10j=uitstroom_man_10j,
-            uitstroom_vrouw_15j=uitstroom_vrouw_15j,
-            uitstroom_man_15j=uitstroom_man_15j,
-            uitstroom_vrouw_20j=uitstroom_vrouw_20j,
-            uitstroom_man_20j=uitstroom_man_20j,
-            # Vraagcomponenten
-            epi_midden=epi_midden,
-            soc_midden=soc_midden,
-            vak_midden=vak_midden,
-            eff_midden=eff_midden,
-            hor_midden=hor_midden,
-            tijd_midden=tijd_midden,
-            ver_midden=ver_midden,
-            totale_zorgvraag_excl_ATV_midden=totale_zorgvraag_excl_ATV_midden,
-            # Demografie en uitstroom factors
-            demografie_factor=demografie_factor,
-            uitstroom_factor_vrouw=uitstroom_factor_vrouw,
-            uitstroom_factor_man=uitstroom_factor_man,
-            # Opleidingsduur
-            opleidingsduur=opleidingsduur
-        )
+        canoniek = scenario_url(data, request.args)
+        if request.full_path.rstrip('?') != canoniek:
+            response = redirect(canoniek, code=302)
+            response.headers['Cache-Control'] = cache_control(HTTP_MAX_AGE, HTTP_STALE_WHILE_REVALIDATE)
+            return response
 
-        # Converteer naar JSON
-        projectie = dataframe_to_projectie_json(df, scenario=scenario)
-
-        # Haal impact analyse data op voor evenwichtsjaar 2043
-        impact_analysis = extract_impact_analysis(df)
-
-        # Bereken instroomadvies voor evenwichtsjaar 2043
-        #
-        # BELANGRIJK: Instroomadvies wordt berekend door het R-model (run_scenario_api_v2.R)
-        # Python dupliceert GEEN logica - we lezen het direct uit de R-model output.
-        # Dit garandeert 100% consistentie met de officiële STATA/Excel berekeningen.
-        #
-        # Het R-model berekent: ben_instroom_sc6_midden_a = n_inopleiding_perjaar3 +
-        #                       (sc6_ftetekort_midden_a / fte_toekomst) * n_inopleiding_perjaar3
-        #
-        # Het instroomadvies wordt berekend op basis van het AANGEPASTE scenario (df),
-        # zodat het correct reageert op zowel aanbod- als vraagparameter wijzigingen.
-        # Dit zorgt ervoor dat het instroomadvies het tekort in 2043 compenseert.
-
-        # Lees instroomadvies uit het aangepaste scenario
-        jaar_2043_scenario = df[df['jaar'] == 2043].iloc[0]
-        instroomadvies = jaar_2043_scenario['ben_instroom_sc6_midden_a']
-
-        # Bouw response met optionele impact_analysis
-        response = {
-            'projectie': projectie,
-            'instroomadvies_2043': round(instroomadvies, 0) if instroomadvies else None
-        }
+        return scenario_response(data)
+
+    except Exception as e:
+        print("\n" + "="*80, file=sys.stderr)
+        print("❌ ERROR in GET /api/scenario endpoint", file=sys.stderr)
+        print("="*80, file=sys.stderr)
+        print(f"\n🔴 Exception type: {type(e).__name__}", file=sys.stderr)
+        print(f"🔴 Exception message: {str(e)}", file=sys.stderr)
+        print(f"\n📋 Query: {request.query_string.decode()}", file=sys.stderr)
+        traceback.print_exc(file=sys.stderr)
+        print("="*80 + "\n", file=sys.stderr)
+
+        if DEBUG:
+            return jsonify({'error': str(e)}), 500
+        else:
+            return jsonify({'error': 'Internal server error'}), 500
+
+
+def scenario_response(data: dict):
+    """
+    Response van /api/scenario (POST en GET) voor een request body.
+
+    Args:
+        data: JSON body, of de query parameters van de GET vorm (lees_scenario_query())
+
+    Returns:
+        Flask Response uit de response cache, of (JSON error, 400)
+    """
+    # Parse parameters (met defaults)
+    params = parse_scenario_params(data)
+    scenario = data.get('scenario', 'scenario6')
+
+    # Validatie met helper function
+    is_valid, error_message = validate_parameters(data)
+    if not is_valid:
+        return jsonify({'error': error_message}), 400
+    mimetype = kies_mimetype()
+    try:
+        formaat, velden = lees_projectie_opties(request.args, 'rijen' if mimetype == JSON else 'kolommen')
+        modus = lees_response_modus(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if mimetype == ARROW:
+        formaat = 'kolommen'  # Arrow is altijd een tabel met kolommen
+
+    def payload():
+        # Roep R model aan (alleen als de response niet in de response cache staat)
+        df = call_r_model(**params)
+
+        if modus == 'delta':
+            # Baseline uit de cache (zelfde dataset versie als het scenario, zie cache_key)
+            response = build_delta_response(df, call_r_model(**baseline_params()), scenario=scenario,
+                                            velden=velden, formaat=formaat)
+            response['baseline'] = {
+                'url': baseline_url(formaat, velden),
+                'etag': maak_etag(response_cache_key(baseline_cache_key(formaat, velden), mimetype)),
+            }
+        else:
+            response = build_scenario_response(df, scenario=scenario, velden=velden, formaat=formaat)
+        impact_analysis = response.get('impact_analysis')
 
-        # Voeg impact analysis toe als beschikbaar
         if impact_analysis is not None:
-            response['impact_analysis'] = impact_analysis
             print(f"📊 DEBUG: impact_analysis toegevoegd aan response (scenario6={impact_analysis['scenario_totalen']['scenario6']})")
         else:
             print("⚠️  DEBUG: impact_analysis is None - NIET toegevoegd aan response")
+        return response
+
+    canoniek = canonicalize_params(params)
+    if toegangslog is not None:
+        toegangslog.registreer(canoniek)  # voor de top-N warm-up na een herstart
+
+    cache_key = f"{create_cache_key(**canoniek)}:{scenario}{projectie_opties_key(formaat, velden)}"
+    if modus == 'delta':
+        cache_key += ':delta'
+    response = gecachte_response(cache_key, payload, mimetype, tabel=projectie_tabel)
+    response.headers['Content-Location'] = scenario_url(data, request.args)
+    return response
+
+
+@app.route('/api/scenario/stream', methods=['POST'])
+@limiter.limit("10 per minute")  # Zelfde limiet als /api/scenario
+def api_scenario_stream():
+    """
+    Bereken een scenario en stuur het resultaat in stappen (server-sent events).
+
+    Zelfde JSON body als /api/scenario. Events (data = JSON):
+        event: aanbod   {"projectie": [{jaar, aanbod_fte, aanbod_personen, cohorten...}]}
+        event: vraag    {"projectie": [{jaar, benodigd_fte, gap_fte, gap_percentage}]}
+        event: impact   {"instroomadvies_2043": ..., "impact_analysis": {...}}
+        event: fout     {"error": ...}  (in plaats van de resterende events)
+
+    De projecties van aanbod en vraag samengevoegd per jaar zijn gelijk aan de
+    projectie van /api/scenario.
+
+    Returns:
+        text/event-stream; 400 (JSON) bij ongeldige parameters
+    """
+    data = request.json
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Body moet een object zijn'}), 400
+
+    is_valid, error_message = validate_parameters(data)
+    if not is_valid:
+        return jsonify({'error': error_message}), 400
 
-        return jsonify(response)
+    params = parse_scenario_params(data)
+    scenario = data.get('scenario', 'scenario6')
+    if toegangslog is not None:
+        toegangslog.registreer(canonicalize_params(params))
+
+    def events():
+        try:
+            for event, payload in scenario_stream(params, scenario):
+                yield f"event: {event}\ndata: {app.json.dumps(payload)}\n\n"
+        except Exception as e:
+            print(f"❌ ERROR in /api/scenario/stream: {type(e).__name__}: {e}", file=sys.stderr)
+            traceback.print_exc(file=sys.stderr)
+            fout = {'error': str(e) if DEBUG else 'Internal server error'}
+            yield f"event: fout\ndata: {app.json.dumps(fout)}\n\n"
+
+    response = app.response_class(stream_with_context(events()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # geen buffering in een reverse proxy
+    return response
+
+
+@app.route('/api/scenarios/batch', methods=['POST'])
+@limiter.limit("10 per minute")  # Zelfde limiet als /api/scenario, maar per batch
+def api_scenarios_batch():
+    """
+    Bereken meerdere scenario's in één request.
+
+    Expected JSON body (of direct de lijst):
+    {
+        "scenarios": [
+            {"instroom": 718, ...},     # zelfde velden als /api/scenario
+            {"instroom": 1026, "scenario": "scenario1", ...}
+        ]
+    }
+
+    Query parameters (optioneel):
+        format=kolommen       projectie als één array per veld plus de jaar as
+                              (standaard bij msgpack en Arrow, zie kies_mimetype())
+        fields=gap_fte,...    alleen deze projectie velden (PROJECTIE_VELDEN)
+
+    Returns:
+        JSON met per scenario dezelfde response als /api/scenario, in request volgorde
+    """
+    try:
+        data = request.json
+        scenarios = data.get('scenarios') if isinstance(data, dict) else data
+
+        if not isinstance(scenarios, list) or not scenarios:
+            return jsonify({'error': "Body moet een niet-lege lijst 'scenarios' bevatten"}), 400
+        if len(scenarios) > BATCH_MAX_SCENARIOS:
+            return jsonify({'error': f"Maximaal {BATCH_MAX_SCENARIOS} scenario's per batch"}), 400
+
+        # Valideer alles vooraf: een ongeldige batch kost geen rekentijd
+        for i, scenario_data in enumerate(scenarios):
+            if not isinstance(scenario_data, dict):
+                return jsonify({'error': f"Scenario {i}: moet een object zijn"}), 400
+            is_valid, error_message = validate_parameters(scenario_data)
+            if not is_valid:
+                return jsonify({'error': f"Scenario {i}: {error_message}"}), 400
+
+        mimetype = kies_mimetype()
+        try:
+            formaat, velden = lees_projectie_opties(request.args, 'rijen' if mimetype == JSON else 'kolommen')
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if mimetype == ARROW:
+            formaat = 'kolommen'  # Arrow is altijd een tabel met kolommen
+
+        param_sets = [parse_scenario_params(scenario_data) for scenario_data in scenarios]
+        resultaten, stats = call_model_batch(param_sets)
+
+        return resultaat_response({
+            'resultaten': [
+                build_scenario_response(df, scenario=scenario_data.get('scenario', 'scenario6'),
+                                        velden=velden, formaat=formaat)
+                for df, scenario_data in zip(resultaten, scenarios)
+            ],
+            'batch': stats,
+        }, mimetype, tabel=batch_tabel)
 
     except Exception as e:
-        # Uitgebreide error logging
         print("\n" + "="*80, file=sys.stderr)
-        print("❌ ERROR in /api/scenario endpoint", file=sys.stderr)
+        print("❌ ERROR in /api/scenarios/batch endpoint", file=sys.stderr)
         print("="*80, file=sys.stderr)
         print(f"\n🔴 Exception type: {type(e).__name__}", file=sys.stderr)
         print(f"🔴 Exception message: {str(e)}", file=sys.stderr)
-        print(f"\n📋 Request data:", file=sys.stderr)
-        print(f"   {request.json}", file=sys.stderr)
-        print(f"\n📚 Full stack trace:", file=sys.stderr)
         traceback.print_exc(file=sys.stderr)
         print("="*80 + "\n", file=sys.stderr)
 
-        # Error sanitization - alleen details in DEBUG mode
         if DEBUG:
-            return jsonify({'error': str(e)}), 500  # Development: details
+            return jsonify({'error': str(e)}), 500
         else:
-            return jsonify({'error': 'Internal server error'}), 500  # Production: generiek
+            return jsonify({'error': 'Internal server error'}), 500
+
+
+@app.route('/api/solve', methods=['POST'])
+@limiter.limit("10 per minute")
+def api_solve():
+    """
+    Goal-seek: welke waarde van één parameter sluit het tekort in een jaar?
+
+    Expected JSON body:
+    {
+        "parameter": "instroom",        # elke parameter uit VALIDATION_RULES (default instroom)
+        "jaar": 2043,                   # default evenwichtsjaar
+        "scenario": "scenario6",        # of "scenario1"
+        "bereik": [600, 1500],          # optioneel, default VALIDATION_RULES grenzen
+        ...                             # overige parameters zoals /api/scenario (blijven vast)
+    }
+
+    Returns:
+        JSON met de gevonden waarde, de resterende gap en het aantal modelberekeningen
+    """
+    try:
+        data = request.json
+        parameter = data.get('parameter', 'instroom')
+        jaar = data.get('jaar', 2043)
+        scenario = data.get('scenario', 'scenario6')
+
+        if parameter not in VALIDATION_RULES:
+            return jsonify({'error': f"Onbekende parameter: {parameter}"}), 400
+        if parameter in GENEGEERDE_PARAMS:
+            return jsonify({'error': f"{parameter} heeft geen effect in het model (absolute uitstroom override)"}), 400
+        if not isinstance(jaar, int) or not 2025 <= jaar <= 2043:
+            return jsonify({'error': 'Jaar moet tussen 2025 en 2043 zijn'}), 400
+        if scenario not in ('scenario1', 'scenario6'):
+            return jsonify({'error': "Scenario moet 'scenario1' of 'scenario6' zijn"}), 400
+
+        min_val, max_val, error_msg = VALIDATION_RULES[parameter]
+        bereik = data.get('bereik', [min_val, max_val])
+        if (not isinstance(bereik, list) or len(bereik) != 2 or
+                not min_val <= bereik[0] < bereik[1] <= max_val):
+            return jsonify({'error': f"Bereik moet binnen [{min_val}, {max_val}] liggen ({error_msg})"}), 400
+
+        is_valid, error_message = validate_parameters(data)
+        if not is_valid:
+            return jsonify({'error': error_message}), 400
+
+        # Vraagcomponenten met defaults, anders heeft een vraagcomponent geen effect
+        params = met_vraag_defaults(parse_scenario_params(data))
+
+        try:
+            resultaat = solve_parameter(params, parameter, tuple(bereik), jaar=jaar, scenario=scenario)
+        except GeenBracketError as e:
+            return jsonify({
+                'error': f"Tekort in {jaar} wisselt niet van teken binnen het bereik van {parameter}",
+                'bereik': bereik,
+                'gap_fte': [round(e.fa, 2), round(e.fb, 2)],
+            }), 422
+
+        return resultaat_response({
+            'parameter': parameter,
+            'jaar': jaar,
+            'scenario': scenario,
+            'waarde': resultaat['waarde'] if parameter in INTEGER_PARAMS else round(resultaat['waarde'], 6),
+            'gap_fte': round(resultaat['gap_fte'], 2) + 0.0,  # geen -0.0
+            'bereik': bereik,
+            'iteraties': resultaat['iteraties'],
+            'evaluaties': resultaat['evaluaties'],
+            'converged': resultaat['converged'],
+        }, kies_mimetype(tabel=False))
+
+    except Exception as e:
+        print("\n" + "="*80, file=sys.stderr)
+        print("❌ ERROR in /api/solve endpoint", file=sys.stderr)
+        print("="*80, file=sys.stderr)
+        print(f"\n🔴 Exception type: {type(e).__name__}", file=sys.stderr)
+        print(f"🔴 Exception message: {str(e)}", file=sys.stderr)
+        traceback.print_exc(file=sys.stderr)
+        print("="*80 + "\n", file=sys.stderr)
+
+        if DEBUG:
+            return jsonify({'error': str(e)}), 500
+        else:
+            return jsonify({'error': 'Internal server error'}), 500
+
+
+@app.route('/api/sensitivity', methods=['POST'])
+@limiter.limit("10 per minute")
+def api_sensitivity():
+    """
+    Tornado data: effect van elke parameter op gap en instroomadvies in 2043.
+
+    Expected JSON body (alles optioneel):
+    {
+        "modus": "stap",                # "stap" (basis ± stap) of "grenzen" (VALIDATION_RULES)
+        "stap": 0.1,                    # fractie van het VALIDATION_RULES bereik
+        "stappen": {"instroom": 50},    # absolute stap per parameter (overschrijft "stap")
+        "parameters": ["instroom", ...],  # default: alle DEFAULT_PARAMS
+        "rangschik_op": "gap_fte",      # een van SENSITIVITY_METRICS
+        ...                             # basis parameters zoals /api/scenario
+    }
+
+    Returns:
+        JSON met basis metrics en per parameter de delta's, gesorteerd op spreiding
+    """
+    try:
+        data = request.json or {}
+        modus = data.get('modus', 'stap')
+        stap = data.get('stap', 0.1)
+        stappen = data.get('stappen', {})
+        parameters = data.get('parameters', list(DEFAULT_PARAMS))
+        rangschik_op = data.get('rangschik_op', 'gap_fte')
+
+        if modus not in ('stap', 'grenzen'):
+            return jsonify({'error': "Modus moet 'stap' of 'grenzen' zijn"}), 400
+        if not isinstance(stap, (int, float)) or not 0 < stap <= 1:
+            return jsonify({'error': 'Stap moet tussen 0 en 1 liggen (fractie van het bereik)'}), 400
+        if not isinstance(stappen, dict) or any(not isinstance(v, (int, float)) or v <= 0 for v in stappen.values()):
+            return jsonify({'error': 'Stappen moeten positieve getallen zijn'}), 400
+        onbekend = [p for p in list(parameters) + list(stappen) if p not in DEFAULT_PARAMS]
+        if onbekend:
+            return jsonify({'error': f"Onbekende parameters: {', '.join(onbekend)}"}), 400
+        if rangschik_op not in SENSITIVITY_METRICS:
+            return jsonify({'error': f"rangschik_op moet een van {', '.join(SENSITIVITY_METRICS)} zijn"}), 400
+
+        is_valid, error_message = validate_parameters(data)
+        if not is_valid:
+            return jsonify({'error': error_message}), 400
+
+        # Vraagcomponenten met defaults, anders hebben variaties geen effect
+        params = met_vraag_defaults(parse_scenario_params(data))
+
+        basis, per_parameter, batch_stats = sensitivity_analysis(
+            params, parameters, stap=stap, stappen=stappen, modus=modus
+        )
+        per_parameter.sort(key=lambda r: r['spreiding'][rangschik_op], reverse=True)
+
+        afronden = lambda d: {m: round(v, 2) for m, v in d.items()}
+        return resultaat_response({
+            'basis': afronden(basis),
+            'parameters': [
+                {**r, **{k: afronden(r[k]) for k in ('delta_laag', 'delta_hoog', 'spreiding')}}
+                for r in per_parameter
+            ],
+            'rangschikking': {
+                m: [r['parameter'] for r in sorted(per_parameter, key=lambda r: r['spreiding'][m], reverse=True)]
+                for m in SENSITIVITY_METRICS
+            },
+            'modus': modus,
+            'batch': batch_stats,
+        }, kies_mimetype(tabel=False))
+
+    except Exception as e:
+        print("\n" + "="*80, file=sys.stderr)
+        print("❌ ERROR in /api/sensitivity endpoint", file=sys.stderr)
+        print("="*80, file=sys.stderr)
+        print(f"\n🔴 Exception type: {type(e).__name__}", file=sys.stderr)
+        print(f"🔴 Exception message: {str(e)}", file=sys.stderr)
+        traceback.print_exc(file=sys.stderr)
+        print("="*80 + "\n", file=sys.stderr)
+
+        if DEBUG:
+            return jsonify({'error': str(e)}), 500
+        else:
+            return jsonify({'error': 'Internal server error'}), 500
+
+
+@app.route('/api/sweep', methods=['POST'])
+@limiter.limit("10 per minute")
+def api_sweep():
+    """
+    Heatmap: uitkomsten in een jaar over een rooster van twee parameters.
+
+    Expected JSON body:
+    {
+        "x": {"parameter": "instroom", "min": 600, "max": 1500, "stap": 50},
+        "y": {"parameter": "fte_vrouw", "aantal": 11},   # of "waarden": [...]
+        "outputs": ["gap_fte"],         # subset van SWEEP_OUTPUTS (default alle)
+        "jaar": 2043,
+        "scenario": "scenario6",        # of "scenario1"
+        ...                             # overige parameters zoals /api/scenario (blijven vast)
+    }
+
+    Returns:
+        JSON met de waarden per as en per output een matrix [rij = y][kolom = x]
+    """
+    try:
+        data = request.json or {}
+        x_spec, y_spec = data.get('x'), data.get('y')
+        outputs = data.get('outputs', list(SWEEP_OUTPUTS))
+        jaar = data.get('jaar', 2043)
+        scenario = data.get('scenario', 'scenario6')
+
+        if not isinstance(x_spec, dict) or not isinstance(y_spec, dict):
+            return jsonify({'error': 'x en y moeten objecten zijn met minimaal een parameter'}), 400
+        x, y = x_spec.get('parameter'), y_spec.get('parameter')
+        onbekend = [p for p in (x, y) if p not in VALIDATION_RULES]
+        if onbekend:
+            return jsonify({'error': f"Onbekende parameters: {', '.join(map(str, onbekend))}"}), 400
+        if x == y:
+            return jsonify({'error': 'x en y moeten verschillende parameters zijn'}), 400
+        if not isinstance(outputs, list) or not outputs or any(o not in SWEEP_OUTPUTS for o in outputs):
+            return jsonify({'error': f"Outputs moeten uit {', '.join(SWEEP_OUTPUTS)} komen"}), 400
+        if not isinstance(jaar, int) or not 2025 <= jaar <= 2043:
+            return jsonify({'error': 'Jaar moet tussen 2025 en 2043 zijn'}), 400
+        if scenario not in ('scenario1', 'scenario6'):
+            return jsonify({'error': "Scenario moet 'scenario1' of 'scenario6' zijn"}), 400
+
+        try:
+            x_waarden, y_waarden = sweep_waarden(x, x_spec), sweep_waarden(y, y_spec)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        cellen = len(x_waarden) * len(y_waarden)
+        if cellen > SWEEP_MAX_CELLEN:
+            return jsonify({'error': f"Rooster heeft {cellen} cellen (maximaal {SWEEP_MAX_CELLEN})"}), 400
+
+        is_valid, error_message = validate_parameters(data)
+        if not is_valid:
+            return jsonify({'error': error_message}), 400
+
+        # Vraagcomponenten met defaults, anders hebben variaties geen effect
+        params = met_vraag_defaults(parse_scenario_params(data))
+        matrices = parameter_sweep(params, x, x_waarden, y, y_waarden, tuple(outputs), jaar=jaar, scenario=scenario)
+
+        return resultaat_response({
+            'x': {'parameter': x, 'waarden': x_waarden},
+            'y': {'parameter': y, 'waarden': y_waarden},
+            'outputs': {output: np.round(m, 2) for output, m in matrices.items()},
+            'jaar': jaar,
+            'scenario': scenario,
+            'cellen': cellen,
+            'engine': 'numpy',
+        }, kies_mimetype(), tabel=sweep_tabel)
+
+    except Exception as e:
+        print("\n" + "="*80, file=sys.stderr)
+        print("❌ ERROR in /api/sweep endpoint", file=sys.stderr)
+        print("="*80, file=sys.stderr)
+        print(f"\n🔴 Exception type: {type(e).__name__}", file=sys.stderr)
+        print(f"🔴 Exception message: {str(e)}", file=sys.stderr)
+        traceback.print_exc(file=sys.stderr)
+        print("="*80 + "\n", file=sys.stderr)
+
+        if DEBUG:
+            return jsonify({'error': str(e)}), 500
+        else:
+            return jsonify({'error': 'Internal server error'}), 500
+
+
+@app.route('/api/montecarlo', methods=['POST'])
+@limiter.limit("10 per minute")
+def api_montecarlo():
+    """
+    Onzekerheidsbanden (P5/P50/P95) per jaar voor aanbod, benodigd FTE en gap.
+
+    Expected JSON body (alles optioneel):
+    {
+        "seed": 42,                     # vaste seed = reproduceerbaar en gecachet
+        "doel_breedte": 25,             # gewenste CI breedte (FTE) van de gap percentielen in 2043
+        "min_samples": 1000,
+        "max_samples": 100000,
+        "spreiding": 0.05,              # fractie van het VALIDATION_RULES bereik als laag = hoog
+        "verdelingen": {                # aanvullend op de standaard (vraag, onv. vraag, demografie)
+            "fte_vrouw": {"verdeling": "normaal", "sd": 0.02},
+            "ver_midden": null          # vast houden
+        },
+        ...                             # basis parameters zoals /api/scenario
+    }
+
+    Returns:
+        JSON met jaren, banden per reeks, percentielen in 2043 en het aantal trekkingen
+    """
+    try:
+        data = request.json or {}
+        seed = data.get('seed')
+        doel_breedte = data.get('doel_breedte', 25.0)
+        min_samples = data.get('min_samples', 1000)
+        max_samples = data.get('max_samples', 100000)
+        spreiding = data.get('spreiding', 0.05)
+        verdelingen = data.get('verdelingen', {})
+
+        if seed is not None and (not isinstance(seed, int) or seed < 0):
+            return jsonify({'error': 'Seed moet een positief geheel getal zijn'}), 400
+        if not isinstance(doel_breedte, (int, float)) or doel_breedte <= 0:
+            return jsonify({'error': 'doel_breedte moet groter dan 0 zijn'}), 400
+        if (not isinstance(min_samples, int) or not isinstance(max_samples, int)
+                or not 0 < min_samples <= max_samples <= MONTE_CARLO_MAX_SAMPLES):
+            return jsonify({'error': f'Samples moeten voldoen aan 0 < min_samples <= max_samples <= {MONTE_CARLO_MAX_SAMPLES}'}), 400
+        if not isinstance(spreiding, (int, float)) or not 0 <= spreiding <= 0.5:
+            return jsonify({'error': 'Spreiding moet tussen 0 en 0.5 liggen (fractie van het bereik)'}), 400
+        if not isinstance(verdelingen, dict):
+            return jsonify({'error': 'Verdelingen moet een object zijn (parameter -> verdeling)'}), 400
+
+        is_valid, error_message = validate_parameters(data)
+        if not is_valid:
+            return jsonify({'error': error_message}), 400
+
+        # Zonder seed kiest monte_carlo_banden() er een (teruggegeven, dus reproduceerbaar);
+        # alleen requests met een eigen seed worden gecachet
+        params = parse_scenario_params(data)
+        try:
+            resultaat, cache_hit = monte_carlo_banden(
+                params, verdelingen, spreiding=spreiding, seed=seed,
+                cache=seed is not None, doel_breedte=doel_breedte, min_samples=min_samples, max_samples=max_samples,
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        afronden = lambda banden: {p: np.round(np.asarray(waarden, dtype=float), 2) for p, waarden in banden.items()}
+        return resultaat_response({
+            'jaren': np.asarray(resultaat['jaren']),
+            'banden': {naam: afronden(banden) for naam, banden in resultaat['banden'].items()},
+            'evenwichtsjaar': {
+                'jaar': resultaat['evenwichtsjaar']['jaar'],
+                'gap_fte': {p: round(w, 2) for p, w in resultaat['evenwichtsjaar']['gap_fte'].items()},
+                'instroomadvies': {p: round(w, 2) for p, w in resultaat['evenwichtsjaar']['instroomadvies'].items()},
+            },
+            'verdelingen': resultaat['verdelingen'],
+            'samples': resultaat['samples'],
+            'ci_breedte': round(resultaat['ci_breedte'], 2),
+            'converged': resultaat['converged'],
+            'seed': resultaat['seed'],
+            'engine': 'numpy',
+            'cache_hit': cache_hit,
+        }, kies_mimetype(), tabel=monte_carlo_tabel)
+
+    except Exception as e:
+        print("\n" + "="*80, file=sys.stderr)
+        print("❌ ERROR in /api/montecarlo endpoint", file=sys.stderr)
+        print("="*80, file=sys.stderr)
+        print(f"\n🔴 Exception type: {type(e).__name__}", file=sys.stderr)
+        print(f"🔴 Exception message: {str(e)}", file=sys.stderr)
+        traceback.print_exc(file=sys.stderr)
+        print("="*80 + "\n", file=sys.stderr)
+
+        if DEBUG:
+            return jsonify({'error': str(e)}), 500
+        else:
+            return jsonify({'error': 'Internal server error'}), 500
+
+
+# Job types voor /api/jobs: een job voert het synchrone endpoint uit in een job thread
+JOB_TYPES = {
+    'scenario': '/api/scenario',
+    'batch': '/api/scenarios/batch',
+    'sweep': '/api/sweep',
+    'sensitivity': '/api/sensitivity',
+    'solve': '/api/solve',
+    'montecarlo': '/api/montecarlo',
+}
+
+
+def voer_job_uit(pad: str, data: dict) -> dict:
+    """
+    Voer een synchroon endpoint uit voor een job (in een job thread).
+
+    Zelfde validatie, caching en foutafhandeling als het endpoint zelf; alleen
+    de rate limit wordt overgeslagen (die telde al bij POST /api/jobs).
+
+    Args:
+        pad: Endpoint pad uit JOB_TYPES
+        data: JSON body voor het endpoint
+
+    Returns:
+        dict: JSON response van het endpoint
+
+    Raises:
+        JobFout: Met de error en HTTP status als het endpoint faalt (bijv. 400)
+    """
+    # Een lopende job telt als live verkeer: de warm-up wacht
+    with _live_verkeer_lock:
+        _live_verkeer['actief'] += 1
+    try:
+        with app.test_request_context(pad, method='POST', json=data):
+            view = app.view_functions[request.url_rule.endpoint]
+            view = getattr(view, '__wrapped__', view)  # zonder limiter decorator
+            response = app.make_response(view())
+            body = response.get_json()
+    finally:
+        with _live_verkeer_lock:
+            _live_verkeer['actief'] -= 1
+            _live_verkeer['laatste'] = time.monotonic()
+
+    if response.status_code >= 400:
+        raise JobFout((body or {}).get('error', 'Internal server error'), response.status_code)
+    return body
+
+
+@app.route('/api/jobs', methods=['POST'])
+@limiter.limit("10 per minute")  # Zelfde limiet als de synchrone endpoints
+def api_jobs_submit():
+    """
+    Zet een scenario, batch, sweep, sensitivity, solve of Monte Carlo berekening
+    in de wachtrij en geef direct een job id terug.
+
+    Expected JSON body: "type" plus de body van het synchrone endpoint:
+    {
+        "type": "batch",                # zie JOB_TYPES
+        "scenarios": [{"instroom": 718}, {"instroom": 1026}]
+    }
+
+    Returns:
+        202 met de job (id, status 'wachtend') en de URL om te pollen;
+        400 bij een onbekend type, 503 als de job store vol of uit is.
+        Ongeldige parameters geven een job met status 'fout' en http_status 400.
+    """
+    data = request.json
+    if not isinstance(data, dict) or data.get('type') not in JOB_TYPES:
+        return jsonify({'error': f"Body moet een object zijn met 'type': {', '.join(JOB_TYPES)}"}), 400
+    if _job_store is None:
+        return jsonify({'error': 'Job store niet beschikbaar'}), 503
+
+    soort = data['type']
+    body = {k: v for k, v in data.items() if k != 'type'}
+    try:
+        job = _job_store.submit(soort, voer_job_uit, JOB_TYPES[soort], body)
+    except JobStoreVol as e:
+        return jsonify({'error': str(e)}), 503
+
+    url = f"/api/jobs/{job['id']}"
+    response = jsonify({**job, 'url': url})
+    response.headers['Location'] = url
+    return response, 202
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+@limiter.limit("60 per minute")  # Pollen is goedkoop (één SQLite lookup)
+def api_jobs_status(job_id):
+    """
+    Status van een job; bij status 'klaar' met het resultaat van het endpoint.
+
+    Returns:
+        JSON met id, type, status (wachtend/bezig/klaar/fout), tijdstippen en
+        resultaat of error + http_status; 404 als de job onbekend of verlopen is
+    """
+    if _job_store is None:
+        return jsonify({'error': 'Job store niet beschikbaar'}), 503
+    job = _job_store.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job onbekend of verlopen'}), 404
+    return jsonify(job)
 
 
 @app.route('/api/test', methods=['GET'])
@@ -887,13 +2995,10 @@ def api_test():
         )
 
         # Print eerste en laatste rij
-        print("\n📊 R Model Output:")
-        print(df.head(3))
-        print("...")
-        print(df.tail(3))
+        print(f"\n📊 R Model Output: {df}")
 
         # Check 2043 waarden
-        jaar_2043 = df[df['jaar'] == 2043].iloc[0]
+        jaar_2043 = df.rij(2043)
 
         # Bereken tekort correct als demand - supply
         tekort_calc = jaar_2043['scen6_fte_midden_a'] - jaar_2043['fte_totaal']
@@ -901,7 +3006,7 @@ def api_test():
         test_result = {
             'status': 'success',
             'rows': len(df),
-            'columns': list(df.columns),
+            'columns': df.kolommen,
             'jaar_2043': {
                 'aanbod_fte': round(jaar_2043['fte_totaal'], 2),
                 'benodigd_fte_scen6': round(jaar_2043['scen6_fte_midden_a'], 2),
@@ -973,11 +3078,19 @@ if __name__ == '__main__':
     print(f"   Exists: {R_SCRIPT_PATH.exists()}")
     print(f"📁 Data source: {DATA_PATH}")
     print(f"   Exists: {DATA_PATH.exists()}")
+    print(f"⚙️  Engine: {SCENARIO_ENGINE}")
     print(f"")
     print(f"🌐 API endpoints:")
     print(f"   - http://localhost:{PORT}/health (GET)")
     print(f"   - http://localhost:{PORT}/api/baseline (GET)")
-    print(f"   - http://localhost:{PORT}/api/scenario (POST)")
+    print(f"   - http://localhost:{PORT}/api/scenario (POST, of GET met query parameters)")
+    print(f"   - http://localhost:{PORT}/api/scenario/stream (POST, server-sent events)")
+    print(f"   - http://localhost:{PORT}/api/scenarios/batch (POST)")
+    print(f"   - http://localhost:{PORT}/api/solve (POST)")
+    print(f"   - http://localhost:{PORT}/api/sensitivity (POST)")
+    print(f"   - http://localhost:{PORT}/api/sweep (POST)")
+    print(f"   - http://localhost:{PORT}/api/montecarlo (POST)")
+    print(f"   - http://localhost:{PORT}/api/jobs (POST) + /api/jobs/<id> (GET)")
     print(f"   - http://localhost:{PORT}/api/test (GET) - debug endpoint")
     print("=" * 80)
     print()
@@ -0,0 +1,77 @@
+"""
+Single-flight: één berekening per key, ook als meerdere requests tegelijk komen.
+
+Opent een groep gebruikers tegelijk de simulator (of vuurt een browser twee
+keer), dan missen identieke requests allemaal de cache en start elk een eigen
+R proces. Met single-flight rekent het eerste request (de leider); de rest
+wacht op dezelfde Future en krijgt hetzelfde resultaat (of dezelfde fout).
+
+Werkt tussen threads binnen één worker; tussen workers coördineert
+scenario_model via een lease in de gedeelde L2 cache (SQLiteCache.claim()).
+"""
+
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """Register van lopende berekeningen per key."""
+
+    def __init__(self):
+        self._bezig = {}
+        self._lock = threading.Lock()
+        self._tellers = {'leiders': 0, 'gedeeld': 0}
+
+    def start(self, key) -> tuple:
+        """
+        Meld een berekening voor `key` aan.
+
+        Returns:
+            (future, leider): leider=True betekent dat de aanroeper moet rekenen
+            en daarna klaar() moet aanroepen; anders wachten op future.result()
+        """
+        with self._lock:
+            future = self._bezig.get(key)
+            if future is not None:
+                self._tellers['gedeeld'] += 1
+                return future, False
+            future = self._bezig[key] = Future()
+            self._tellers['leiders'] += 1
+            return future, True
+
+    def klaar(self, key, resultaat=None, fout: BaseException = None):
+        """Geef het resultaat (of de fout) door aan alle wachtenden en meld de key af."""
+        with self._lock:
+            future = self._bezig.pop(key)
+        if fout is not None:
+            future.set_exception(fout)
+        else:
+            future.set_result(resultaat)
+
+    def do(self, key, functie) -> tuple:
+        """
+        Voer functie() uit, tenzij dezelfde key al loopt: wacht dan op dat resultaat.
+
+        Returns:
+            (resultaat, gedeeld): gedeeld=True als een andere thread rekende
+        """
+        future, leider = self.start(key)
+        if not leider:
+            return future.result(), True
+        try:
+            resultaat = functie()
+        except BaseException as e:
+            self.klaar(key, fout=e)
+            raise
+        self.klaar(key, resultaat)
+        return resultaat, False
+
+    def stats(self) -> dict:
+        """Aantal leiders, gedeelde resultaten en nu lopende keys."""
+        with self._lock:
+            return {**self._tellers, 'bezig': len(self._bezig)}
+
+    def reset(self):
+        """Zet de tellers op nul (lopende berekeningen blijven staan)."""
+        with self._lock:
+            self._tellers = dict.fromkeys(self._tellers, 0)
@@ -0,0 +1,109 @@
+"""
+Nulpuntzoeker voor goal-seek berekeningen (/api/solve).
+
+Brent's methode: combineert bisectie (gegarandeerde convergentie binnen een
+bracket) met secant en inverse kwadratische interpolatie (snelle convergentie
+bij gladde functies). Het tekort in het evenwichtsjaar is vrijwel lineair in de
+meeste parameters, dus een solve kost typisch 3-6 modelberekeningen.
+
+Bewust zonder scipy: de functie zelf is een (gecachte) modelaanroep, dus de
+overhead van de zoeker is verwaarloosbaar en een extra dependency niet nodig.
+"""
+
+import math
+import sys
+
+
+class GeenBracketError(ValueError):
+    """De functie wisselt niet van teken binnen het opgegeven bereik."""
+
+    def __init__(self, a: float, fa: float, b: float, fb: float):
+        self.a, self.fa, self.b, self.fb = a, fa, b, fb
+        super().__init__(
+            f"Geen tekenwisseling binnen [{a}, {b}]: f(a)={fa:.4g}, f(b)={fb:.4g}"
+        )
+
+
+def brent(f, a: float, b: float, xtol: float = 1e-6, ftol: float = 0.0,
+          maxiter: int = 50) -> dict:
+    """
+    Zoek x in [a, b] met f(x) = 0 via Brent's methode.
+
+    Args:
+        f: Functie van één variabele
+        a: Ondergrens van het bereik
+        b: Bovengrens van het bereik
+        xtol: Absolute tolerantie op x
+        ftol: Stop zodra |f(x)| <= ftol
+        maxiter: Maximaal aantal iteraties
+
+    Returns:
+        dict met x, fx, iteraties, evaluaties en converged
+
+    Raises:
+        GeenBracketError: Als f(a) en f(b) hetzelfde teken hebben
+        ValueError: Als f NaN oplevert
+    """
+    evaluaties = 0
+
+    def evalueer(x):
+        nonlocal evaluaties
+        evaluaties += 1
+        fx = float(f(x))
+        if math.isnan(fx):
+            raise ValueError(f"Functie geeft NaN bij x={x}")
+        return fx
+
+    fa, fb = evalueer(a), evalueer(b)
+    if fa == 0:
+        return {'x': a, 'fx': fa, 'iteraties': 0, 'evaluaties': evaluaties, 'converged': True}
+    if fb == 0:
+        return {'x': b, 'fx': fb, 'iteraties': 0, 'evaluaties': evaluaties, 'converged': True}
+    if (fa > 0) == (fb > 0):
+        raise GeenBracketError(a, fa, b, fb)
+
+    c, fc = a, fa
+    d = e = b - a
+
+    for iteratie in range(1, maxiter + 1):
+        # c is het contrapunt: f(b) en f(c) hebben altijd tegengesteld teken
+        if (fb > 0) == (fc > 0):
+            c, fc = a, fa
+            d = e = b - a
+        # b is altijd de beste schatting
+        if abs(fc) < abs(fb):
+            a, b, c = b, c, b
+            fa, fb, fc = fb, fc, fb
+
+        tol = 2 * sys.float_info.epsilon * abs(b) + xtol / 2
+        m = (c - b) / 2
+        if abs(m) <= tol or abs(fb) <= ftol:
+            return {'x': b, 'fx': fb, 'iteraties': iteratie, 'evaluaties': evaluaties, 'converged': True}
+
+        if abs(e) >= tol and abs(fa) > abs(fb):
+            s = fb / fa
+            if a == c:
+                # Secant
+                p, q = 2 * m * s, 1 - s
+            else:
+                # Inverse kwadratische interpolatie
+                q, r = fa / fc, fb / fc
+                p = s * (2 * m * q * (q - r) - (b - a) * (r - 1))
+                q = (q - 1) * (r - 1) * (s - 1)
+            if p > 0:
+                q = -q
+            else:
+                p = -p
+
+            if 2 * p < min(3 * m * q - abs(tol * q), abs(e * q)):
+                e, d = d, p / q
+            else:
+                d = e = m  # Interpolatie te onbetrouwbaar: bisectie
+        else:
+            d = e = m
+
+        a, fa = b, fb
+        b += d if abs(d) > tol else math.copysign(tol, m)
+        fb = evalueer(b)
+
+    return {'x': b, 'fx': fb, 'iteraties': maxiter, 'evaluaties': evaluaties, 'converged': False}
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test: Geven de batch endpoints (/api/scenarios/batch, /api/sensitivity) dezelfde
+resultaten als losse /api/scenario calls?
+
+Draait op de NumPy engine (SCENARIO_ENGINE=numpy), R is niet nodig.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault('SCENARIO_ENGINE', 'numpy')
+os.environ.setdefault('DATA_PATH', str(Path(__file__).parent.parent.parent / "public" / "data" / "parameterwaarden.csv"))
+os.environ.setdefault('L2_CACHE_PATH', '')
+
+import scenario_model
+
+
+@pytest.fixture
+def client():
+    scenario_model.limiter.enabled = False
+    scenario_model.clear_cache()
+    return scenario_model.app.test_client()
+
+
+def test_batch_gelijk_aan_losse_requests(client):
+    scenarios = [{'instroom': 718}, {'instroom': 1026, 'opleidingsduur': 3.5}, {'instroom': 900, 'scenario': 'scenario1'}]
+
+    batch = client.post('/api/scenarios/batch', json={'scenarios': scenarios})
+    assert batch.status_code == 200
+
+    for scenario, resultaat in zip(scenarios, batch.json['resultaten']):
+        los = client.post('/api/scenario', json=scenario).json
+        assert resultaat['projectie'] == los['projectie']
+        assert resultaat['instroomadvies_2043'] == los['instroomadvies_2043']
+
+
+def test_dubbele_en_gecachte_scenarios_niet_herberekend(client):
+    client.post('/api/scenario', json={'instroom': 800})
+
+    batch = client.post('/api/scenarios/batch', json=[{'instroom': 800}, {'instroom': 950}, {'instroom': 950}])
+
+    assert batch.json['batch'] == {'scenarios': 3, 'uniek': 2, 'cache_hits': 1, 'berekend': 1, 'gedeeld': 0}
+    assert batch.json['resultaten'][1] == batch.json['resultaten'][2]
+
+
+def test_ongeldig_scenario_geeft_index(client):
+    batch = client.post('/api/scenarios/batch', json={'scenarios': [{'instroom': 718}, {'instroom': 5000}]})
+
+    assert batch.status_code == 400
+    assert batch.json['error'].startswith('Scenario 1:')
+
+
+def test_sensitivity_gerangschikt_en_consistent(client):
+    response = client.post('/api/sensitivity', json={'parameters': ['instroom', 'fte_vrouw', 'epi_midden'], 'stap': 0.1})
+    assert response.status_code == 200
+    resultaat = response.json
+
+    spreidingen = [r['spreiding']['gap_fte'] for r in resultaat['parameters']]
+    assert spreidingen == sorted(spreidingen, reverse=True)
+    assert resultaat['batch']['scenarios'] == 7
+
+    # Delta moet overeenkomen met een losse /api/scenario call
+    instroom = next(r for r in resultaat['parameters'] if r['parameter'] == 'instroom')
+    los = client.post('/api/scenario', json={'instroom': instroom['hoog']}).json
+    basis = client.post('/api/scenario', json={}).json
+    assert instroom['delta_hoog']['gap_fte'] == pytest.approx(
+        los['projectie'][-1]['gap_fte'] - basis['projectie'][-1]['gap_fte'], abs=0.02
+    )
+
+
+def test_sensitivity_grenzen(client):
+    resultaat = client.post('/api/sensitivity', json={'modus': 'grenzen', 'parameters': ['instroom']}).json
+    assert (resultaat['parameters'][0]['laag'], resultaat['parameters'][0]['hoog']) == (600, 1500)
+
+
+def test_vraag_slider_hergebruikt_aanbod(client):
+    client.post('/api/scenario', json={'instroom': 850})
+    client.post('/api/scenario', json={'instroom': 850, 'epi_midden': 0.02})
+    client.post('/api/scenario', json={'instroom': 850, 'epi_midden': 0.02, 'demografie_factor': 1.1})
+
+    aanbod_cache = client.get('/api/cache/stats').json['aanbod_cache']
+    assert (aanbod_cache['misses'], aanbod_cache['hits']) == (1, 2)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test: Komen de cellen van /api/sweep overeen met losse /api/scenario calls?
+
+Draait op de NumPy engine (SCENARIO_ENGINE=numpy), R is niet nodig.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault('SCENARIO_ENGINE', 'numpy')
+os.environ.setdefault('DATA_PATH', str(Path(__file__).parent.parent.parent / "public" / "data" / "parameterwaarden.csv"))
+os.environ.setdefault('L2_CACHE_PATH', '')
+
+import scenario_model
+
+
+@pytest.fixture
+def client():
+    scenario_model.limiter.enabled = False
+    scenario_model.clear_cache()
+    return scenario_model.app.test_client()
+
+
+def test_cellen_gelijk_aan_losse_scenarios(client):
+    resultaat = client.post('/api/sweep', json={
+        'x': {'parameter': 'instroom', 'min': 700, 'max': 1100, 'stap': 200},
+        'y': {'parameter': 'fte_vrouw', 'waarden': [0.7, 0.8]},
+        'opleidingsduur': 3.5,
+    }).json
+
+    assert resultaat['x']['waarden'] == [700, 900, 1100]
+    assert resultaat['y']['waarden'] == [0.7, 0.8]
+
+    for i, fte_vrouw in enumerate(resultaat['y']['waarden']):
+        for j, instroom in enumerate(resultaat['x']['waarden']):
+            los = client.post('/api/scenario', json={'instroom': instroom, 'fte_vrouw': fte_vrouw, 'opleidingsduur': 3.5}).json
+            assert resultaat['outputs']['gap_fte'][i][j] == pytest.approx(los['projectie'][-1]['gap_fte'], abs=0.01)
+            assert resultaat['outputs']['instroomadvies'][i][j] == pytest.approx(los['instroomadvies_2043'], abs=0.5)  # response rondt af
+
+
+def test_vraagcomponent_als_as(client):
+    resultaat = client.post('/api/sweep', json={
+        'x': {'parameter': 'epi_midden', 'min': 0.0, 'max': 0.02, 'aantal': 3},
+        'y': {'parameter': 'demografie_factor', 'waarden': [1.0]},
+        'outputs': ['benodigd_fte'],
+        'jaar': 2035,
+    }).json
+
+    assert list(resultaat['outputs']) == ['benodigd_fte']
+    rij = resultaat['outputs']['benodigd_fte'][0]
+    assert rij[0] < rij[1] < rij[2]
+
+
+def test_groot_rooster(client):
+    resultaat = client.post('/api/sweep', json={
+        'x': {'parameter': 'instroom', 'aantal': 100},
+        'y': {'parameter': 'intern_rendement', 'aantal': 100},
+        'outputs': ['gap_fte'],
+    })
+
+    assert resultaat.status_code == 200
+    assert resultaat.json['cellen'] == 10000
+    assert len(resultaat.json['outputs']['gap_fte']) == 100
+
+
+@pytest.mark.parametrize('body', [
+    {'x': {'parameter': 'instroom'}, 'y': {'parameter': 'instroom'}},
+    {'x': {'parameter': 'instroom', 'min': 500}, 'y': {'parameter': 'fte_man'}},
+    {'x': {'parameter': 'instroom', 'aantal': 101}, 'y': {'parameter': 'fte_man', 'aantal': 100}},
+    {'x': {'parameter': 'instroom'}, 'y': {'parameter': 'fte_man'}, 'outputs': ['onbekend']},
+])
+def test_ongeldige_sweep(client, body):
+    assert client.post('/api/sweep', json=body).status_code == 400
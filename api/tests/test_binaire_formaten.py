@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Test: Binaire response formaten via de Accept header (msgpack en Arrow).
+
+- Zonder (passende) Accept header blijft de response JSON
+- msgpack en Arrow bevatten dezelfde waarden als de JSON response
+- Elk formaat heeft een eigen response cache entry (Vary: Accept)
+
+Draait op de NumPy engine (SCENARIO_ENGINE=numpy), R is niet nodig.
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault('SCENARIO_ENGINE', 'numpy')
+os.environ.setdefault('DATA_PATH', str(Path(__file__).parent.parent.parent / "public" / "data" / "parameterwaarden.csv"))
+os.environ.setdefault('L2_CACHE_PATH', '')
+
+import scenario_model
+from binaire_formaten import ARROW, JSON, MSGPACK, naar_msgpack
+
+msgpack = pytest.importorskip('msgpack')
+
+
+@pytest.fixture
+def client():
+    scenario_model.limiter.enabled = False
+    scenario_model.clear_cache()
+    return scenario_model.app.test_client()
+
+
+def lees_arrow(data: bytes) -> tuple:
+    pa = pytest.importorskip('pyarrow')
+    tabel = pa.ipc.open_stream(data).read_all()
+    return tabel.to_pydict(), json.loads(tabel.schema.metadata[b'payload'])
+
+
+def zonder_tellers(payload: dict) -> dict:
+    # Cache tellers verschillen tussen het eerste en het tweede request
+    return {k: v for k, v in payload.items() if k not in ('batch', 'cache_hit')}
+
+
+SWEEP = {
+    'x': {'parameter': 'instroom', 'waarden': [718, 850, 1026]},
+    'y': {'parameter': 'fte_vrouw', 'waarden': [0.7, 0.75]},
+    'outputs': ['gap_fte', 'instroomadvies'],
+}
+MONTE_CARLO = {'seed': 7, 'min_samples': 50, 'max_samples': 50}
+
+
+@pytest.mark.parametrize('pad, body', [
+    ('/api/scenario?format=kolommen', {'instroom': 850}),
+    ('/api/scenarios/batch?format=kolommen', [{'instroom': 718}, {'instroom': 1026}]),
+    ('/api/sweep', SWEEP),
+    ('/api/montecarlo', MONTE_CARLO),
+    ('/api/solve', {'parameter': 'instroom', 'bereik': [600, 1500]}),
+])
+def test_msgpack_gelijk_aan_json(client, pad, body):
+    verwacht = client.post(pad, json=body).json
+    response = client.post(pad, json=body, headers={'Accept': MSGPACK})
+
+    assert response.mimetype == MSGPACK
+    assert 'Accept' in response.vary
+    assert zonder_tellers(msgpack.unpackb(response.data)) == zonder_tellers(verwacht)
+
+
+def test_zonder_accept_json(client):
+    for accept in (None, '*/*', 'text/html'):
+        headers = {'Accept': accept} if accept else {}
+        response = client.post('/api/scenario', json={'instroom': 850}, headers=headers)
+        assert response.mimetype == JSON
+        assert response.json['projectie'][0]['jaar'] == 2025
+
+
+def test_msgpack_standaard_kolommen(client):
+    # Binaire clients krijgen de projectie als kolommen, tenzij ze om rijen vragen
+    rijen = client.post('/api/scenario', json={'instroom': 850}).json['projectie']
+
+    kolommen = msgpack.unpackb(client.post('/api/scenario', json={'instroom': 850}, headers={'Accept': MSGPACK}).data)
+    assert kolommen['projectie']['gap_fte'] == [r['gap_fte'] for r in rijen]
+
+    als_rijen = client.post('/api/scenario?format=rijen', json={'instroom': 850}, headers={'Accept': MSGPACK})
+    assert msgpack.unpackb(als_rijen.data)['projectie'] == rijen
+
+
+def test_arrow_scenario(client):
+    verwacht = client.post('/api/scenario?format=kolommen', json={'instroom': 850}).json
+    response = client.post('/api/scenario', json={'instroom': 850}, headers={'Accept': ARROW})
+
+    assert response.mimetype == ARROW
+    kolommen, metadata = lees_arrow(response.data)
+    assert kolommen == verwacht.pop('projectie')
+    assert metadata == verwacht
+
+
+def test_arrow_batch_sweep_montecarlo(client):
+    scenarios = [{'instroom': 718}, {'instroom': 1026}]
+    batch = client.post('/api/scenarios/batch?format=kolommen', json=scenarios).json
+    kolommen, metadata = lees_arrow(client.post('/api/scenarios/batch', json=scenarios, headers={'Accept': ARROW}).data)
+    for i, resultaat in enumerate(batch['resultaten']):
+        rijen = [j for j, s in enumerate(kolommen['scenario']) if s == i]
+        assert [kolommen['gap_fte'][j] for j in rijen] == resultaat['projectie']['gap_fte']
+    assert metadata['batch']['scenarios'] == 2
+
+    sweep = client.post('/api/sweep', json=SWEEP).json
+    kolommen, _ = lees_arrow(client.post('/api/sweep', json=SWEEP, headers={'Accept': ARROW}).data)
+    assert kolommen['gap_fte'] == [w for rij in sweep['outputs']['gap_fte'] for w in rij]
+    assert kolommen['instroom'] == [718, 850, 1026] * 2
+
+    banden = client.post('/api/montecarlo', json=MONTE_CARLO).json
+    kolommen, metadata = lees_arrow(client.post('/api/montecarlo', json=MONTE_CARLO, headers={'Accept': ARROW}).data)
+    assert kolommen['jaar'] == banden['jaren']
+    assert kolommen['gap_fte_p50'] == banden['banden']['gap_fte']['p50']
+    assert metadata['seed'] == 7
+
+
+def test_arrow_niet_voor_sensitivity(client):
+    # Geen tabel: een client die Arrow of msgpack accepteert krijgt msgpack
+    response = client.post('/api/sensitivity', json={'parameters': ['instroom']},
+                           headers={'Accept': f'{ARROW}, {MSGPACK};q=0.5'})
+    assert response.mimetype == MSGPACK
+
+
+def test_eigen_response_cache_entry(client):
+    body = {'instroom': 850}
+    json_response = client.post('/api/scenario', json=body).data
+    client.post('/api/scenario', json=body, headers={'Accept': MSGPACK})
+    assert scenario_model.get_cache_stats()['response_cache']['cache_size'] == 2
+
+    # Een msgpack hit verandert de JSON entry niet
+    client.post('/api/scenario', json=body, headers={'Accept': MSGPACK})
+    assert client.post('/api/scenario', json=body).data == json_response
+
+
+def test_msgpack_arrays_zonder_python_objecten():
+    waarden = np.array([1.5, -2.25, np.nan])
+    assert msgpack.unpackb(naar_msgpack({'a': waarden, 'b': np.arange(3)}))['b'] == [0, 1, 2]
+    gedecodeerd = msgpack.unpackb(naar_msgpack(waarden))
+    assert gedecodeerd[:2] == [1.5, -2.25] and np.isnan(gedecodeerd[2])
+    assert msgpack.unpackb(naar_msgpack(np.arange(70000, dtype=np.int64)))[-1] == 69999
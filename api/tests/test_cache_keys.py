@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Test: Krijgen parametersets met dezelfde uitkomst dezelfde cache key?
+
+Draait op de NumPy engine (SCENARIO_ENGINE=numpy), R is niet nodig.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault('SCENARIO_ENGINE', 'numpy')
+os.environ.setdefault('DATA_PATH', str(Path(__file__).parent.parent.parent / "public" / "data" / "parameterwaarden.csv"))
+os.environ.setdefault('L2_CACHE_PATH', '')
+
+import scenario_engine
+import scenario_model
+
+VRAAG_DEFAULTS = {naam: scenario_model.DEFAULT_PARAMS[naam] for naam in scenario_engine.VRAAG_OVERRIDES}
+
+
+@pytest.fixture
+def client():
+    scenario_model.limiter.enabled = False
+    scenario_model.clear_cache()
+    return scenario_model.app.test_client()
+
+
+@pytest.mark.parametrize('eerste, tweede', [
+    ({}, VRAAG_DEFAULTS),                                       # None = CSV default
+    ({'soc_midden': 0.04}, {}),                                 # zonder epi_midden genegeerd
+    ({'fte_vrouw': 0.72}, {'fte_vrouw': 0.7200000001}),         # float ruis
+    ({'uitstroom_vrouw_5j': 11.6 / 100}, {'uitstroom_vrouw_5j': 0.116}),
+    ({'instroom': 900}, {'instroom': 900.4}),                   # R krijgt str(int(instroom))
+    ({}, {'uitstroom_factor_vrouw': 0.3}),                      # geen effect naast absolute uitstroom
+    ({}, {'demografie_factor': 1.0}),
+])
+def test_zelfde_uitkomst_is_cache_hit(client, eerste, tweede):
+    client.post('/api/scenario', json=eerste)
+    client.post('/api/scenario', json=tweede)
+
+    # Eén berekening; het tweede request komt als kant-en-klare response uit de cache
+    stats = scenario_model.get_cache_stats()
+    assert stats['misses'] == 1
+    assert (stats['response_cache']['misses'], stats['response_cache']['hits']) == (1, 1)
+
+
+def test_canoniek_resultaat_gelijk_aan_origineel():
+    params = scenario_model.parse_scenario_params({'soc_midden': 0.04, 'fte_vrouw': 0.7200000001})
+    canoniek = scenario_model.canonicalize_params(params)
+
+    origineel = scenario_engine.run_scenario(scenario_model.DATA_PATH, **params)
+    herschreven = scenario_engine.run_scenario(scenario_model.DATA_PATH, **canoniek)
+    assert herschreven['scen6_fte_midden_a'].tolist() == pytest.approx(origineel['scen6_fte_midden_a'].tolist())
+    assert herschreven['fte_totaal'].tolist() == pytest.approx(origineel['fte_totaal'].tolist())
+
+
+def test_andere_slider_stap_is_miss(client):
+    client.post('/api/scenario', json={'fte_vrouw': 0.72})
+    client.post('/api/scenario', json={'fte_vrouw': 0.73})
+
+    assert scenario_model.get_cache_stats()['misses'] == 2
+
+
+def test_snap_zonder_bankers_rounding():
+    assert scenario_model.snap_waarde('fte_vrouw', 0.745) == 0.75
+    assert scenario_model.snap_waarde('opleidingsduur', 3.25) == 3.3
+    assert scenario_model.snap_waarde('instroom', 718) == 718
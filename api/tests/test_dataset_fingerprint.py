@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test: Worden cache keys ongeldig zodra de dataset wijzigt?
+
+Draait op de NumPy engine (SCENARIO_ENGINE=numpy) met een kopie van de CSV.
+"""
+
+import os
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault('SCENARIO_ENGINE', 'numpy')
+os.environ.setdefault('DATA_PATH', str(Path(__file__).parent.parent.parent / "public" / "data" / "parameterwaarden.csv"))
+os.environ.setdefault('L2_CACHE_PATH', '')
+
+from dataset_fingerprint import FileFingerprint, FingerprintService
+import scenario_model
+
+CSV_FILE = Path(__file__).parent.parent.parent / "public" / "data" / "parameterwaarden.csv"
+
+
+def test_hash_alleen_opnieuw_bij_gewijzigd_bestand(tmp_path, monkeypatch):
+    bestand = tmp_path / 'data.csv'
+    bestand.write_text('a;b\n')
+    fingerprint = FileFingerprint(bestand)
+    eerste = fingerprint.get()
+
+    gelezen = []
+    echte_open = open
+    monkeypatch.setattr('builtins.open', lambda *a, **k: gelezen.append(a[0]) or echte_open(*a, **k))
+    assert fingerprint.get() == eerste
+    assert gelezen == []
+
+    bestand.write_text('a;b;c\n')
+    assert fingerprint.get() != eerste
+    assert gelezen == [bestand]
+
+
+def test_callback_bij_nieuwe_namespace(tmp_path):
+    data = tmp_path / 'data.csv'
+    data.write_text('v1')
+    service = FingerprintService(data, [], 'numpy', interval=0)
+    meldingen = []
+    service.on_change(lambda nieuw, oud: meldingen.append((nieuw, oud)))
+
+    eerste = service.namespace()
+    assert service.namespace() == eerste and meldingen == []
+
+    data.write_text('versie 2')
+    tweede = service.namespace()
+    assert tweede != eerste
+    assert meldingen == [(tweede, eerste)]
+
+
+
+def test_cache_formaat_in_namespace(tmp_path):
+    # Alleen FORMAAT_VERSIE telt, niet de broncode van scenario_cache.py
+    data = tmp_path / 'data.csv'
+    data.write_text('v1')
+    namespaces = {FingerprintService(data, [], 'numpy', interval=0, cache_formaat=versie).namespace()
+                  for versie in (1, 2)}
+    assert len(namespaces) == 2
+    assert scenario_model.fingerprints.namespace().endswith(f"-f{scenario_model.FORMAAT_VERSIE}")
+    assert Path(scenario_model.__file__).parent / 'scenario_cache.py' not in scenario_model._engine_bestanden()
+
+
+@pytest.fixture
+def client_met_kopie(tmp_path, monkeypatch):
+    kopie = tmp_path / 'parameterwaarden.csv'
+    shutil.copy(CSV_FILE, kopie)
+    service = FingerprintService(kopie, [], 'numpy', interval=0)
+    service.on_change(scenario_model._evict_oude_namespace)
+    monkeypatch.setattr(scenario_model, 'DATA_PATH', kopie)
+    monkeypatch.setattr(scenario_model, 'fingerprints', service)
+
+    scenario_model.limiter.enabled = False
+    scenario_model.clear_cache()
+    return scenario_model.app.test_client(), kopie
+
+
+def test_nieuwe_csv_geeft_nieuwe_projectie(client_met_kopie):
+    client, kopie = client_met_kopie
+    voor = client.post('/api/scenario', json={'instroom': 800}).json
+    assert scenario_model.get_cache_stats()['cache_size'] == 1
+
+    # Onvervulde vraag in raming_2025 verhogen: 0,063 -> 0,1
+    inhoud = kopie.read_text(encoding='utf-8-sig')
+    kopie.write_text(inhoud.replace('onv_vraag_midden;;actual;0,01;0;0;0,03;0,08;0,063',
+                                    'onv_vraag_midden;;actual;0,01;0;0;0,03;0,08;0,1'), encoding='utf-8-sig')
+
+    na = client.post('/api/scenario', json={'instroom': 800}).json
+    assert na['projectie'][-1]['benodigd_fte'] > voor['projectie'][-1]['benodigd_fte']
+
+    # Oude entry is opgeruimd, alleen de nieuwe staat in de cache
+    stats = scenario_model.get_cache_stats()
+    assert stats['cache_size'] == 1
+    assert stats['misses'] == 2
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test: Delta responses t.o.v. de baseline (/api/scenario?mode=delta).
+
+- Baseline projectie + delta = volledige scenario projectie (exact)
+- Velden zonder verschil staan alleen in 'ongewijzigd'
+- Kerncijfers 2043 met scenario, baseline en verschil
+- De baseline verwijzing past bij de ETag van GET /api/baseline
+
+Draait op de NumPy engine (SCENARIO_ENGINE=numpy), R is niet nodig.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault('SCENARIO_ENGINE', 'numpy')
+os.environ.setdefault('DATA_PATH', str(Path(__file__).parent.parent.parent / "public" / "data" / "parameterwaarden.csv"))
+os.environ.setdefault('L2_CACHE_PATH', '')
+
+import scenario_model
+
+
+@pytest.fixture
+def client():
+    scenario_model.limiter.enabled = False
+    scenario_model.clear_cache()
+    return scenario_model.app.test_client()
+
+
+@pytest.mark.parametrize('body', [
+    {'instroom': 1026},
+    {'fte_vrouw': 0.8, 'scenario': 'scenario1'},
+    {'epi_midden': 0.02, 'soc_midden': 0.01},
+])
+def test_baseline_plus_delta_is_scenario(client, body):
+    volledig = client.post('/api/scenario?format=kolommen', json=body).json
+    baseline = client.get('/api/baseline?format=kolommen').json['projectie']
+    delta = client.post('/api/scenario?format=kolommen&mode=delta', json=body).json
+
+    assert delta['projectie']['jaar'] == volledig['projectie']['jaar']
+    for veld, waarden in volledig['projectie'].items():
+        if veld == 'jaar':
+            continue
+        verschil = delta['projectie'].get(veld)
+        if verschil is None:
+            assert veld in delta['ongewijzigd']
+            assert waarden == baseline[veld]
+        else:
+            assert [round(b + d, 4) for b, d in zip(baseline[veld], verschil)] == waarden
+
+    assert delta['instroomadvies_2043'] == volledig['instroomadvies_2043']
+    assert delta['impact_analysis'] == volledig['impact_analysis']
+
+
+def test_vraag_parameter_laat_aanbod_ongewijzigd(client):
+    delta = client.post('/api/scenario?mode=delta', json={'epi_midden': 0.02}).json
+
+    assert set(scenario_model.AANBOD_VELDEN) <= set(delta['ongewijzigd'])
+    assert set(delta['projectie'][0]) == {'jaar', 'benodigd_fte', 'gap_fte', 'gap_percentage'}
+
+
+def test_kpis(client):
+    volledig = client.post('/api/scenario?format=kolommen', json={'instroom': 1026}).json['projectie']
+    baseline = client.get('/api/baseline?format=kolommen').json['projectie']
+    kpis = client.post('/api/scenario?mode=delta', json={'instroom': 1026}).json['kpis']
+
+    i = volledig['jaar'].index(2043)
+    assert kpis['jaar'] == 2043
+    assert kpis['gap_fte']['scenario'] == volledig['gap_fte'][i]
+    assert kpis['gap_fte']['baseline'] == baseline['gap_fte'][i]
+    assert kpis['aanbod_fte']['delta'] == round(volledig['aanbod_fte'][i] - baseline['aanbod_fte'][i], 2)
+
+
+def test_baseline_gelijk_aan_baseline(client):
+    delta = client.post('/api/scenario?mode=delta', json={}).json
+
+    assert delta['projectie'][-1] == {'jaar': 2043}
+    assert all(kpi['delta'] == 0 for naam, kpi in delta['kpis'].items() if naam != 'jaar')
+
+
+def test_baseline_verwijzing(client):
+    delta = client.post('/api/scenario?mode=delta&fields=gap_fte', json={'instroom': 1026}).json
+
+    assert delta['baseline']['url'] == '/api/baseline?fields=gap_fte'
+    baseline = client.get(delta['baseline']['url'])
+    assert baseline.headers['ETag'].strip('"').split(':')[0] == delta['baseline']['etag']
+
+
+def test_eigen_cache_entry_en_get(client):
+    volledig = client.post('/api/scenario', json={'instroom': 1026})
+    delta = client.post('/api/scenario?mode=delta', json={'instroom': 1026})
+
+    assert 'kpis' not in volledig.json and 'kpis' in delta.json
+    assert delta.headers['Content-Location'] == '/api/scenario?instroom=1026&mode=delta'
+    assert client.get(delta.headers['Content-Location']).json == delta.json
+
+
+def test_onbekende_modus(client):
+    response = client.post('/api/scenario?mode=verschil', json={'instroom': 1026})
+
+    assert response.status_code == 400
+    assert 'mode' in response.json['error']
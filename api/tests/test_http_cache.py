@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Test: HTTP caching van scenario responses (GET /api/scenario, ETag, 304).
+
+- GET met query parameters geeft hetzelfde resultaat als POST
+- Niet-canonieke URLs krijgen een redirect naar de canonieke URL
+- ETag + Cache-Control op GET, 304 bij een passende If-None-Match
+- Een andere dataset namespace geeft een andere ETag
+
+Draait op de NumPy engine (SCENARIO_ENGINE=numpy), R is niet nodig.
+"""
+
+import os
+import sys
+from pathlib import Path
+from urllib.parse import parse_qsl, urlsplit
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault('SCENARIO_ENGINE', 'numpy')
+os.environ.setdefault('DATA_PATH', str(Path(__file__).parent.parent.parent / "public" / "data" / "parameterwaarden.csv"))
+os.environ.setdefault('L2_CACHE_PATH', '')
+
+import scenario_model
+
+
+@pytest.fixture
+def client():
+    scenario_model.limiter.enabled = False
+    scenario_model.clear_cache()
+    return scenario_model.app.test_client()
+
+
+def test_get_gelijk_aan_post(client):
+    body = {'instroom': 900, 'fte_vrouw': 0.75, 'scenario': 'scenario1'}
+    post = client.post('/api/scenario', json=body)
+
+    url = post.headers['Content-Location']
+    assert url == '/api/scenario?fte_vrouw=0.75&instroom=900&scenario=scenario1'
+
+    get = client.get(url)
+    assert get.status_code == 200
+    assert get.json == post.json
+    assert get.headers['ETag'] == post.headers['ETag']
+    assert 'max-age=' in get.headers['Cache-Control']
+    assert 'Cache-Control' not in post.headers
+
+
+@pytest.mark.parametrize('query', [
+    'instroom=900&fte_vrouw=0.75',         # andere volgorde
+    'fte_vrouw=0.7500001&instroom=900.4',  # onafgerond
+    'fte_vrouw=0.75&instroom=900&uitstroom_factor_man=0.2&scenario=scenario6',  # genegeerd / default
+])
+def test_redirect_naar_canonieke_url(client, query):
+    response = client.get(f'/api/scenario?{query}')
+
+    assert response.status_code == 302
+    assert response.headers['Location'] == '/api/scenario?fte_vrouw=0.75&instroom=900'
+    assert 'max-age=' in response.headers['Cache-Control']
+
+
+def test_canonieke_url_is_stabiel():
+    # Parse van de canonieke URL geeft dezelfde URL (geen redirect lus) en dezelfde parameters
+    for body in ({}, {'instroom': 1026}, {'epi_midden': 0.02, 'soc_midden': 0.01},
+                 {'soc_midden': 0.5}, {'intern_rendement': 0.8312, 'demografie_factor': 1.1}):
+        with scenario_model.app.test_request_context():
+            url = scenario_model.scenario_url(body)
+            data = scenario_model.lees_scenario_query(dict(parse_qsl(urlsplit(url).query)))
+            assert scenario_model.scenario_url(data) == url
+            assert (scenario_model.canonicalize_params(scenario_model.parse_scenario_params(data)) ==
+                    scenario_model.canonicalize_params(scenario_model.parse_scenario_params(body)))
+
+
+def test_vraagcomponent_houdt_epi_midden():
+    # Zonder epi_midden negeert het model de andere vraagcomponenten
+    csv = scenario_model.scenario_engine.laad_parameters(scenario_model.DATA_PATH)
+    with scenario_model.app.test_request_context():
+        url = scenario_model.scenario_url({'epi_midden': csv['epi_midden'], 'soc_midden': 0.05})
+    assert 'epi_midden=' in url and 'soc_midden=0.05' in url
+
+
+def test_304_bij_if_none_match(client):
+    response = client.get('/api/scenario?instroom=900')
+    etag = response.headers['ETag']
+
+    niet_gewijzigd = client.get('/api/scenario?instroom=900', headers={'If-None-Match': etag})
+    assert niet_gewijzigd.status_code == 304
+    assert niet_gewijzigd.data == b''
+    assert niet_gewijzigd.headers['ETag'] == etag
+
+    # Gecomprimeerde variant en een weak tag van de edge passen ook
+    br = client.get('/api/scenario?instroom=900', headers={'Accept-Encoding': 'br'})
+    assert br.headers['ETag'].endswith(':br"')
+    assert client.get('/api/scenario?instroom=900', headers={'If-None-Match': br.headers['ETag']}).status_code == 304
+    assert client.get('/api/scenario?instroom=900', headers={'If-None-Match': f'W/{etag}'}).status_code == 304
+
+    assert client.get('/api/scenario?instroom=901', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_baseline_etag(client):
+    response = client.get('/api/baseline')
+    assert response.headers['Cache-Control'].startswith('public, max-age=')
+    assert client.get('/api/baseline', headers={'If-None-Match': response.headers['ETag']}).status_code == 304
+
+    # Ander formaat = andere representatie = andere ETag
+    kolommen = client.get('/api/baseline?format=kolommen')
+    assert kolommen.headers['ETag'] != response.headers['ETag']
+
+
+def test_etag_volgt_dataset_namespace(client, monkeypatch):
+    etag = client.get('/api/scenario?instroom=900').headers['ETag']
+
+    monkeypatch.setattr(scenario_model.fingerprints, 'namespace', lambda: 'andere-dataset')
+    response = client.get('/api/scenario?instroom=900', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+
+@pytest.mark.parametrize('query', ['instroom=veel', 'instroom=nan', 'bestaat_niet=1', 'instroom=5000'])
+def test_ongeldige_query(client, query):
+    response = client.get(f'/api/scenario?{query}')
+
+    assert response.status_code == 400
+    assert 'error' in response.json
+
+
+def test_redirect_telt_niet_voor_rate_limit():
+    scenario_model.limiter.enabled = True
+    scenario_model.limiter.reset()
+    scenario_model.clear_cache()
+    client = scenario_model.app.test_client()
+    try:
+        # 10 per minuut: een niet-canonieke URL kost alleen het canonieke request
+        for instroom in range(900, 910):
+            response = client.get(f'/api/scenario?instroom={instroom}.4', follow_redirects=True)
+            assert response.status_code == 200
+        assert client.get('/api/scenario?instroom=920').status_code == 429
+    finally:
+        scenario_model.limiter.reset()
+        scenario_model.limiter.enabled = False
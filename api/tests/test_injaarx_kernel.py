@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Test: Geeft de prefix-som kernel exact dezelfde injaarx reeksen als de loops?
+
+De referentie functies hieronder zijn letterlijke vertalingen van de
+`for (n in ...)` loops die beschikbaar_aanbod.R vóór de kernel gebruikte.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import scenario_engine
+
+
+# ==================================================================================
+# REFERENTIE: LETTERLIJKE LOOPS
+# ==================================================================================
+
+def lag(x: np.ndarray, k) -> np.ndarray:
+    """dplyr::lag per rij, met k als int of als (S, 1) array (NaN buiten bereik)."""
+    bron = np.arange(x.shape[1])[None, :] - np.asarray(k, dtype=int).reshape(-1, 1)
+    geldig = bron >= 0
+    waarden = np.take_along_axis(
+        np.broadcast_to(x, (max(x.shape[0], bron.shape[0]), x.shape[1])),
+        np.broadcast_to(np.where(geldig, bron, 0), (max(x.shape[0], bron.shape[0]), x.shape[1])),
+        axis=1
+    )
+    return np.where(geldig, waarden, np.nan)
+
+
+def referentie_nuopl(e: np.ndarray, opleidingsduur: np.ndarray) -> np.ndarray:
+    """
+    Gemiddeld extern rendement cohort 1 (extern_rendement_*_injaarx).
+
+    Letterlijke vertaling van de `for (n in 2:20)` loop in beschikbaar_aanbod.R.
+    """
+    t = np.arange(scenario_engine.JAREN)[None, :]
+    duur = opleidingsduur
+    plafond = np.ceil(duur)
+    fractioneel = duur != plafond
+
+    injaarx = np.where(t <= 1, e, np.nan)
+    for n in range(2, scenario_engine.JAREN):
+        # jaar[n] in R (1-based) = t n - 1; jaar[n + 1] = t n
+        t_n = n - 1
+        i_temp = (t_n >= t - 1) & ((t_n - (t - 1)) < plafond)
+        i_temp &= ~((t == 0) & (0 < plafond))
+        laat = (n > duur) & fractioneel
+        i_temp &= ~(laat & (t >= n))
+        i_temp |= laat & (t == n - plafond)
+
+        hulpextern = np.where(i_temp, e, 0.0).sum(axis=1, keepdims=True)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            hulpextern2 = np.where(
+                i_temp,
+                np.where((t - 1) < plafond, hulpextern / t, hulpextern / plafond),
+                np.nan
+            )
+
+        injaarx = np.where(np.isnan(injaarx), hulpextern2, injaarx)
+        vorige = lag(hulpextern2, 1)
+        injaarx = np.where(
+            np.isnan(injaarx) & ~np.isnan(vorige) & (n > plafond) & fractioneel,
+            vorige, injaarx
+        )
+
+    return injaarx
+
+
+def referentie_tussopl(e: np.ndarray, opleidingsduur2: np.ndarray, bijsturing: np.ndarray) -> np.ndarray:
+    """
+    Gemiddeld extern rendement cohort 2 (extern_rendement_*_injaarx2).
+
+    Letterlijke vertaling van de `for (n in 1:20)` loop in beschikbaar_aanbod.R.
+    """
+    t = np.arange(scenario_engine.JAREN)[None, :]
+    plafond = np.ceil(opleidingsduur2)
+    shape = np.broadcast_shapes(e.shape, plafond.shape, bijsturing.shape)
+
+    injaarx2 = np.where(t == 0, 0.0, np.nan)
+    injaarx2 = np.broadcast_to(np.where(t <= plafond, 1.0, injaarx2), shape)
+    hulpextern2 = np.full(shape, np.nan)
+
+    for n in range(1, scenario_engine.JAREN):
+        t_n = n - 1
+        i_temp = (t_n >= t - 1) & ((t_n - (t - 1)) < bijsturing)
+        i_temp &= ~((t == 0) & (0 < bijsturing))
+
+        hulpextern = np.where(i_temp, e, 0.0).sum(axis=1, keepdims=True)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            hulpextern2 = np.where(
+                i_temp,
+                np.where((t - 1) < bijsturing, hulpextern / t, hulpextern / bijsturing),
+                hulpextern2
+            )
+
+        injaarx2 = np.where(np.isnan(injaarx2) & (t >= plafond), lag(hulpextern2, plafond), injaarx2)
+
+    return injaarx2
+
+
+def referentie_nabijst(e: np.ndarray, opleidingsduur3: np.ndarray, bijsturing: np.ndarray) -> np.ndarray:
+    """
+    Gemiddeld extern rendement cohort 3 (extern_rendement_*_injaarx3).
+
+    Letterlijke vertaling van de `for (n in 1:20)` loop in beschikbaar_aanbod.R.
+    """
+    t = np.arange(scenario_engine.JAREN)[None, :]
+    verschuiving = np.ceil(opleidingsduur3) + bijsturing
+
+    injaarx3 = np.where(t == 0, 0.0, np.nan)
+    injaarx3 = np.where(t <= verschuiving, 1.0, injaarx3)
+
+    for n in range(1, scenario_engine.JAREN):
+        # lead(jaar, 21 - n) bestaat alleen voor de eerste n rijen
+        i_temp = (t <= n - 1) & ~((t == 0) & (0 < opleidingsduur3))
+
+        hulpextern = np.where(i_temp, e, 0.0).sum(axis=1, keepdims=True)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            hulpextern2 = np.where(i_temp, hulpextern / t, np.nan)
+
+        injaarx3 = np.where(np.isnan(injaarx3), lag(hulpextern2, verschuiving), injaarx3)
+
+    return injaarx3
+
+
+def referentie_buitenland(e: np.ndarray) -> np.ndarray:
+    """
+    Gemiddeld extern rendement buitenland (extern_rendement_*_injaarxbl).
+
+    Letterlijke vertaling van de `for (n in 1:21)` loop in beschikbaar_aanbod.R.
+    """
+    t = np.arange(scenario_engine.JAREN)[None, :]
+    injaarxbl = np.where(t == 0, e[:, :1], np.nan)
+
+    for n in range(1, scenario_engine.JAREN + 1):
+        i_temp = t <= n - 1
+        hulpextern = np.where(i_temp, e, 0.0).sum(axis=1, keepdims=True)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            hulpextern2 = np.where(i_temp, hulpextern / t, np.nan)
+        injaarxbl = np.where(np.isnan(injaarxbl), hulpextern2, injaarxbl)
+
+    return injaarxbl
+
+
+# ==================================================================================
+# TESTS
+# ==================================================================================
+
+OPLEIDINGSDUREN = [1.0, 2.0, 2.5, 3.0, 3.2, 3.5, 4.0, 4.7, 6.0]
+BIJSTURINGEN = [1, 2, 3, 5]
+
+
+@pytest.fixture
+def rendement():
+    # Reeksen zoals het model ze maakt, plus willekeurige reeksen (t = 0 is altijd 0)
+    rng = np.random.default_rng(2025)
+    modelreeks = scenario_engine._extern_rendement_reeks(0.989, 0.943, 0.889, 0.851)
+    willekeurig = rng.uniform(0.7, 1.0, size=(5, scenario_engine.JAREN))
+    willekeurig[:, 0] = 0.0
+    return np.vstack([modelreeks, willekeurig])
+
+
+def kolom(waarde, e):
+    return np.full((e.shape[0], 1), waarde)
+
+
+@pytest.mark.parametrize('duur', OPLEIDINGSDUREN)
+def test_nuopl_gelijk_aan_loop(rendement, duur):
+    np.testing.assert_allclose(
+        scenario_engine._injaarx_nuopl(rendement, kolom(duur, rendement)),
+        referentie_nuopl(rendement, kolom(duur, rendement)),
+        rtol=1e-12
+    )
+
+
+@pytest.mark.parametrize('duur', OPLEIDINGSDUREN)
+@pytest.mark.parametrize('bijsturing', BIJSTURINGEN)
+def test_tussopl_en_nabijst_gelijk_aan_loop(rendement, duur, bijsturing):
+    args = (rendement, kolom(duur, rendement), kolom(bijsturing, rendement))
+    np.testing.assert_allclose(
+        scenario_engine._injaarx_tussopl(*args), referentie_tussopl(*args), rtol=1e-12
+    )
+    np.testing.assert_allclose(
+        scenario_engine._injaarx_nabijst(*args), referentie_nabijst(*args), rtol=1e-12
+    )
+
+
+def test_buitenland_gelijk_aan_loop(rendement):
+    np.testing.assert_allclose(
+        scenario_engine._injaarx_buitenland(rendement), referentie_buitenland(rendement), rtol=1e-12
+    )
+
+
+def test_verschillende_duren_per_scenario(rendement):
+    # Eén aanroep met per scenario een andere (niet-gehele) opleidingsduur
+    duren = np.array(OPLEIDINGSDUREN[:rendement.shape[0]]).reshape(-1, 1)
+    np.testing.assert_allclose(
+        scenario_engine._injaarx_nuopl(rendement, duren), referentie_nuopl(rendement, duren), rtol=1e-12
+    )
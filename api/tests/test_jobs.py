@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test: Asynchrone jobs (job_store.py, /api/jobs).
+
+- POST /api/jobs geeft direct een job id; het resultaat is gelijk aan het synchrone endpoint
+- Ongeldige parameters en onbekende jobs
+- Begrenzing en verlopen van de job store
+
+Draait op de NumPy engine (SCENARIO_ENGINE=numpy), R is niet nodig.
+"""
+
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault('SCENARIO_ENGINE', 'numpy')
+os.environ.setdefault('DATA_PATH', str(Path(__file__).parent.parent.parent / "public" / "data" / "parameterwaarden.csv"))
+os.environ.setdefault('L2_CACHE_PATH', '')
+
+import scenario_model
+from job_store import JobFout, JobStore, JobStoreVol
+
+
+@pytest.fixture
+def client():
+    scenario_model.limiter.enabled = False
+    scenario_model.clear_cache()
+    return scenario_model.app.test_client()
+
+
+def wacht_op_job(client, url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(url).json
+        if job['status'] in ('klaar', 'fout'):
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"Job {url} niet klaar binnen {timeout}s")
+
+
+def afgerond(store, job_id, timeout=5):
+    deadline = time.monotonic() + timeout
+    while (job := store.get(job_id))['status'] not in ('klaar', 'fout'):
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    return job
+
+
+def test_scenario_job_gelijk_aan_synchroon(client):
+    response = client.post('/api/jobs', json={'type': 'scenario', 'instroom': 900})
+    assert response.status_code == 202
+    assert response.json['status'] == 'wachtend'
+    assert response.headers['Location'] == response.json['url']
+
+    job = wacht_op_job(client, response.json['url'])
+
+    assert job['status'] == 'klaar'
+    assert job['resultaat'] == client.post('/api/scenario', json={'instroom': 900}).json
+
+
+def test_batch_job(client):
+    response = client.post('/api/jobs', json={'type': 'batch', 'scenarios': [{'instroom': 718}, {'instroom': 1026}]})
+    job = wacht_op_job(client, response.json['url'])
+
+    assert job['type'] == 'batch'
+    assert len(job['resultaat']['resultaten']) == 2
+
+
+def test_ongeldige_parameters_geven_fout_job(client):
+    response = client.post('/api/jobs', json={'type': 'scenario', 'instroom': 5000})
+    job = wacht_op_job(client, response.json['url'])
+
+    assert job['status'] == 'fout'
+    assert job['http_status'] == 400
+    assert 'resultaat' not in job
+
+
+def test_onbekend_type_en_onbekende_job(client):
+    assert client.post('/api/jobs', json={'type': 'onbekend'}).status_code == 400
+    assert client.get('/api/jobs/bestaat-niet').status_code == 404
+
+
+def test_store_vol_weigert_alleen_als_alles_loopt(tmp_path):
+    store = JobStore(tmp_path / 'jobs.sqlite', max_jobs=2, workers=1)
+    vrij = threading.Event()
+
+    eerste = store.submit('test', lambda: 1)
+    afgerond(store, eerste['id'])
+
+    # Volle store: de oudste afgeronde job maakt plaats
+    store.submit('test', vrij.wait)
+    store.submit('test', vrij.wait)
+    assert store.get(eerste['id']) is None
+
+    # Alleen lopende jobs: weigeren
+    with pytest.raises(JobStoreVol):
+        store.submit('test', lambda: 1)
+    vrij.set()
+
+
+def test_fouten_en_verlopen(tmp_path):
+    store = JobStore(tmp_path / 'jobs.sqlite', ttl=0.2, workers=1)
+
+    def faalt():
+        raise JobFout('Ongeldig', 400)
+
+    job = afgerond(store, store.submit('test', faalt)['id'])
+    assert (job['status'], job['error'], job['http_status']) == ('fout', 'Ongeldig', 400)
+
+    # Onverwachte fouten worden niet letterlijk doorgegeven
+    job_id = store.submit('test', lambda: 1 / 0)['id']
+    assert afgerond(store, job_id)['error'] == 'Internal server error'
+
+    time.sleep(0.3)
+    assert store.get(job_id) is None
+    assert store.stats()['fout'] == 0
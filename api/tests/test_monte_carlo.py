@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test: Geeft /api/montecarlo reproduceerbare banden rond het deterministische scenario?
+
+Draait op de NumPy engine (SCENARIO_ENGINE=numpy), R is niet nodig.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault('SCENARIO_ENGINE', 'numpy')
+os.environ.setdefault('DATA_PATH', str(Path(__file__).parent.parent.parent / "public" / "data" / "parameterwaarden.csv"))
+os.environ.setdefault('L2_CACHE_PATH', '')
+
+import monte_carlo
+import scenario_model
+
+
+@pytest.fixture
+def client():
+    scenario_model.limiter.enabled = False
+    scenario_model.clear_cache()
+    return scenario_model.app.test_client()
+
+
+def test_banden_omsluiten_basis_scenario(client):
+    resultaat = client.post('/api/montecarlo', json={'seed': 1, 'max_samples': 5000}).json
+    basis = client.post('/api/scenario', json={}).json['projectie']
+
+    gap = resultaat['banden']['gap_fte']
+    assert resultaat['jaren'] == [p['jaar'] for p in basis]
+    assert len(gap['p5']) == len(basis)
+    for p5, p50, p95 in zip(gap['p5'], gap['p50'], gap['p95']):
+        assert p5 <= p50 <= p95
+    assert gap['p5'][-1] < basis[-1]['gap_fte'] < gap['p95'][-1]
+
+
+def test_seed_reproduceerbaar_en_gecachet(client):
+    body = {'seed': 7, 'max_samples': 3000, 'instroom': 900}
+    eerste = client.post('/api/montecarlo', json=body).json
+    tweede = client.post('/api/montecarlo', json=body).json
+
+    assert (eerste['cache_hit'], tweede['cache_hit']) == (False, True)
+    assert eerste['banden'] == tweede['banden']
+
+    scenario_model.clear_cache()
+    opnieuw = client.post('/api/montecarlo', json=body).json
+    assert opnieuw['banden'] == eerste['banden']
+
+
+def test_aantal_samples_groeit_tot_doel_breedte(client):
+    ruim = client.post('/api/montecarlo', json={'seed': 3, 'doel_breedte': 1000}).json
+    streng = client.post('/api/montecarlo', json={'seed': 3, 'doel_breedte': 40, 'max_samples': 50000}).json
+
+    assert ruim['samples'] == 1000 and ruim['converged']
+    assert streng['samples'] > ruim['samples']
+    assert streng['ci_breedte'] <= 40 or streng['samples'] >= 50000
+
+
+def test_vaste_parameters_geven_nul_breedte(client):
+    vast = {naam: None for naam in monte_carlo.VARIANTEN}
+    resultaat = client.post('/api/montecarlo', json={'seed': 1, 'verdelingen': vast}).json
+
+    gap = resultaat['evenwichtsjaar']['gap_fte']
+    assert gap['p5'] == gap['p95']
+    assert resultaat['samples'] == 1
+
+
+def test_ongeldige_verdeling(client):
+    response = client.post('/api/montecarlo', json={'verdelingen': {'fte_vrouw': {'verdeling': 'lognormaal'}}})
+    assert response.status_code == 400
+
+    response = client.post('/api/montecarlo', json={'verdelingen': {'onbekend': {}}})
+    assert response.status_code == 400
+
+
+def test_percentiel_ci_breedte_krimpt_met_n():
+    rng = np.random.default_rng(0)
+    assert monte_carlo.percentiel_ci_breedte(rng.normal(size=100000)) < monte_carlo.percentiel_ci_breedte(rng.normal(size=1000))
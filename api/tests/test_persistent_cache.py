@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test: Deelt de SQLite L2 cache (persistent_cache.py) entries tussen workers en
+herstarts, en komt een scenario na het legen van L1 uit L2 zonder herberekening?
+
+Draait op de NumPy engine (SCENARIO_ENGINE=numpy), R is niet nodig.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault('SCENARIO_ENGINE', 'numpy')
+os.environ.setdefault('DATA_PATH', str(Path(__file__).parent.parent.parent / "public" / "data" / "parameterwaarden.csv"))
+os.environ.setdefault('L2_CACHE_PATH', '')
+
+import persistent_cache
+import scenario_model
+from persistent_cache import SQLiteCache
+from scenario_cache import CompacteProjectie
+
+
+def test_gedeeld_tussen_instanties(tmp_path):
+    worker1 = SQLiteCache(tmp_path / 'cache.sqlite', max_bytes=10**6)
+    worker1.put('ns:a', b'abc')
+
+    # Tweede worker / herstart: zelfde bestand
+    worker2 = SQLiteCache(tmp_path / 'cache.sqlite', max_bytes=10**6)
+    assert worker2.get('ns:a') == b'abc'
+    assert worker2.get('ns:b') is None
+    assert (worker2.stats()['hits'], worker2.stats()['misses'], worker2.stats()['entries']) == (1, 1, 1)
+
+
+def test_lru_opruimen_op_bytes(tmp_path, monkeypatch):
+    monkeypatch.setattr(persistent_cache, 'OPRUIM_INTERVAL', 1)
+    nu = [1000.0]
+    monkeypatch.setattr(persistent_cache.time, 'time', lambda: nu[0])
+    cache = SQLiteCache(tmp_path / 'cache.sqlite', max_bytes=3500)
+
+    for i in range(3):
+        nu[0] += 100
+        cache.put(f'k{i}', bytes(1000))
+    nu[0] += 100
+    cache.get('k0')  # k0 recent gebruikt, k1 is nu de oudste
+    nu[0] += 100
+    cache.put('k3', bytes(1000))
+
+    assert cache.get('k1') is None
+    assert all(cache.get(k) is not None for k in ('k0', 'k2', 'k3'))
+    assert cache.stats()['bytes'] <= 3500
+
+
+def test_oude_namespace_verwijderd(tmp_path):
+    cache = SQLiteCache(tmp_path / 'cache.sqlite', max_bytes=10**6)
+    cache.put('oud:1', b'x')
+    cache.put('nieuw:1', b'y')
+
+    assert cache.verwijder_behalve_prefix('nieuw:') == 1
+    assert cache.get('nieuw:1') == b'y'
+
+
+def test_compacte_projectie_bytes_roundtrip():
+    origineel = CompacteProjectie({
+        'jaar': np.arange(2025, 2044, dtype=np.int16),
+        'fte_totaal': np.linspace(13000, 14000, 19),
+        'impact_demo_midden': np.linspace(0, 50, 19, dtype=np.float32),
+    })
+    kopie = CompacteProjectie.van_bytes(origineel.naar_bytes())
+
+    assert kopie.kolommen == origineel.kolommen
+    assert all(kopie[k].dtype == origineel[k].dtype and np.array_equal(kopie[k], origineel[k]) for k in kopie.kolommen)
+    assert kopie.rij(2043) == origineel.rij(2043)
+
+
+def test_scenario_uit_l2_na_legen_l1(tmp_path, monkeypatch):
+    monkeypatch.setattr(scenario_model, '_l2_cache', SQLiteCache(tmp_path / 'cache.sqlite', max_bytes=10**7))
+    scenario_model.clear_cache()
+    params = scenario_model.parse_scenario_params({'instroom': 1000})
+    berekend = scenario_model.call_r_model(**params)
+
+    # Andere worker of herstart: lege L1, zelfde L2
+    scenario_model._scenario_cache.clear()
+
+    def niet_rekenen(**params):
+        raise AssertionError("scenario had uit L2 moeten komen")
+
+    monkeypatch.setattr(scenario_model, '_call_model_uncached', niet_rekenen)
+    uit_l2 = scenario_model.call_r_model(**params)
+
+    assert scenario_model.build_scenario_response(uit_l2) == scenario_model.build_scenario_response(berekend)
+    assert scenario_model.get_cache_stats()['l2_cache']['hits'] == 1
+    assert scenario_model.get_cache_stats()['cache_size'] == 1  # L2 hit staat weer in L1
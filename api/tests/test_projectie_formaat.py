@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Test: Projectie formaten (?format=kolommen) en veldselectie (?fields=...).
+
+- Kolommen formaat bevat dezelfde waarden als het standaard formaat (object per jaar)
+- fields= geeft alleen de gevraagde velden (plus de jaar as)
+- Formaat en velden hebben een eigen response cache entry
+- De kolom serializer rondt exact af zoals de oude rij-voor-rij serializer
+
+Draait op de NumPy engine (SCENARIO_ENGINE=numpy), R is niet nodig.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault('SCENARIO_ENGINE', 'numpy')
+os.environ.setdefault('DATA_PATH', str(Path(__file__).parent.parent.parent / "public" / "data" / "parameterwaarden.csv"))
+os.environ.setdefault('L2_CACHE_PATH', '')
+
+import scenario_model
+from scenario_cache import CompacteProjectie
+
+
+@pytest.fixture
+def client():
+    scenario_model.limiter.enabled = False
+    scenario_model.clear_cache()
+    return scenario_model.app.test_client()
+
+
+def als_kolommen(rijen: list) -> dict:
+    return {veld: [rij[veld] for rij in rijen] for veld in rijen[0]}
+
+
+def test_kolommen_gelijk_aan_rijen(client):
+    body = {'instroom': 850, 'scenario': 'scenario1'}
+    rijen = client.post('/api/scenario', json=body).json
+    kolommen = client.post('/api/scenario?format=kolommen', json=body).json
+
+    assert kolommen['projectie'] == als_kolommen(rijen['projectie'])
+    assert kolommen['instroomadvies_2043'] == rijen['instroomadvies_2043']
+
+
+def test_fields_selecteert_velden(client):
+    rijen = client.post('/api/scenario', json={'instroom': 850}).json['projectie']
+
+    response = client.post('/api/scenario?format=kolommen&fields=gap_fte,aanbod_fte', json={'instroom': 850})
+    assert response.json['projectie'] == {
+        'jaar': [rij['jaar'] for rij in rijen],
+        'gap_fte': [rij['gap_fte'] for rij in rijen],
+        'aanbod_fte': [rij['aanbod_fte'] for rij in rijen],
+    }
+
+    baseline = client.get('/api/baseline?fields=benodigd_fte').json['projectie']
+    assert set(baseline[0]) == {'jaar', 'benodigd_fte'}
+
+
+def test_batch_kolommen(client):
+    scenarios = [{'instroom': 718}, {'instroom': 1026}]
+    rijen = client.post('/api/scenarios/batch', json=scenarios).json['resultaten']
+    kolommen = client.post('/api/scenarios/batch?format=kolommen&fields=gap_fte', json=scenarios).json['resultaten']
+
+    for rij, kolom in zip(rijen, kolommen):
+        assert kolom['projectie']['gap_fte'] == [r['gap_fte'] for r in rij['projectie']]
+
+
+@pytest.mark.parametrize('query', ['format=csv', 'fields=bestaat_niet', 'fields=gap_fte,onbekend'])
+def test_onbekend_formaat_of_veld(client, query):
+    response = client.post(f'/api/scenario?{query}', json={'instroom': 850})
+
+    assert response.status_code == 400
+    assert 'error' in response.json
+
+
+def test_eigen_response_cache_entry(client):
+    client.post('/api/scenario', json={'instroom': 850})
+    response = client.post('/api/scenario?format=kolommen', json={'instroom': 850})
+
+    assert isinstance(response.json['projectie'], dict)
+    assert scenario_model.get_cache_stats()['response_cache']['cache_size'] == 2
+
+
+def rij_voor_rij_projectie(df, scenario='scenario6') -> list:
+    """Kopie van de rij-voor-rij serializer van vóór de kolom serializer (referentie)."""
+    projectie = []
+    for row in df.rijen(tot_jaar=2043):
+        aanbod_personen = row['n_totaal_uit_nuopl'] + row['n_totaal_uit_tussopl'] + row['n_totaal_nabijst']
+        benodigd_fte = row['scen1_fte_midden'] if scenario == 'scenario1' else row['scen6_fte_midden_a']
+        tekort_fte = benodigd_fte - row['fte_totaal']
+        gap_percentage = (tekort_fte / row['fte_totaal']) if row['fte_totaal'] > 0 else 0
+        projectie.append({
+            'jaar': int(row['jaar']),
+            'aanbod_fte': round(row['fte_totaal'], 2),
+            'aanbod_personen': round(aanbod_personen, 2),
+            'vrouwen': round(aanbod_personen * 0.66, 2),
+            'mannen': round(aanbod_personen * 0.34, 2),
+            'huidig_cohort': 0,
+            'cohort1_nuopl': round(row['n_totaal_uit_nuopl'], 2),
+            'cohort2_tussen': round(row['n_totaal_uit_tussopl'], 2),
+            'cohort3_nabijst': round(row['n_totaal_nabijst'], 2),
+            'benodigd_fte': round(benodigd_fte, 2),
+            'gap_fte': round(tekort_fte, 2),
+            'gap_percentage': round(gap_percentage, 4),
+        })
+    return projectie
+
+
+def test_afronding_gelijk_aan_rij_voor_rij():
+    # 863.325: np.round geeft 863.32, round() (de oude serializer) 863.33
+    jaren = np.arange(2025, 2044)
+    kolommen = {'jaar': jaren}
+    for i, kolom in enumerate(('fte_totaal', 'scen1_fte_midden', 'scen6_fte_midden_a',
+                               'n_totaal_uit_nuopl', 'n_totaal_uit_tussopl', 'n_totaal_nabijst')):
+        kolommen[kolom] = 500.0 + 100 * i + 0.005 * np.arange(len(jaren), dtype=np.float64)
+    kolommen['n_totaal_nabijst'][0] = 863.325
+    df = CompacteProjectie(kolommen)
+
+    projectie = scenario_model.dataframe_to_projectie_json(df)
+    assert projectie[0]['cohort3_nabijst'] == 863.33
+    assert projectie == rij_voor_rij_projectie(df)
+
+
+def test_gelijk_aan_rij_voor_rij_willekeurige_scenarios():
+    rng = np.random.default_rng(21)
+    for _ in range(100):
+        body = {
+            'instroom': int(rng.integers(600, 1500)),
+            'fte_vrouw': round(float(rng.uniform(0.5, 1.0)), 2),
+            'fte_man': round(float(rng.uniform(0.5, 1.0)), 2),
+            'intern_rendement': round(float(rng.uniform(0.7, 1.0)), 3),
+        }
+        df = scenario_model.call_r_model(**scenario_model.parse_scenario_params(body))
+        for scenario in ('scenario1', 'scenario6'):
+            assert scenario_model.dataframe_to_projectie_json(df, scenario=scenario) == rij_voor_rij_projectie(df, scenario)
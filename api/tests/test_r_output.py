@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test: Leest lees_r_output() de binaire kolommen van run_scenario_api_v2.R
+(schrijf_kolommen_binair) en nog steeds de CSV van een oudere R versie?
+
+De binaire output wordt hier byte voor byte opgebouwd zoals het R script
+(writeBin) dat doet, zodat er geen R installatie nodig is.
+"""
+
+import os
+import struct
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault('SCENARIO_ENGINE', 'numpy')
+os.environ.setdefault('DATA_PATH', str(Path(__file__).parent.parent.parent / "public" / "data" / "parameterwaarden.csv"))
+os.environ.setdefault('L2_CACHE_PATH', '')
+
+import scenario_model
+from scenario_cache import CompacteProjectie
+
+
+def r_binair(data: dict) -> bytes:
+    """Zelfde bytes als schrijf_kolommen_binair() in run_scenario_api_v2.R."""
+    kolommen = list(data)
+    header = ("[" + ", ".join(f'["{kolom}", "<f8"]' for kolom in kolommen) + "]").encode()
+    return b''.join([
+        struct.pack('<i', len(header)), header,
+        *(np.asarray(data[kolom], dtype='<f8').tobytes() for kolom in kolommen),
+    ])
+
+
+def params() -> dict:
+    return scenario_model.canonicalize_params(scenario_model.parse_scenario_params({'instroom': 900}))
+
+
+def model_output() -> pd.DataFrame:
+    return scenario_model._call_numpy_model_uncached(**params())
+
+
+def test_binair_gelijk_aan_csv():
+    df = model_output()
+    kolommen = [k for k in scenario_model.PROJECTIE_KOLOMMEN if k in df.columns]
+
+    binair = scenario_model.lees_r_output(r_binair({k: df[k] for k in kolommen}))
+    csv = scenario_model.lees_r_output(df.to_csv(index=False).encode())
+
+    assert list(binair.columns) == kolommen
+    for kolom in kolommen:
+        np.testing.assert_allclose(binair[kolom], csv[kolom], rtol=1e-12)
+
+
+def test_binair_geeft_zelfde_response():
+    df = model_output()
+    binair = scenario_model.lees_r_output(r_binair({k: df[k] for k in scenario_model.PROJECTIE_KOLOMMEN if k in df}))
+
+    verwacht = scenario_model.build_scenario_response(CompacteProjectie.van_dataframe(df, scenario_model.PROJECTIE_KOLOMMEN))
+    gelezen = scenario_model.build_scenario_response(CompacteProjectie.van_dataframe(binair, scenario_model.PROJECTIE_KOLOMMEN))
+    assert gelezen == verwacht
+
+
+def test_r_krijgt_binair_bestand_en_kolomlijst(monkeypatch, tmp_path):
+    # Vang de argumenten voor R af en schrijf de output zoals het R script
+    df = model_output()
+    ontvangen = {}
+
+    class NepPool:
+        def run(self, args, timeout):
+            ontvangen['args'] = args
+            kolommen = args[-1].split(',')
+            Path(args[-2]).write_bytes(r_binair({k: df[k] for k in kolommen if k in df}))
+
+    monkeypatch.setattr(scenario_model, 'R_WORKER_POOL', True)
+    monkeypatch.setattr(scenario_model, 'R_OUTPUT_DIR', str(tmp_path))
+    monkeypatch.setattr(scenario_model, 'get_r_worker_pool', lambda: NepPool())
+
+    resultaat = scenario_model._call_r_model_uncached(**params())
+
+    assert ontvangen['args'][-2].endswith('.bin')
+    assert ontvangen['args'][-1] == ','.join(scenario_model.PROJECTIE_KOLOMMEN)
+    assert list(tmp_path.iterdir()) == []  # tijdelijk bestand opgeruimd
+    assert resultaat['fte_totaal'].tolist() == df['fte_totaal'].tolist()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test: Hergebruikt en vervangt de R worker pool workers correct?
+
+Gebruikt een Python proces dat het protocol van scenario_worker.R spreekt,
+zodat de pool logica zonder R installatie getest kan worden.
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from r_worker_pool import RWorkerPool, RWorkerError
+
+# Antwoordt OK met de eigen pid, ERROR bij "fout" en stopt bij "crash"
+PROTOCOL_WORKER = r"""
+import os, sys
+print('READY', flush=True)
+for regel in sys.stdin:
+    args = regel.rstrip('\n').split('\t')
+    if args[0] == 'crash':
+        sys.exit(1)
+    if args[0] == 'fout':
+        print('ERROR\tparameter buiten bereik', flush=True)
+        continue
+    with open(args[-1], 'w') as f:
+        f.write(str(os.getpid()))
+    print('OK', flush=True)
+"""
+
+
+@pytest.fixture
+def pool():
+    pool = RWorkerPool([sys.executable, '-c', PROTOCOL_WORKER], size=1, max_jobs=3)
+    yield pool
+    pool.shutdown()
+
+
+def worker_pid(pool, tmp_path):
+    output_file = tmp_path / 'out.txt'
+    pool.run(['718', str(output_file)], timeout=10)
+    return output_file.read_text()
+
+
+def test_worker_blijft_warm(pool, tmp_path):
+    assert worker_pid(pool, tmp_path) == worker_pid(pool, tmp_path)
+    assert pool.get_stats()['gestart'] == 1
+
+
+def test_r_fout_houdt_worker_in_leven(pool, tmp_path):
+    pid = worker_pid(pool, tmp_path)
+    with pytest.raises(RuntimeError, match='R script failed'):
+        pool.run(['fout', 'x'], timeout=10)
+    assert worker_pid(pool, tmp_path) == pid
+
+
+def test_crash_start_nieuwe_worker(pool, tmp_path):
+    pid = worker_pid(pool, tmp_path)
+    with pytest.raises(RWorkerError):
+        pool.run(['crash', 'x'], timeout=10)
+    assert worker_pid(pool, tmp_path) != pid
+
+
+def test_vervangen_na_max_jobs(pool, tmp_path):
+    pids = [worker_pid(pool, tmp_path) for _ in range(4)]
+    assert len(set(pids[:3])) == 1
+    assert pids[3] != pids[0]
+
+
+def test_tellers_thread_safe(tmp_path):
+    pool = RWorkerPool([sys.executable, '-c', PROTOCOL_WORKER], size=4, max_jobs=5)
+    per_thread = 10
+
+    def werk(t):
+        for i in range(per_thread):
+            pool.run(['718', str(tmp_path / f'out_{t}_{i}.txt')], timeout=30)
+
+    threads = [threading.Thread(target=werk, args=(t,)) for t in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    pool.shutdown()
+
+    stats = pool.get_stats()
+    assert stats['jobs'] == 8 * per_thread
+    # Elke versleten worker is vervangen, ook als er al requests op een worker wachtten
+    assert stats['gestart'] - stats['herstart'] <= 4
+    assert stats['herstart'] >= 8 * per_thread // 5 - 4
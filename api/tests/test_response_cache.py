@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test: Komt een herhaald scenario als voorgecomprimeerde response uit de cache,
+in de encoding die de client accepteert en met dezelfde inhoud als jsonify?
+
+Draait op de NumPy engine (SCENARIO_ENGINE=numpy), R is niet nodig.
+"""
+
+import gzip
+import json
+import os
+import sys
+from pathlib import Path
+
+import brotli
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault('SCENARIO_ENGINE', 'numpy')
+os.environ.setdefault('DATA_PATH', str(Path(__file__).parent.parent.parent / "public" / "data" / "parameterwaarden.csv"))
+os.environ.setdefault('L2_CACHE_PATH', '')
+
+import scenario_model
+
+
+@pytest.fixture
+def client():
+    scenario_model.limiter.enabled = False
+    scenario_model.clear_cache()
+    return scenario_model.app.test_client()
+
+
+@pytest.mark.parametrize('accept, encoding, decomprimeer', [
+    ('gzip, deflate, br', 'br', brotli.decompress),
+    ('gzip', 'gzip', gzip.decompress),
+    ('br;q=0.5, gzip', 'gzip', gzip.decompress),
+    ('', None, lambda data: data),
+])
+def test_encoding_volgens_accept_encoding(client, accept, encoding, decomprimeer):
+    referentie = client.post('/api/scenario', json={'instroom': 900}).get_data()
+
+    response = client.post('/api/scenario', json={'instroom': 900}, headers={'Accept-Encoding': accept})
+
+    assert response.headers.get('Content-Encoding') == encoding
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert decomprimeer(response.get_data()) == referentie
+    assert scenario_model.get_cache_stats()['response_cache']['hits'] == 1
+
+
+def test_hit_rekent_en_serialiseert_niet(client, monkeypatch):
+    eerste = client.post('/api/scenario', json={'instroom': 950, 'scenario': 'scenario1'})
+
+    def niet_aanroepen(*args, **kwargs):
+        raise AssertionError("response had uit de cache moeten komen")
+
+    monkeypatch.setattr(scenario_model, 'call_r_model', niet_aanroepen)
+    monkeypatch.setattr(scenario_model, 'build_scenario_response', niet_aanroepen)
+    tweede = client.post('/api/scenario', json={'instroom': 950.2, 'scenario': 'scenario1'})
+
+    assert tweede.get_data() == eerste.get_data()
+    assert json.loads(tweede.get_data())['projectie'][0]['jaar'] == 2025
+
+
+def test_scenario_variant_in_key(client):
+    scenario6 = client.post('/api/scenario', json={'instroom': 900}).json
+    scenario1 = client.post('/api/scenario', json={'instroom': 900, 'scenario': 'scenario1'}).json
+
+    assert scenario6['projectie'] != scenario1['projectie']
+    assert scenario_model.get_cache_stats()['response_cache']['misses'] == 2
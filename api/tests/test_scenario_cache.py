@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Test: Gedraagt de LRU cache (scenario_cache.py) zich correct qua volgorde,
+bytegrens, TTL en tellers, ook met meerdere threads? En geven compacte,
+read-only cache entries dezelfde responses als de volledige model output?
+"""
+
+import os
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault('SCENARIO_ENGINE', 'numpy')
+os.environ.setdefault('DATA_PATH', str(Path(__file__).parent.parent.parent / "public" / "data" / "parameterwaarden.csv"))
+os.environ.setdefault('L2_CACHE_PATH', '')
+
+import scenario_engine
+import scenario_model
+from scenario_cache import CompacteProjectie, LRUCache, geschatte_grootte
+
+
+def test_lru_volgorde():
+    cache = LRUCache(max_bytes=10**9, max_entries=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1  # a is nu recent gebruikt
+    cache.put('c', 3)
+
+    assert 'b' not in cache
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+
+
+def test_begrensd_op_bytes():
+    array = np.zeros(1000)  # 8000 bytes
+    cache = LRUCache(max_bytes=20000)
+    for i in range(5):
+        cache.put(i, array.copy())
+
+    stats = cache.stats()
+    assert stats['entries'] == 2
+    assert stats['bytes'] <= 20000
+    assert (0 not in cache) and (4 in cache)
+
+    # Te grote waarde wordt niet opgeslagen
+    cache.put('groot', np.zeros(10000))
+    assert 'groot' not in cache and cache.stats()['entries'] == 2
+
+
+def test_grootte_van_broadcast_view():
+    basis = np.zeros(100)
+    assert geschatte_grootte(np.broadcast_to(basis, (50, 100))) == basis.nbytes
+
+
+def test_ttl(monkeypatch):
+    nu = [1000.0]
+    monkeypatch.setattr('scenario_cache.time.monotonic', lambda: nu[0])
+    cache = LRUCache(max_bytes=10**9, ttl=10)
+    cache.put('a', 1)
+
+    nu[0] += 5
+    assert cache.get('a') == 1
+    nu[0] += 10
+    assert cache.get('a') is None
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['expirations'], stats['entries']) == (1, 1, 1, 0)
+
+
+def test_tellers_en_verwijder_waar():
+    cache = LRUCache(max_bytes=10**9)
+    cache.put('oud:1', 1)
+    cache.put('nieuw:1', 2)
+    cache.get('oud:1')
+    cache.get('ontbreekt')
+
+    assert cache.verwijder_waar(lambda key: key.startswith('oud:')) == 1
+    assert len(cache) == 1
+
+    cache.clear()
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries'], stats['bytes']) == (0, 0, 0, 0)
+
+
+def test_thread_safe():
+    cache = LRUCache(max_bytes=50 * geschatte_grootte(np.zeros(10)))
+    per_thread = 2000
+
+    def werk(t):
+        for i in range(per_thread):
+            key = (t * 7 + i) % 200
+            if cache.get(key) is None:
+                cache.put(key, np.zeros(10))
+
+    threads = [threading.Thread(target=werk, args=(t,)) for t in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = cache.stats()
+    assert stats['hits'] + stats['misses'] == 8 * per_thread
+    assert stats['entries'] <= 50
+    assert stats['bytes'] == stats['entries'] * geschatte_grootte(np.zeros(10))
+
+
+def test_compacte_projectie_float32_alleen_waar_veilig():
+    df = pd.DataFrame({
+        'jaar': [2025, 2026],
+        'klein': [0.1234567891, 12.5],
+        'groot': [13750.4349, 16402.5149],  # float32 verandert de afronding op 2 decimalen
+        'ongebruikt': [1.0, 2.0],
+    })
+    projectie = CompacteProjectie.van_dataframe(df, ('jaar', 'klein', 'groot', 'ontbreekt'))
+
+    assert projectie.kolommen == ['jaar', 'klein', 'groot']
+    assert projectie['klein'].dtype == np.float32
+    assert projectie['groot'].dtype == np.float64
+    assert projectie.rij(2026) == {'jaar': 2026, 'klein': 12.5, 'groot': 16402.5149}
+    with pytest.raises(ValueError):
+        projectie['klein'][0] = 0.0
+
+
+def test_compacte_projectie_check_op_afgeleide_totalen():
+    # Elke cohort kolom past in float32, maar hun som (aanbod_personen) rondt anders af
+    df = pd.DataFrame({
+        'jaar': [2025],
+        'n_totaal_uit_nuopl': [348.3825847165107],
+        'n_totaal_uit_tussopl': [786.7504691286891],
+        'n_totaal_nabijst': [2423.7019510845225],
+        'fte_totaal': [1.5],
+    })
+    kolommen = ('jaar', *df.columns[1:])
+    per_kolom = CompacteProjectie.van_dataframe(df, kolommen)
+    assert all(per_kolom[k].dtype == np.float32 for k in kolommen[1:])
+    assert scenario_model.aanbod_velden(per_kolom)['aanbod_personen'][0] == 3558.83
+
+    projectie = CompacteProjectie.van_dataframe(df, kolommen, scenario_model.AFGELEIDE_VELDEN)
+    assert all(projectie[k].dtype == np.float64 for k in scenario_model._COHORTEN)
+    assert projectie['fte_totaal'].dtype == np.float32
+    referentie = CompacteProjectie({k: df[k].to_numpy() for k in kolommen})
+    assert scenario_model.aanbod_velden(projectie)['aanbod_personen'][0] == 3558.84
+    assert (scenario_model.aanbod_velden(projectie)['aanbod_personen'] ==
+            scenario_model.aanbod_velden(referentie)['aanbod_personen'])
+
+
+def test_cache_hit_zonder_kopie_en_zelfde_response():
+    scenario_model.clear_cache()
+    params = scenario_model.parse_scenario_params({'instroom': 900})
+
+    eerste = scenario_model.call_r_model(**params)
+    tweede = scenario_model.call_r_model(**params)
+    assert tweede is eerste
+    assert scenario_model.get_cache_stats()['cache_bytes'] == eerste.nbytes
+
+    # Zelfde response als uit de volledige DataFrame
+    volledig = scenario_engine.run_scenario(scenario_model.DATA_PATH, **scenario_model.canonicalize_params(params))
+    referentie = CompacteProjectie({k: volledig[k].to_numpy(dtype=np.float64) for k in scenario_model.PROJECTIE_KOLOMMEN})
+    assert scenario_model.build_scenario_response(eerste) == scenario_model.build_scenario_response(referentie)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test: Komt de NumPy engine overeen met het gevalideerde R model?
+
+Referentie (START.md, /api/test met CSV opleidingsduur):
+- aanbod_fte 2043:        13.790,2 FTE
+- benodigd_fte_scen6 2043: 16.402,5 FTE (VALIDATIE_RESULTATEN.txt)
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import scenario_engine
+
+CSV_FILE = Path(__file__).parent.parent.parent / "public" / "data" / "parameterwaarden.csv"
+
+DEFAULTS = {
+    'instroom': 718, 'intern_rendement': 0.94, 'fte_vrouw': 0.72, 'fte_man': 0.81,
+    'extern_rendement_vrouw_1jaar': 0.989, 'extern_rendement_vrouw_5jaar': 0.943,
+    'extern_rendement_vrouw_10jaar': 0.889, 'extern_rendement_vrouw_15jaar': 0.851,
+    'extern_rendement_man_1jaar': 0.992, 'extern_rendement_man_5jaar': 0.959,
+    'extern_rendement_man_10jaar': 0.931, 'extern_rendement_man_15jaar': 0.905,
+    'uitstroom_vrouw_5j': 0.116, 'uitstroom_vrouw_10j': 0.232,
+    'uitstroom_vrouw_15j': 0.371, 'uitstroom_vrouw_20j': 0.51,
+    'uitstroom_man_5j': 0.226, 'uitstroom_man_10j': 0.373,
+    'uitstroom_man_15j': 0.502, 'uitstroom_man_20j': 0.632,
+}
+
+
+def jaar_2043(df):
+    return df[df['jaar'] == 2043].iloc[0]
+
+
+def test_reproduceert_r_validatie():
+    df = scenario_engine.run_scenario(CSV_FILE, **DEFAULTS)
+
+    assert len(df) == 19  # 2025-2043
+    assert jaar_2043(df)['fte_totaal'] == pytest.approx(13790.2, abs=0.05)
+    assert jaar_2043(df)['scen6_fte_midden_a'] == pytest.approx(16402.5, abs=0.05)
+
+
+def test_zelfde_kolommen_als_r_output():
+    df = scenario_engine.run_scenario(CSV_FILE, opleidingsduur=3.0, **DEFAULTS)
+
+    for kolom in ('jaar', 'fte_totaal', 'scen1_fte_midden', 'scen6_fte_midden_a',
+                  'n_totaal_uit_nuopl', 'n_totaal_uit_tussopl', 'n_totaal_nabijst',
+                  'ben_instroom_sc6_midden_a', 'impact_demo_midden', 'totaal_impact_sc6_midden'):
+        assert kolom in df.columns
+
+
+def test_batch_gelijk_aan_losse_scenarios():
+    instromen = [718, 900, 1026, 1300]
+    batch = scenario_engine.bereken_scenarios(
+        CSV_FILE, {**DEFAULTS, 'instroom': instromen, 'opleidingsduur': [3.0, 3.2, 3.5, 2.0]}
+    )
+
+    for i, (instroom, duur) in enumerate(zip(instromen, [3.0, 3.2, 3.5, 2.0])):
+        los = scenario_engine.run_scenario(CSV_FILE, **{**DEFAULTS, 'instroom': instroom, 'opleidingsduur': duur})
+        uit_batch = scenario_engine.scenario_dataframe(batch, i)
+        np.testing.assert_allclose(uit_batch['fte_totaal'], los['fte_totaal'])
+        np.testing.assert_allclose(uit_batch['ben_instroom_sc6_midden_a'], los['ben_instroom_sc6_midden_a'])
+
+
+def test_vraag_override_alleen_met_epi_midden():
+    # Zoals in R: zonder epi_midden worden de overige vraagcomponenten genegeerd
+    zonder_epi = scenario_engine.run_scenario(CSV_FILE, soc_midden=0.05, **DEFAULTS)
+    basis = scenario_engine.run_scenario(CSV_FILE, **DEFAULTS)
+    assert jaar_2043(zonder_epi)['scen6_fte_midden_a'] == jaar_2043(basis)['scen6_fte_midden_a']
+
+    met_epi = scenario_engine.run_scenario(CSV_FILE, epi_midden=0.01, soc_midden=0.05, **DEFAULTS)
+    assert jaar_2043(met_epi)['scen6_fte_midden_a'] > jaar_2043(basis)['scen6_fte_midden_a']
+
+
+def test_run_scenarios_volgorde_en_none():
+    param_sets = [
+        {**DEFAULTS, 'instroom': 1026},
+        {**DEFAULTS, 'epi_midden': 0.01, 'soc_midden': 0.05},
+        DEFAULTS,
+    ]
+    resultaten = scenario_engine.run_scenarios(CSV_FILE, param_sets)
+
+    assert len(resultaten) == 3
+    for params, df in zip(param_sets, resultaten):
+        los = scenario_engine.run_scenario(CSV_FILE, **params)
+        np.testing.assert_allclose(df['scen6_fte_midden_a'], los['scen6_fte_midden_a'])
+        np.testing.assert_allclose(df['fte_totaal'], los['fte_totaal'])
+
+
+def test_gecachet_aanbod_gelijk_aan_volledige_berekening():
+    aanbod = scenario_engine.bereken_aanbod(CSV_FILE, {**DEFAULTS, 'epi_midden': 0.03})
+
+    for vraag in ({}, {'epi_midden': 0.0, 'hor_midden': 0.03}, {'epi_midden': 0.01, 'demografie_factor': 1.2}):
+        params = {**DEFAULTS, **vraag}
+        met_cache = scenario_engine.run_scenario(CSV_FILE, aanbod=aanbod, **params)
+        volledig = scenario_engine.run_scenario(CSV_FILE, **params)
+        np.testing.assert_allclose(met_cache.drop(columns='beroepsgroep').to_numpy(dtype=float),
+                                   volledig.drop(columns='beroepsgroep').to_numpy(dtype=float))
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test: Geeft /api/scenario/stream (server-sent events) dezelfde projectie als
+/api/scenario, in de volgorde aanbod → vraag → impact?
+
+Draait op de NumPy engine (SCENARIO_ENGINE=numpy), R is niet nodig.
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault('SCENARIO_ENGINE', 'numpy')
+os.environ.setdefault('DATA_PATH', str(Path(__file__).parent.parent.parent / "public" / "data" / "parameterwaarden.csv"))
+os.environ.setdefault('L2_CACHE_PATH', '')
+
+import scenario_model
+
+
+@pytest.fixture
+def client():
+    scenario_model.limiter.enabled = False
+    scenario_model.clear_cache()
+    return scenario_model.app.test_client()
+
+
+def lees_events(response) -> list:
+    events = []
+    for blok in response.get_data(as_text=True).strip().split('\n\n'):
+        velden = dict(regel.split(': ', 1) for regel in blok.split('\n'))
+        events.append((velden['event'], json.loads(velden['data'])))
+    return events
+
+
+@pytest.mark.parametrize('eerst_gecachet', [False, True])
+def test_stream_gelijk_aan_scenario(client, eerst_gecachet):
+    body = {'instroom': 950, 'fte_vrouw': 0.7, 'scenario': 'scenario1'}
+    if eerst_gecachet:
+        client.post('/api/scenario', json=body)
+
+    response = client.post('/api/scenario/stream', json=body)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+
+    events = lees_events(response)
+    assert [event for event, _ in events] == ['aanbod', 'vraag', 'impact']
+
+    (_, aanbod), (_, vraag), (_, impact) = events
+    projectie = [{**a, **v} for a, v in zip(aanbod['projectie'], vraag['projectie'])]
+
+    verwacht = client.post('/api/scenario', json=body).json
+    assert projectie == verwacht['projectie']
+    assert impact['instroomadvies_2043'] == verwacht['instroomadvies_2043']
+    assert impact['impact_analysis'] == verwacht['impact_analysis']
+
+
+def test_aanbod_komt_voor_de_vraagkant(client):
+    events = scenario_model.scenario_stream(scenario_model.parse_scenario_params({'instroom': 1100}))
+
+    event, _ = next(events)
+    assert event == 'aanbod'
+    # Alleen het aanbod is berekend, het volledige scenario nog niet
+    assert scenario_model.get_cache_stats()['cache_size'] == 0
+
+    assert [event for event, _ in events] == ['vraag', 'impact']
+
+
+def test_ongeldige_parameters(client):
+    response = client.post('/api/scenario/stream', json={'instroom': 5000})
+
+    assert response.status_code == 400
+    assert 'error' in response.json
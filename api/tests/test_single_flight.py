@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test: Worden identieke gelijktijdige scenario's maar één keer berekend, binnen
+een worker (threads) en tussen workers (lease in de gedeelde L2 cache)?
+
+Draait op de NumPy engine (SCENARIO_ENGINE=numpy), R is niet nodig.
+"""
+
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault('SCENARIO_ENGINE', 'numpy')
+os.environ.setdefault('DATA_PATH', str(Path(__file__).parent.parent.parent / "public" / "data" / "parameterwaarden.csv"))
+os.environ.setdefault('L2_CACHE_PATH', '')
+
+import scenario_model
+from persistent_cache import SQLiteCache
+from single_flight import SingleFlight
+
+
+def test_een_berekening_voor_gelijktijdige_aanroepen():
+    flight = SingleFlight()
+    aanroepen = []
+    los = threading.Event()
+
+    def traag():
+        aanroepen.append(1)
+        los.wait(5)
+        return 'resultaat'
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [executor.submit(flight.do, 'key', traag) for _ in range(8)]
+        while flight.stats()['gedeeld'] < 7:
+            time.sleep(0.01)
+        los.set()
+        uitkomsten = [f.result() for f in futures]
+
+    assert len(aanroepen) == 1
+    assert sorted(gedeeld for _, gedeeld in uitkomsten) == [False] + [True] * 7
+    assert all(resultaat == 'resultaat' for resultaat, _ in uitkomsten)
+    assert flight.stats() == {'leiders': 1, 'gedeeld': 7, 'bezig': 0}
+
+
+def test_fout_gaat_naar_alle_wachtenden():
+    flight = SingleFlight()
+    future, leider = flight.start('key')
+    volger, volger_leider = flight.start('key')
+    flight.klaar('key', fout=ValueError('R faalde'))
+
+    assert leider and not volger_leider
+    with pytest.raises(ValueError):
+        volger.result()
+    assert flight.start('key')[1]  # daarna opnieuw leider
+
+
+def test_call_r_model_rekent_identiek_scenario_een_keer(monkeypatch):
+    scenario_model.clear_cache()
+    monkeypatch.setattr(scenario_model, '_l2_cache', None)
+    origineel = scenario_model._call_model_uncached
+    aanroepen = []
+
+    def traag(**params):
+        aanroepen.append(params)
+        time.sleep(0.2)
+        return origineel(**params)
+
+    monkeypatch.setattr(scenario_model, '_call_model_uncached', traag)
+    params = scenario_model.parse_scenario_params({'instroom': 1110})
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        resultaten = list(executor.map(lambda _: scenario_model.call_r_model(**params), range(4)))
+
+    assert len(aanroepen) == 1
+    assert all(r is resultaten[0] for r in resultaten)
+
+
+def test_lease_tussen_workers(tmp_path):
+    worker1 = SQLiteCache(tmp_path / 'cache.sqlite', max_bytes=10**6)
+    worker2 = SQLiteCache(tmp_path / 'cache.sqlite', max_bytes=10**6)
+    assert worker1.claim('ns:a', ttl=60)
+    assert not worker2.claim('ns:a', ttl=60)
+
+    def leider():
+        time.sleep(0.2)
+        worker1.put('ns:a', b'resultaat')
+        worker1.release('ns:a')
+
+    threading.Thread(target=leider).start()
+    assert worker2.wacht_op('ns:a', timeout=5) == b'resultaat'
+
+
+def test_verlopen_of_vrijgegeven_lease(tmp_path):
+    worker1 = SQLiteCache(tmp_path / 'cache.sqlite', max_bytes=10**6)
+    worker2 = SQLiteCache(tmp_path / 'cache.sqlite', max_bytes=10**6)
+
+    # Leider faalt: lease vrij zonder resultaat, de wachtende rekent zelf
+    assert worker1.claim('ns:a', ttl=60)
+    worker1.release('ns:a')
+    assert worker2.wacht_op('ns:a', timeout=5) is None
+
+    # Gecrashte leider: lease verloopt
+    assert worker1.claim('ns:b', ttl=60)
+    assert worker2.claim('ns:b', ttl=0)
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test: Vindt de goal-seek solver het nulpunt van de gap met weinig modelberekeningen?
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault('SCENARIO_ENGINE', 'numpy')
+os.environ.setdefault('DATA_PATH', str(Path(__file__).parent.parent.parent / "public" / "data" / "parameterwaarden.csv"))
+os.environ.setdefault('L2_CACHE_PATH', '')
+
+import scenario_model
+from solver import brent, GeenBracketError
+
+
+def test_brent_vindt_nulpunt():
+    resultaat = brent(lambda x: x ** 3 - 2 * x - 5, 2, 3, xtol=1e-12)
+    assert resultaat['converged']
+    assert resultaat['x'] == pytest.approx(2.0945514815423265, abs=1e-10)
+    assert resultaat['evaluaties'] < 15
+
+
+def test_brent_zonder_tekenwisseling():
+    with pytest.raises(GeenBracketError):
+        brent(lambda x: x ** 2 + 1, -1, 1)
+
+
+@pytest.fixture
+def client():
+    scenario_model.limiter.enabled = False
+    scenario_model.clear_cache()
+    return scenario_model.app.test_client()
+
+
+def test_solve_instroom_sluit_gap_2043(client):
+    resultaat = client.post('/api/solve', json={'parameter': 'instroom'}).json
+
+    # Elke extra instroom verschuift de gap met minder dan 10 FTE: beste geheel getal
+    assert abs(resultaat['gap_fte']) < 10
+    assert resultaat['evaluaties'] <= 8
+
+    params = scenario_model.parse_scenario_params({})
+    boven = scenario_model.gap_fte(scenario_model.call_r_model(**{**params, 'instroom': resultaat['waarde'] + 1}))
+    onder = scenario_model.gap_fte(scenario_model.call_r_model(**{**params, 'instroom': resultaat['waarde'] - 1}))
+    assert (boven > 0) != (onder > 0)
+
+
+def test_solve_geen_oplossing_in_bereik(client):
+    response = client.post('/api/solve', json={'parameter': 'intern_rendement', 'jaar': 2035})
+    assert response.status_code == 422
+
+
+def test_solve_vraagcomponent_zonder_epi_midden(client):
+    # Vraagcomponenten krijgen CSV defaults, ook als epi_midden niet is meegegeven
+    response = client.post('/api/solve', json={'parameter': 'soc_midden'})
+    assert response.status_code == 200
+    assert response.json['converged']
+    assert abs(response.json['gap_fte']) < 1
+
+
+@pytest.mark.parametrize('body', [
+    {'parameter': 'uitstroom_factor_man'},
+    {'parameter': 'instroom', 'scenario': 'foo'},
+])
+def test_solve_ongeldige_invoer(client, body):
+    response = client.post('/api/solve', json=body)
+    assert response.status_code == 400
+    assert 'error' in response.json
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test: Rekent de cache warm-up (warmup.py) de baseline, de sliderstappen naast de
+defaults en de meest gevraagde scenario's vooraf, zonder live verkeer te hinderen?
+
+Draait op de NumPy engine (SCENARIO_ENGINE=numpy), R is niet nodig.
+"""
+
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault('SCENARIO_ENGINE', 'numpy')
+os.environ.setdefault('DATA_PATH', str(Path(__file__).parent.parent.parent / "public" / "data" / "parameterwaarden.csv"))
+os.environ.setdefault('L2_CACHE_PATH', '')
+
+import scenario_model
+from warmup import ToegangsLog, WarmUp
+
+
+def wacht_op(warmup, status, timeout=10):
+    deadline = time.monotonic() + timeout
+    while warmup.status()['status'] != status and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return warmup.status()
+
+
+def test_toegangslog_top_n_persistent(tmp_path):
+    log = ToegangsLog(tmp_path / 'toegang.sqlite', flush_interval=100)
+    for _ in range(3):
+        log.registreer({'instroom': 900})
+    log.registreer({'instroom': 1000})
+    log.flush()
+
+    # Na een herstart (nieuwe instantie) nog steeds beschikbaar
+    herstart = ToegangsLog(tmp_path / 'toegang.sqlite')
+    herstart.registreer({'instroom': 1000})
+    assert herstart.top(1) == [{'instroom': 900}]
+    assert herstart.top(5) == [{'instroom': 900}, {'instroom': 1000}]
+
+
+def test_warmup_scenarios(tmp_path, monkeypatch):
+    log = ToegangsLog(tmp_path / 'toegang.sqlite')
+    populair = scenario_model.canonicalize_params(scenario_model.parse_scenario_params({'instroom': 1200}))
+    log.registreer(populair)
+    monkeypatch.setattr(scenario_model, 'toegangslog', log)
+
+    scenarios = scenario_model.warmup_scenarios(stappen=1, top_n=5)
+    instromen = [p['instroom'] for p in scenarios]
+
+    assert scenarios[0] == scenario_model.parse_scenario_params({})
+    assert {708, 728, 1200} <= set(instromen)
+    keys = [scenario_model.create_cache_key(**scenario_model.canonicalize_params(p)) for p in scenarios]
+    assert len(keys) == len(set(keys))
+
+
+def test_warmup_vult_cache_en_wijkt_voor_verkeer(tmp_path):
+    scenario_model.clear_cache()
+    scenarios = scenario_model.warmup_scenarios(stappen=1, top_n=0)[:5]
+    druk = threading.Event()
+    druk.set()
+
+    warmup = WarmUp(lambda p: scenario_model.call_r_model(**p), lambda: scenarios, druk.is_set, pauze=0.001)
+    warmup.start()
+    assert wacht_op(warmup, 'bezig')['gedaan'] == 0  # live verkeer: nog niets berekend
+
+    druk.clear()
+    status = wacht_op(warmup, 'klaar')
+    assert (status['gedaan'], status['totaal'], status['voortgang']) == (5, 5, 1.0)
+    assert scenario_model.get_cache_stats()['cache_size'] == 5
+
+
+def test_een_worker_warmt_op_met_gedeelde_cache(tmp_path):
+    lock = tmp_path / 'cache.sqlite.warmup.lock'
+    eerste = WarmUp(lambda p: None, lambda: [{}], lambda: False, pauze=0, lock_path=lock)
+    tweede = WarmUp(lambda p: None, lambda: [{}], lambda: False, pauze=0, lock_path=lock)
+
+    eerste.start()
+    assert wacht_op(eerste, 'klaar')['gedaan'] == 1
+    tweede.start()
+    assert wacht_op(tweede, 'andere_worker')['status'] == 'andere_worker'
+
+
+def test_health_meldt_warmup():
+    client = scenario_model.app.test_client()
+    assert client.get('/health').json['warmup'] == {'status': 'uit'}
@@ -0,0 +1,205 @@
+"""
+Cache warm-up bij het opstarten.
+
+Na een deploy wachten de eerste gebruikers anders op koude R runs voor de
+baseline en veelgebruikte sliderstanden. Een achtergrond thread rekent vooraf:
+
+- de baseline
+- per slider parameter de stappen naast de default (scenario_model.warmup_scenarios())
+- de top-N meest gevraagde scenario's uit een persistente toegangslog
+
+De warm-up wijkt voor live verkeer: er wordt pas gerekend als er even geen
+requests lopen, met een pauze tussen scenario's. Met een gedeelde L2 cache
+warmt één worker op (file lock); de andere workers lezen daarna uit L2.
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: elke worker warmt zelf op
+    fcntl = None
+
+
+class ToegangsLog:
+    """
+    Persistente telling van gevraagde (canonieke) scenario's.
+
+    Tellingen worden in het geheugen verzameld en per `flush_interval`
+    registraties naar SQLite geschreven, zodat een request geen schrijfactie kost.
+
+    Args:
+        path: Pad naar het SQLite bestand (gedeeld door workers, overleeft herstarts)
+        flush_interval: Aantal registraties tussen twee schrijfacties
+    """
+
+    def __init__(self, path, flush_interval: int = 20):
+        self.path = Path(path)
+        self.flush_interval = flush_interval
+        self._teller = Counter()
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connectie()) as db, db:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS toegang (
+                    params TEXT PRIMARY KEY,
+                    aantal INTEGER NOT NULL,
+                    laatst REAL NOT NULL
+                )
+            """)
+
+    def _connectie(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5.0)
+
+    def registreer(self, params: dict):
+        """Tel één request voor deze (canonieke) parameterset."""
+        sleutel = json.dumps(params, sort_keys=True)
+        with self._lock:
+            self._teller[sleutel] += 1
+            flush = sum(self._teller.values()) >= self.flush_interval
+        if flush:
+            self.flush()
+
+    def flush(self):
+        """Schrijf de verzamelde tellingen naar SQLite."""
+        with self._lock:
+            tellingen, self._teller = self._teller, Counter()
+        if not tellingen:
+            return
+        try:
+            with closing(self._connectie()) as db, db:
+                db.executemany("""
+                    INSERT INTO toegang (params, aantal, laatst) VALUES (?, ?, ?)
+                    ON CONFLICT(params) DO UPDATE SET aantal = aantal + excluded.aantal, laatst = excluded.laatst
+                """, [(sleutel, aantal, time.time()) for sleutel, aantal in tellingen.items()])
+        except sqlite3.Error as e:
+            print(f"Warning: toegangslog flush faalde: {e}", file=sys.stderr)
+
+    def top(self, n: int) -> list:
+        """
+        De n meest gevraagde parametersets.
+
+        Returns:
+            list: parameter dicts, meest gevraagd eerst
+        """
+        self.flush()
+        try:
+            with closing(self._connectie()) as db, db:
+                rijen = db.execute("SELECT params FROM toegang ORDER BY aantal DESC, laatst DESC LIMIT ?", (n,)).fetchall()
+        except sqlite3.Error as e:
+            print(f"Warning: toegangslog lezen faalde: {e}", file=sys.stderr)
+            return []
+        return [json.loads(params) for (params,) in rijen]
+
+
+class WarmUp:
+    """
+    Achtergrond warm-up van de scenario cache.
+
+    Args:
+        bereken: Functie die één parameterset berekent en cachet (call_r_model)
+        scenarios: Functie die de lijst met parametersets geeft (pas in de thread aangeroepen)
+        is_druk: Functie die True geeft zolang er live verkeer is
+        pauze: Seconden tussen twee scenario's
+        lock_path: Lock bestand zodat maar één worker opwarmt (None = elke worker)
+    """
+
+    def __init__(self, bereken, scenarios, is_druk, pauze: float = 0.05, lock_path=None):
+        self.bereken = bereken
+        self.scenarios = scenarios
+        self.is_druk = is_druk
+        self.pauze = pauze
+        self.lock_path = Path(lock_path) if lock_path else None
+
+        self._thread = None
+        self._thread_pid = None
+        self._lock_bestand = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._status = {'status': 'niet_gestart', 'totaal': 0, 'gedaan': 0, 'fouten': 0,
+                        'gestart_op': None, 'klaar_op': None}
+
+    def start(self):
+        """Start de warm-up thread (één keer per proces, dus ook na een gunicorn fork)."""
+        if self._thread_pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread_pid == os.getpid():
+                return
+            self._thread_pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='cache-warmup', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop de warm-up na het lopende scenario."""
+        self._stop.set()
+
+    def _zet(self, **waarden):
+        with self._lock:
+            self._status.update(waarden)
+
+    def _claim_lock(self) -> bool:
+        if self.lock_path is None or fcntl is None:
+            return True
+        # Blijft open (en dus vergrendeld) zolang dit proces leeft
+        self._lock_bestand = open(self.lock_path, 'w')
+        try:
+            fcntl.flock(self._lock_bestand, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            self._lock_bestand.close()
+            self._lock_bestand = None
+            return False
+
+    def _run(self):
+        self._zet(status='bezig', gestart_op=datetime.now().isoformat())
+        try:
+            if not self._claim_lock():
+                self._zet(status='andere_worker', klaar_op=datetime.now().isoformat())
+                return
+
+            scenarios = self.scenarios()
+            self._zet(totaal=len(scenarios))
+            for params in scenarios:
+                # Wijk voor live verkeer
+                while self.is_druk() and not self._stop.is_set():
+                    self._stop.wait(self.pauze)
+                if self._stop.is_set():
+                    self._zet(status='gestopt')
+                    return
+                try:
+                    self.bereken(params)
+                    self._zet(gedaan=self._status['gedaan'] + 1)
+                except Exception as e:
+                    self._zet(fouten=self._status['fouten'] + 1)
+                    print(f"Warning: warm-up scenario faalde: {e}", file=sys.stderr)
+                self._stop.wait(self.pauze)
+        except Exception as e:
+            self._zet(status='fout', klaar_op=datetime.now().isoformat())
+            print(f"Warning: warm-up faalde: {e}", file=sys.stderr)
+            return
+
+        self._zet(status='klaar', klaar_op=datetime.now().isoformat())
+        try:
+            status = self.status()
+            print(f"🔥 Cache warm-up klaar: {status['gedaan']}/{status['totaal']} scenario's", file=sys.stderr)
+        except (BrokenPipeError, IOError):
+            pass
+
+    def status(self) -> dict:
+        """Voortgang voor /health."""
+        with self._lock:
+            status = dict(self._status)
+        status['voortgang'] = round(status['gedaan'] / status['totaal'], 3) if status['totaal'] else None
+        return status